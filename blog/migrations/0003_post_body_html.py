@@ -0,0 +1,111 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:47
+
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from django.db import migrations, models
+
+# санитайзер и сборка тела — копия blog.rendering на момент миграции
+ALLOWED_TAGS  = {"a", "b", "strong", "i", "em", "u", "s", "br", "span", "sub", "sup", "mark", "small"}
+ALLOWED_ATTRS = {"a": {"href", "title", "target", "rel"}}
+SAFE_SCHEMES  = {"", "http", "https", "mailto", "tel"}
+VOID_TAGS     = {"br"}
+DROP_CONTENT  = {"script", "style"}
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open = []       # открытые разрешённые теги
+        self.skip = 0        # глубина внутри <script>/<style>
+
+    def _attrs(self, tag, attrs):
+        allowed = ALLOWED_ATTRS.get(tag, set())
+        parts = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name == "href" and urlparse(value.strip()).scheme.lower() not in SAFE_SCHEMES:
+                continue
+            parts.append(f' {name}="{escape(value, quote=True)}"')
+        return "".join(parts)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.skip += 1
+            return
+        if self.skip or tag not in ALLOWED_TAGS:
+            return
+        self.out.append(f"<{tag}{self._attrs(tag, attrs)}>")
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.skip and tag in VOID_TAGS:
+            self.out.append(f"<{tag}>")
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.skip = max(self.skip - 1, 0)
+            return
+        if self.skip or tag not in self.open:
+            return
+        while self.open:
+            closed = self.open.pop()
+            self.out.append(f"</{closed}>")
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.out.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        while self.open:
+            self.out.append(f"</{self.open.pop()}>")
+        return "".join(self.out)
+
+
+def sanitize(text):
+    parser = _Sanitizer()
+    parser.feed(text or "")
+    return parser.result()
+
+
+def render_post_body(blocks):
+    parts = []
+    for block in blocks:
+        tag = block.content_type
+        if tag in ("p", "h2", "h3"):
+            style = ' style="font-weight: bold;"' if block.bold else ""
+            parts.append(f"<{tag}{style}>{sanitize(block.text)}</{tag}>")
+        elif tag in ("ul", "ol"):
+            items = "".join(f"<li>{sanitize(line)}</li>" for line in block.text.splitlines())
+            parts.append(f"<{tag}>{items}</{tag}>")
+    return "\n".join(parts)
+
+
+def build_bodies(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.prefetch_related('blocks'):
+        post.body_html = render_post_body(sorted(post.blocks.all(), key=lambda b: b.id))
+        post.save(update_fields=['body_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_alter_contentblock_content_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML статьи'),
+        ),
+        migrations.RunPython(build_bodies, migrations.RunPython.noop),
+    ]
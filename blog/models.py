@@ -2,18 +2,26 @@ from django.db import models
 from easy_thumbnails.fields import ThumbnailerImageField
 from django.utils.text import slugify
 
+from .rendering import render_post_body
+
 class Post(models.Model):
     title = models.CharField(max_length=200)
     description = models.CharField(max_length=500)
     slug = models.SlugField(max_length=200, unique=False, blank=True, null=True)
     image = ThumbnailerImageField(upload_to='blog_images')
     publish_date = models.DateTimeField(auto_now_add=True)
+    # собирается из blocks при их изменении (blog/signals.py), отдаётся как есть
+    body_html = models.TextField("HTML статьи", blank=True, editable=False)
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
+    def rebuild_body(self):
+        self.body_html = render_post_body(self.blocks.all())
+        Post.objects.filter(pk=self.pk).update(body_html=self.body_html)
+
     def __str__(self):
         return self.title
 
@@ -0,0 +1,37 @@
+from core.snapshots import ProcessSnapshot
+from products.models import ProductCategory
+from .models import Post
+
+
+def _post_card(post):
+    return {
+        'title': post.title,
+        'slug': post.slug,
+        'image_url': post.image['blog_default'].url if post.image else '',
+    }
+
+
+def load_home():
+    """
+    Всё, что нужно главной: корневые категории с готовыми URL превью и
+    последние 4 поста с URL миниатюр. Thumbnail-ы резолвятся здесь, а не в шаблоне.
+    """
+    categories = [
+        {
+            'title': c.title,
+            'slug': c.slug,
+            'image': bool(c.image),
+            'thumb': c.thumb() if c.image else '',
+        }
+        for c in ProductCategory.objects.filter(parent__isnull=True).order_by("title")
+    ]
+    posts = [_post_card(p) for p in Post.objects.order_by('-publish_date')[:4]]
+    return {
+        'categories': categories,
+        'latest': posts[0] if posts else None,
+        'carousel_posts': posts[1:],
+    }
+
+
+# сбрасывается по сигналам категорий и постов (blog/signals.py)
+home_snapshot = ProcessSnapshot('home', load_home)
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core import edge_cache, oncommit, sitemaps
+from products.models import ProductCategory
+from .models import Post, ContentBlock
+from .services import home_snapshot
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=ProductCategory)
+def invalidate_home(sender, **kwargs):
+    transaction.on_commit(home_snapshot.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_sitemap(sender, instance, **kwargs):
+    transaction.on_commit(lambda: sitemaps.invalidate("posts", [instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=Post)
+def edge_post_changed(sender, instance, **kwargs):
+    edge_cache.purge(edge_cache.BLOG, edge_cache.post_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=ContentBlock)
+def edge_block_changed(sender, instance, **kwargs):
+    edge_cache.purge(edge_cache.post_key(instance.post_id))
+
+
+# ---- тело поста ---------------------------------------------------------
+# Инлайн в админке сохраняет блоки по одному — пересобираем пост один раз на коммит.
+def _rebuild_bodies(post_ids):
+    for post in Post.objects.filter(pk__in=post_ids):
+        post.rebuild_body()
+
+
+@receiver([post_save, post_delete], sender=ContentBlock)
+def rebuild_post_body(sender, instance, **kwargs):
+    oncommit.batch("blog.body", [instance.post_id], _rebuild_bodies)
@@ -1,9 +1,10 @@
 from django.shortcuts import render, get_object_or_404
+from core import edge_cache
 from .models import Post
-
-from products.models import ProductCategory, Product
+from .services import home_snapshot
 
 def post_list(request):
+    edge_cache.add_keys(request, edge_cache.BLOG)
     posts = Post.objects.order_by('-publish_date')
     return render(request, 'blog/post_list.html', {
         'posts': posts,
@@ -16,7 +17,8 @@ def post_list(request):
 
 
 def post_detail(request, slug):
-    post = get_object_or_404(Post, slug=slug)
+    post = get_object_or_404(Post, slug=slug)   # тело уже собрано в post.body_html
+    edge_cache.add_keys(request, edge_cache.post_key(post.pk))
 
     # SEO-логика по шаблону:
     seo_title = f"{post.title} — Блог Decorkz.kz"
@@ -39,12 +41,10 @@ def post_detail(request, slug):
 
 
 def home(request):
-    categories = ProductCategory.objects.filter(parent__isnull=True).order_by("title")
-    posts = Post.objects.order_by('-publish_date')[:4]
-    latest = posts[0] if posts else None
-    carousel_posts = posts[1:] if posts.count() > 1 else []
+    snapshot = home_snapshot.get()
+    edge_cache.add_keys(request, edge_cache.CATALOG, edge_cache.BLOG)
     return render(request, 'home.html', {
-        'latest': latest,
-        'carousel_posts': carousel_posts,
-        "categories": categories,
+        'latest': snapshot['latest'],
+        'carousel_posts': snapshot['carousel_posts'],
+        "categories": snapshot['categories'],
     })
\ No newline at end of file
@@ -1,9 +1,13 @@
-from .models import CompanyContact
+from core import edge_cache
+from .services import company_chrome
 
 def company_contacts(request):
-    contact = CompanyContact.objects.prefetch_related('phones').first()
+    chrome = company_chrome.get()
+    edge_cache.add_keys(request, edge_cache.CONTACTS)   # подвал с контактами на каждой странице
     return {
-        'footer_contact': contact,
+        'footer_contact': chrome['contact'],
+        'footer_phones': chrome['phones'],
+        'footer_socials': chrome['socials'],
     }
 
 def default_seo(request):
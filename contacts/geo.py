@@ -0,0 +1,117 @@
+"""
+Координаты точек продаж и поиск ближайших.
+
+Координаты берутся из map_link (2GIS / Яндекс / Google). Поиск — k-d дерево
+по точкам на единичной сфере (x, y, z): евклидово расстояние между ними
+монотонно по отношению к расстоянию по дуге, поэтому ближайшие по хорде —
+ближайшие и на местности.
+"""
+import heapq
+import math
+import re
+from urllib.parse import urlparse, parse_qs, unquote
+
+EARTH_RADIUS_KM = 6371.0
+
+# Google: .../@51.1283,71.4305,17z
+GOOGLE_AT = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)")
+PAIR = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)")
+
+# параметр -> порядок координат в нём
+LON_LAT_PARAMS = ("m", "ll", "pt", "whatshere[point]")     # 2GIS, Яндекс
+LAT_LON_PARAMS = ("q", "query", "ll", "center")            # Google
+
+
+def _pair(value):
+    m = PAIR.match(unquote(value or ""))
+    return (float(m.group(1)), float(m.group(2))) if m else None
+
+
+def _valid(lat, lon):
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+def parse_map_coordinates(url):
+    """(lat, lon) из ссылки на карту или None, если координат в ней нет."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    params = parse_qs(parsed.query)
+
+    if "google" in host or host.startswith("goo.gl"):
+        m = GOOGLE_AT.search(parsed.path)
+        if m:
+            lat, lon = float(m.group(1)), float(m.group(2))
+            return (lat, lon) if _valid(lat, lon) else None
+        order, names = "latlon", LAT_LON_PARAMS
+    else:
+        order, names = "lonlat", LON_LAT_PARAMS
+
+    for name in names:
+        for value in params.get(name, []):
+            pair = _pair(value)
+            if pair is None:
+                continue
+            lat, lon = pair if order == "latlon" else (pair[1], pair[0])
+            if _valid(lat, lon):
+                return lat, lon
+    return None
+
+
+def _xyz(lat, lon):
+    la, lo = math.radians(lat), math.radians(lon)
+    return (math.cos(la) * math.cos(lo), math.cos(la) * math.sin(lo), math.sin(la))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """Статическое 3-мерное k-d дерево; items — [(lat, lon, payload)]."""
+
+    def __init__(self, items):
+        nodes = [(_xyz(lat, lon), payload) for lat, lon, payload in items]
+        self.size = len(nodes)
+        self.root = self._build(nodes, 0)
+
+    def _build(self, nodes, depth):
+        if not nodes:
+            return None
+        axis = depth % 3
+        nodes.sort(key=lambda n: n[0][axis])
+        mid = len(nodes) // 2
+        point, payload = nodes[mid]
+        return (point, payload, axis,
+                self._build(nodes[:mid], depth + 1),
+                self._build(nodes[mid + 1:], depth + 1))
+
+    def nearest(self, lat, lon, k=1):
+        """[(distance_km, payload)] для k ближайших, по возрастанию расстояния."""
+        target = _xyz(lat, lon)
+        heap = []   # max-heap по квадрату хорды: (-d2, counter, payload)
+        counter = 0
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, payload, axis, left, right = node
+            d2 = sum((a - b) ** 2 for a, b in zip(point, target))
+            if len(heap) < k:
+                heapq.heappush(heap, (-d2, counter, payload))
+            elif d2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-d2, counter, payload))
+            counter += 1
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # дальнюю ветку смотрим, только если плоскость ближе текущего k-го
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                stack.append(far)
+            stack.append(near)
+
+        found = sorted((-neg_d2, payload) for neg_d2, _, payload in heap)
+        return [(_chord_to_km(math.sqrt(d2)), payload) for d2, payload in found]
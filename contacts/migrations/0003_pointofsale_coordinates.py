@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:48
+
+import re
+from urllib.parse import urlparse, parse_qs, unquote
+
+from django.db import migrations, models
+
+# разбор map_link — копия contacts.geo на момент миграции
+GOOGLE_AT = re.compile(r"@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)")
+PAIR = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)")
+LON_LAT_PARAMS = ("m", "ll", "pt", "whatshere[point]")     # 2GIS, Яндекс
+LAT_LON_PARAMS = ("q", "query", "ll", "center")            # Google
+
+
+def _valid(lat, lon):
+    return -90 <= lat <= 90 and -180 <= lon <= 180
+
+
+def parse_map_coordinates(url):
+    if not url:
+        return None
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    params = parse_qs(parsed.query)
+
+    if "google" in host or host.startswith("goo.gl"):
+        m = GOOGLE_AT.search(parsed.path)
+        if m:
+            lat, lon = float(m.group(1)), float(m.group(2))
+            return (lat, lon) if _valid(lat, lon) else None
+        order, names = "latlon", LAT_LON_PARAMS
+    else:
+        order, names = "lonlat", LON_LAT_PARAMS
+
+    for name in names:
+        for value in params.get(name, []):
+            m = PAIR.match(unquote(value or ""))
+            if m is None:
+                continue
+            pair = float(m.group(1)), float(m.group(2))
+            lat, lon = pair if order == "latlon" else (pair[1], pair[0])
+            if _valid(lat, lon):
+                return lat, lon
+    return None
+
+
+def fill_coordinates(apps, schema_editor):
+    PointOfSale = apps.get_model('contacts', 'PointOfSale')
+    for point in PointOfSale.objects.all():
+        coords = parse_map_coordinates(point.map_link)
+        if coords:
+            point.lat, point.lon = coords
+            point.save(update_fields=['lat', 'lon'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0002_pointofsale_city'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pointofsale',
+            name='lat',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Широта'),
+        ),
+        migrations.AddField(
+            model_name='pointofsale',
+            name='lon',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Долгота'),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
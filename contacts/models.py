@@ -1,6 +1,8 @@
 # models.py
 from django.db import models
 
+from .geo import parse_map_coordinates
+
 class CompanyContact(models.Model):
     title = models.CharField("Название компании", max_length=255)
 
@@ -34,4 +36,12 @@ class PointOfSale(models.Model):
     schedule = models.TextField("График работы", help_text="Разделять переносом строки")
     address = models.CharField("Адрес", max_length=255)
     city = models.CharField("Город", max_length=100, default="Астана", blank=True)  # <--- НОВОЕ ПОЛЕ
-    map_link = models.URLField("Ссылка на карту")
\ No newline at end of file
+    map_link = models.URLField("Ссылка на карту")
+    # извлекаются из map_link при сохранении
+    lat = models.FloatField("Широта", null=True, blank=True, editable=False)
+    lon = models.FloatField("Долгота", null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        coords = parse_map_coordinates(self.map_link)
+        self.lat, self.lon = coords if coords else (None, None)
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,36 @@
+from core.snapshots import ProcessSnapshot
+from .geo import KDTree
+from .models import CompanyContact, PointOfSale
+
+
+def load_company_chrome():
+    """Контакты компании для футера и страницы контактов — одним набором запросов."""
+    contact = (
+        CompanyContact.objects
+        .prefetch_related('phones', 'emails', 'socials', 'addresses')
+        .first()
+    )
+    if contact is None:
+        return {'contact': None, 'phones': [], 'emails': [], 'socials': [], 'addresses': []}
+    return {
+        'contact': contact,
+        'phones': list(contact.phones.all()),
+        'emails': list(contact.emails.all()),
+        'socials': list(contact.socials.all()),
+        'addresses': list(contact.addresses.all()),
+    }
+
+
+# меняется раз в год — держим в памяти, сбрасываем по сигналам (contacts/signals.py)
+company_chrome = ProcessSnapshot('company_chrome', load_company_chrome, ttl=3600)
+
+
+def load_points_of_sale():
+    """Все точки продаж, список городов и k-d дерево по тем, у кого есть координаты."""
+    points = list(PointOfSale.objects.all())
+    cities = list(dict.fromkeys(p.city for p in points))
+    tree = KDTree([(p.lat, p.lon, p) for p in points if p.lat is not None and p.lon is not None])
+    return {'points': points, 'cities': cities, 'tree': tree}
+
+
+points_of_sale = ProcessSnapshot('points_of_sale', load_points_of_sale, ttl=3600)
@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core import edge_cache
+
+from .models import CompanyContact, Phone, Email, Social, Address, PointOfSale
+from .services import company_chrome, points_of_sale
+
+
+@receiver([post_save, post_delete], sender=CompanyContact)
+@receiver([post_save, post_delete], sender=Phone)
+@receiver([post_save, post_delete], sender=Email)
+@receiver([post_save, post_delete], sender=Social)
+@receiver([post_save, post_delete], sender=Address)
+def invalidate_company_chrome(sender, **kwargs):
+    transaction.on_commit(company_chrome.invalidate)
+    edge_cache.purge(edge_cache.CONTACTS)   # подвал — на каждой странице
+
+
+@receiver([post_save, post_delete], sender=PointOfSale)
+def invalidate_points_of_sale(sender, **kwargs):
+    transaction.on_commit(points_of_sale.invalidate)
+    edge_cache.purge(edge_cache.CONTACTS)
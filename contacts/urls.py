@@ -5,4 +5,5 @@ from . import views
 urlpatterns = [
     path('contacts/', views.contacts_view, name='contacts'),
     path('points-of-sales/', views.points_of_sale_view, name='points_of_sales'),
+    path('points-of-sales/nearest', views.nearest_points_view, name='points_of_sales_nearest'),
 ]
\ No newline at end of file
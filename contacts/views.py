@@ -1,11 +1,16 @@
 # views.py
+from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
-from .models import CompanyContact, PointOfSale
+from core import edge_cache
+from .services import company_chrome, points_of_sale
+
+NEAREST_DEFAULT_K = 3
+NEAREST_MAX_K = 20
 
 def contacts_view(request):
-    contacts = CompanyContact.objects.prefetch_related('phones', 'emails', 'socials', 'addresses').first()
+    chrome = company_chrome.get()
     return render(request, 'contacts.html', {
-        'contacts': contacts,
+        'contacts': chrome['contact'],
         "og_title": "Контакты ТОО Decorkz — Decorkz.kz",
         "meta_description": "Контакты компании ТОО Decorkz — Decorkz.kz, связаться с Decorkz в Астане, Алматы, Казахстане.",
         "meta_keywords": "каталог, декор, молдинги, плинтусы, рейки, интерьер, Казахстан, контакты, Decorkz, Decorkz.kz",
@@ -14,21 +19,22 @@ def contacts_view(request):
     })
 
 def points_of_sale_view(request):
-    points = PointOfSale.objects.all()
+    snapshot = points_of_sale.get()
+    points = snapshot['points']
 
     city = request.GET.get('city', '')
     point_type = request.GET.get('point_type', '')
 
     if city:
-        points = points.filter(city=city)
+        points = [p for p in points if p.city == city]
 
     if point_type == 'official':
-        points = points.filter(is_official=True)
+        points = [p for p in points if p.is_official]
     elif point_type == 'partner':
-        points = points.filter(is_official=False)
+        points = [p for p in points if not p.is_official]
 
     # Для фильтров
-    cities = PointOfSale.objects.values_list('city', flat=True).distinct()
+    cities = snapshot['cities']
 
     return render(request, 'points_of_sale.html', {
         'points': points,
@@ -41,3 +47,34 @@ def points_of_sale_view(request):
         "og_description": "Точки продаж decorkz.kz",
         "og_image": request.build_absolute_uri("/static/static/img/catalog-og.jpg"),
     })
+
+
+def nearest_points_view(request):
+    """GET ?lat=&lon=&k= → k ближайших точек продаж (JSON), без запросов к БД."""
+    try:
+        lat = float(request.GET['lat'])
+        lon = float(request.GET['lon'])
+        k = int(request.GET.get('k', NEAREST_DEFAULT_K))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Нужны числовые lat и lon'}, status=400)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return JsonResponse({'error': 'Координаты вне диапазона'}, status=400)
+    k = max(1, min(k, NEAREST_MAX_K))
+
+    edge_cache.add_keys(request, edge_cache.CONTACTS)
+    tree = points_of_sale.get()['tree']
+    results = [
+        {
+            'id': p.id,
+            'title': p.title,
+            'address': p.address,
+            'city': p.city,
+            'is_official': p.is_official,
+            'lat': p.lat,
+            'lon': p.lon,
+            'map_link': p.map_link,
+            'distance_km': round(distance, 2),
+        }
+        for distance, p in tree.nearest(lat, lon, k)
+    ]
+    return JsonResponse({'results': results})
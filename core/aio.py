@@ -0,0 +1,37 @@
+"""
+Параллельные запросы к БД из async-view.
+
+Async ORM Django (aget, afirst, …) выполняет запросы в одном общем потоке
+(sync_to_async(thread_sensitive=True)), то есть строго по очереди. Здесь
+каждая независимая выборка уходит в свой поток пула со своим соединением,
+поэтому несколько запросов одной страницы идут к базе одновременно.
+
+Ограничения: выборки не должны зависеть друг от друга и не должны
+выполняться внутри transaction.atomic / ATOMIC_REQUESTS — у каждого потока
+своё соединение и своя транзакция. Соединения потоков пула живут по
+CONN_MAX_AGE, как и у обычных воркеров.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import close_old_connections
+
+
+def _call(fn):
+    close_old_connections()   # соединение потока пула могло устареть
+    return fn()
+
+
+async def gather_queries(*fns):
+    """Выполняет функции (без аргументов, с запросами к БД) одновременно; результаты — по порядку."""
+    return await asyncio.gather(*(sync_to_async(_call, thread_sensitive=False)(fn) for fn in fns))
+
+
+def run_queries(*fns):
+    """
+    gather_queries для синхронного кода, который async-view запустил в потоке
+    пула (DRF-ViewSet под async_views.async_api_view): выборки уходят в event
+    loop вызывающего view и идут одновременно. Вне async-view не вызывать —
+    async_to_sync поднимет для каждого вызова свой loop.
+    """
+    return async_to_sync(gather_queries)(*fns)
@@ -0,0 +1,97 @@
+"""
+Чтение с реплик, запись и админка — на primary.
+
+Подключение (settings.py):
+    DATABASES = {
+        "default": {...},                                   # primary
+        "replica": {..., "TEST": {"MIRROR": "default"}},
+    }
+    DATABASE_REPLICAS = ["replica"]
+    DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+    MIDDLEWARE = ["core.db_router.ReplicaMiddleware", ...]
+    REPLICA_STICKY_SECONDS = 10    # необязательно: окно read-your-writes
+    REPLICA_PRIMARY_PATHS = ["/admin/"]
+
+На реплику уходят только чтения внутри GET/HEAD-запросов сайта и API, которые
+пропустил ReplicaMiddleware. Всё остальное — management-команды, shell,
+сигналы вне запроса, админка, POST — читает с primary, как и раньше.
+
+Read-your-writes: после запроса с записью (небезопасный метод или любая
+запись в БД) клиент получает cookie и REPLICA_STICKY_SECONDS секунд читает
+с primary; внутри самого запроса после первой записи чтения тоже идут на
+primary. Снимки и кеши, которые строятся на запросе и живут дольше него
+(core.snapshots, core.sitemaps), читают с primary всегда — иначе отставшая
+реплика закешировала бы старые данные до следующей инвалидации.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# "replica" — можно читать с реплики; "primary" — только с primary
+_mode = contextvars.ContextVar("db_read_mode", default="primary")
+_wrote = contextvars.ContextVar("db_wrote", default=False)
+
+
+def _replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+@contextmanager
+def primary():
+    """Чтения внутри блока — с primary (для кешей, которые переживут запрос)."""
+    token = _mode.set("primary")
+    try:
+        yield
+    finally:
+        _mode.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = _replicas()
+        if (not replicas or _mode.get() != "replica" or _wrote.get()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики — копии primary, связи между ними допустимы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+        self.primary_paths = tuple(getattr(settings, "REPLICA_PRIMARY_PATHS", ["/admin/"]))
+
+    def _can_use_replica(self, request):
+        return (request.method in SAFE_METHODS
+                and STICKY_COOKIE not in request.COOKIES
+                and not request.path.startswith(self.primary_paths))
+
+    def __call__(self, request):
+        mode = _mode.set("replica" if self._can_use_replica(request) else "primary")
+        wrote = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if request.method not in SAFE_METHODS or _wrote.get():
+                response.set_cookie(STICKY_COOKIE, "1", max_age=self.sticky_seconds,
+                                    httponly=True, samesite="Lax")
+            return response
+        finally:
+            _mode.reset(mode)
+            _wrote.reset(wrote)
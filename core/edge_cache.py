@@ -0,0 +1,140 @@
+"""
+HTTP-кеш перед Django (nginx, Varnish, Fastly): surrogate-ключи и purge.
+
+Подключение (settings.py):
+    MIDDLEWARE = ["core.edge_cache.SurrogateKeyMiddleware", ...]   # первым: видит
+                                        # cookie сессии, CSRF и db_primary
+    EDGE_CACHE_SECONDS = 6 * 3600           # s-maxage для кеша перед сайтом
+    EDGE_CACHE_BROWSER_SECONDS = 60         # max-age для браузера
+    EDGE_CACHE_KEY_HEADER = "Surrogate-Key" # Varnish xkey: "xkey"
+    EDGE_CACHE_PURGER = "core.edge_cache.HTTPPurger"
+    EDGE_CACHE_PURGE_URL = "http://127.0.0.1:6081/"
+    # или XkeyPurger (Varnish vmod xkey), FilePurger + EDGE_CACHE_PURGE_FILE
+    # (для проверок), NoopPurger (по умолчанию)
+
+View помечают ответ ключами через add_keys(request, ...): product-<id>,
+category-<id>, catalog, contacts, blog, post-<id>. Middleware превращает их
+в заголовок ключей и Cache-Control: public, s-maxage=… для GET/HEAD 200 без
+cookie сессии и без Set-Cookie. Сигналы моделей копят ключи затронутых
+объектов и после коммита отправляют один purge на транзакцию.
+"""
+import logging
+import urllib.request
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from core import oncommit
+
+logger = logging.getLogger(__name__)
+
+CATALOG = "catalog"
+CONTACTS = "contacts"
+BLOG = "blog"
+
+
+def product_key(pk):
+    return f"product-{pk}"
+
+
+def category_key(pk):
+    return f"category-{pk}"
+
+
+def post_key(pk):
+    return f"post-{pk}"
+
+
+def add_keys(request, *keys):
+    if request is None:
+        return
+    if not hasattr(request, "_surrogate_keys"):
+        request._surrogate_keys = set()
+    request._surrogate_keys.update(k for k in keys if k)
+
+
+# ---- middleware -------------------------------------------------------------
+class SurrogateKeyMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, "EDGE_CACHE_KEY_HEADER", "Surrogate-Key")
+        self.cache_control = "public, max-age={}, s-maxage={}".format(
+            getattr(settings, "EDGE_CACHE_BROWSER_SECONDS", 60),
+            getattr(settings, "EDGE_CACHE_SECONDS", 6 * 3600),
+        )
+
+    def _cacheable(self, request, response):
+        return (request.method in ("GET", "HEAD")
+                and response.status_code == 200
+                and not response.cookies
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES
+                and not response.has_header("Cache-Control"))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        keys = getattr(request, "_surrogate_keys", None)
+        if keys and self._cacheable(request, response):
+            response[self.header] = " ".join(sorted(keys))
+            response["Cache-Control"] = self.cache_control
+        return response
+
+
+# ---- purger-ы -----------------------------------------------------------------
+class NoopPurger:
+    def purge(self, keys):
+        logger.debug("edge purge (noop): %s", " ".join(keys))
+
+
+class HTTPPurger:
+    """PURGE на EDGE_CACHE_PURGE_URL с ключами в заголовке (VCL сам снимает объекты по ключам)."""
+    method = "PURGE"
+    header = "Surrogate-Key"
+
+    def __init__(self):
+        self.url = settings.EDGE_CACHE_PURGE_URL
+        self.timeout = getattr(settings, "EDGE_CACHE_PURGE_TIMEOUT", 2)
+
+    def purge(self, keys):
+        request = urllib.request.Request(self.url, method=self.method,
+                                         headers={self.header: " ".join(keys)})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError:
+            # кеш перед сайтом недоступен — страницы доживут до s-maxage
+            logger.exception("edge purge failed: %s", " ".join(keys))
+
+
+class XkeyPurger(HTTPPurger):
+    """Varnish vmod xkey: заголовок xkey-purge (soft purge — xkey-softpurge в VCL)."""
+    header = "xkey-purge"
+
+
+class FilePurger:
+    """Дописывает ключи строкой в EDGE_CACHE_PURGE_FILE — заглушка для проверок и отладки."""
+
+    def __init__(self):
+        self.path = settings.EDGE_CACHE_PURGE_FILE
+
+    def purge(self, keys):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(" ".join(keys) + "\n")
+
+
+_purger = None
+
+
+def get_purger():
+    global _purger
+    if _purger is None:
+        _purger = import_string(getattr(settings, "EDGE_CACHE_PURGER", "core.edge_cache.NoopPurger"))()
+    return _purger
+
+
+# ---- purge по коммиту -------------------------------------------------------
+def _send(keys):
+    get_purger().purge(sorted(keys))
+
+
+def purge(*keys):
+    """Копит ключи до коммита транзакции и отправляет их одним purge."""
+    oncommit.batch("edge_cache.purge", keys, _send)
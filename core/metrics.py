@@ -0,0 +1,254 @@
+"""
+Метрики запросов в формате Prometheus.
+
+Подключение (settings.py):
+    MIDDLEWARE = [..., "core.metrics.MetricsMiddleware"]
+    METRICS_ALLOWED_IPS = ["10.0.0.5"]      # кто может читать /metrics; по умолчанию — только loopback
+    METRICS_DIR = "/run/shop-metrics"       # при нескольких воркерах gunicorn (см. ниже)
+
+Для каждого view (по имени URL: catalog-by-slug, product-detail,
+products:product-list …) копятся гистограммы латентности, числа SQL-запросов,
+времени в SQL и размера ответа.
+
+Без METRICS_DIR данные живут в памяти процесса — годится для одного процесса
+(runserver, один воркер uvicorn). Воркеры gunicorn слушают общий сокет, и
+скрейп попал бы в случайный воркер, поэтому с METRICS_DIR каждый воркер раз в
+FLUSH_INTERVAL сбрасывает свои агрегаты в METRICS_DIR/metrics-<pid>.json, а
+/metrics суммирует все файлы каталога (как multiprocess-режим
+prometheus_client). Файлы завершившихся воркеров остаются — счётчики не
+убывают при перезапуске воркера. Каталог — локальный для машины (tmpfs) и
+очищается при старте сервера, например в gunicorn.conf.py:
+
+    def on_starting(server):
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        os.makedirs(METRICS_DIR)
+"""
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, Http404
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS   = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS    = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+UNRESOLVED = "<unresolved>"
+DEFAULT_ALLOWED_IPS = ("127.0.0.1", "::1")
+FLUSH_INTERVAL = 1.0   # секунд между сбросами агрегатов воркера в METRICS_DIR
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.sum += total
+        self.count += count
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class MetricsRegistry:
+    """Агрегаты по (view, method); счётчик запросов — ещё и по статусу."""
+
+    HISTOGRAMS = (
+        ("http_request_duration_seconds", "Время обработки запроса", LATENCY_BUCKETS),
+        ("http_request_sql_queries", "Число SQL-запросов на HTTP-запрос", QUERY_BUCKETS),
+        ("http_request_sql_duration_seconds", "Время в SQL на HTTP-запрос", LATENCY_BUCKETS),
+        ("http_response_size_bytes", "Размер тела ответа", SIZE_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}   # (view, method) -> [Histogram × 4]
+        self._requests = {}     # (view, method, status) -> int
+        self._dirty = False
+        self._flusher_pid = None
+
+    def observe(self, view, method, status, duration, queries, sql_time, size):
+        with self._lock:
+            hs = self._histograms.get((view, method))
+            if hs is None:
+                hs = self._histograms[(view, method)] = [Histogram(b) for _, _, b in self.HISTOGRAMS]
+            for h, value in zip(hs, (duration, queries, sql_time, size)):
+                h.observe(value)
+            key = (view, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._dirty = True
+        if _metrics_dir() and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    # ---- общий каталог воркеров ----
+    def _state(self):
+        with self._lock:
+            self._dirty = False
+            return {
+                "requests": [[*key, n] for key, n in self._requests.items()],
+                "histograms": [[view, method, [[h.counts, h.sum, h.count] for h in hs]]
+                               for (view, method), hs in self._histograms.items()],
+            }
+
+    def flush(self):
+        """Записывает агрегаты процесса в METRICS_DIR/metrics-<pid>.json (атомарно)."""
+        path = os.path.join(_metrics_dir(), f"metrics-{os.getpid()}.json")
+        state = self._state()
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _start_flusher(self):
+        # поток — на процесс: после fork поток родителя в воркере не живёт
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            if self._dirty:
+                self.flush()
+
+    def _states(self):
+        directory = _metrics_dir()
+        if not directory:
+            return [self._state()]
+        self.flush()   # свои агрегаты — без задержки FLUSH_INTERVAL
+        states = []
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):   # файл удалили при очистке каталога
+                continue
+        return states
+
+    def _merged(self):
+        requests, histograms = {}, {}
+        for state in self._states():
+            for view, method, status, n in state["requests"]:
+                requests[(view, method, status)] = requests.get((view, method, status), 0) + n
+            for view, method, values in state["histograms"]:
+                hs = histograms.get((view, method))
+                if hs is None:
+                    hs = histograms[(view, method)] = [Histogram(b) for _, _, b in self.HISTOGRAMS]
+                for h, (counts, total, count) in zip(hs, values):
+                    h.merge(counts, total, count)
+        return requests, histograms
+
+    def render(self):
+        """Текстовый формат Prometheus 0.0.4 (по всем воркерам при METRICS_DIR)."""
+        requests, histograms = self._merged()
+        out = [
+            "# HELP http_requests_total Число HTTP-запросов",
+            "# TYPE http_requests_total counter",
+        ]
+        for (view, method, status), n in sorted(requests.items()):
+            out.append(f'http_requests_total{{view="{view}",method="{method}",status="{status}"}} {n}')
+
+        for i, (name, help_text, _) in enumerate(self.HISTOGRAMS):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} histogram")
+            for (view, method), hs in sorted(histograms.items()):
+                out.extend(hs[i].lines(name, f'view="{view}",method="{method}"'))
+        out.append("")
+        return "\n".join(out)
+
+
+def _metrics_dir():
+    return getattr(settings, "METRICS_DIR", None)
+
+
+registry = MetricsRegistry()
+
+
+class _SQLTimer:
+    """execute_wrapper: считает запросы и суммарное время в БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or UNRESOLVED
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == "/metrics":
+            return self.get_response(request)
+
+        timer = _SQLTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        if response.streaming:
+            size = 0   # длину стрима заранее не знаем
+        else:
+            size = len(response.content)
+
+        registry.observe(
+            _view_name(request), request.method, response.status_code,
+            duration, timer.count, timer.duration, size,
+        )
+        return response
+
+
+def metrics_view(request):
+    # латентности и SQL-профили view — не для публики: по умолчанию только loopback
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", None) or DEFAULT_ALLOWED_IPS
+    if request.META.get("REMOTE_ADDR") not in allowed:
+        raise Http404
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,50 @@
+"""
+Работа «один раз на коммит» с накоплением аргументов.
+
+Импорт и инлайны админки сохраняют объекты по одному; кеши и производные
+данные (edge purge, диапазоны фильтров, карточки, тела постов) достаточно
+пересчитать один раз после коммита — по всем id, накопленным за транзакцию:
+
+    oncommit.batch("cards", [product.pk], cards.build)
+
+Вне atomic() callback выполняется сразу (как transaction.on_commit).
+После отката зарегистрированный callback Django отбрасывает — следующий
+вызов начинает новую пачку, накопленное в откатившейся транзакции теряется.
+"""
+import threading
+
+from django.db import transaction
+
+_pending = threading.local()
+
+
+def _registered(connection, run):
+    # единственное место, где смотрим в connection.run_on_commit: после отката
+    # Django очищает список. Без атрибута — новая пачка на каждый вызов
+    # (корректно, просто без объединения).
+    entries = getattr(connection, "run_on_commit", None) or ()
+    return any(entry[1] is run for entry in entries)
+
+
+def batch(key, items, callback, using=None):
+    """Добавляет items в пачку key; callback(set(items)) выполнится один раз после коммита."""
+    items = {i for i in items if i}
+    if not items:
+        return
+    connection = transaction.get_connection(using)
+    batches = _pending.__dict__.setdefault("batches", {})
+    slot = (key, connection.alias)
+    current = batches.get(slot)
+    if current is not None and _registered(connection, current[1]):
+        current[0].update(items)
+        return
+
+    collected = set(items)
+
+    def run():
+        if batches.get(slot, (None, None))[1] is run:
+            del batches[slot]
+        callback(collected)
+
+    batches[slot] = (collected, run)
+    transaction.on_commit(run, using=using)
@@ -0,0 +1,43 @@
+"""
+JSON-рендерер DRF на orjson (необязательная зависимость: pip install orjson).
+
+Вывод побайтно совпадает с rest_framework.renderers.JSONRenderer при
+UNICODE_JSON и COMPACT_JSON (значения по умолчанию). Всё, что orjson пишет
+иначе, отдаётся стандартному рендереру: ответы с indent, float-ы вне
+1e-4…1e16 (экспоненциальная запись различается), целые длиннее 64 бит.
+Без orjson класс работает как обычный JSONRenderer.
+"""
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# float-ы, которые json и orjson пишут по-разному: с экспонентой у orjson
+# (1e16, 1e-7) и 1e-5…1e-4 (orjson: 0.00001, json: 1e-05). Совпадение внутри
+# строки (редкость) лишь отправляет ответ на стандартный рендерер.
+_EXPONENT = re.compile(rb"e-?\d+[,\]}]")
+_SMALL = b"0.0000"
+
+
+class OrjsonRenderer(JSONRenderer):
+    def _fast(self, accepted_media_type, renderer_context):
+        return (orjson is not None and not self.ensure_ascii and self.compact
+                and not self.get_indent(accepted_media_type, renderer_context))
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self._fast(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # datetime и dataclass — через default, как у json.dumps с encoder_class
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _EXPONENT.search(ret) or _SMALL in ret:
+            return super().render(data, accepted_media_type, renderer_context)
+        # как JSONRenderer: U+2028/U+2029 допустимы в JSON, но не в JavaScript
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
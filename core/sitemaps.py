@@ -0,0 +1,180 @@
+"""
+sitemap.xml: индекс и файлы-чанки.
+
+    /sitemap.xml                    — индекс (sitemapindex) с lastmod каждого чанка
+    /sitemap-<section>-<n>.xml      — urlset; n — номер корзины id // CHUNK_SIZE
+
+Чанки товаров, категорий и постов строятся потоком по values_list().iterator(),
+без загрузки моделей целиком, и кладутся в Django cache. Каждый чанк имеет
+свою версию в кеше: сигналы (products/signals.py, blog/signals.py) меняют
+версию только затронутых корзин и индекса — остальные чанки отдаются из кеша
+как есть. Корзины по id стабильны: новый товар попадает в последнюю корзину,
+не сдвигая соседние.
+
+Хост берётся из settings.SITEMAP_BASE_URL (например "https://decorkz.kz"),
+иначе из запроса.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+
+from blog.models import Post
+from core.db_router import primary
+from products.models import Product, ProductCategory
+
+CHUNK_SIZE = 10_000          # URL-ов в файле (лимит протокола — 50 000)
+CACHE_TTL = 24 * 3600        # версии инвалидируются сигналами, TTL — страховка
+CONTENT_TYPE = "application/xml; charset=utf-8"
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+# статические страницы: (имя URL, changefreq)
+STATIC_PAGES = [
+    ("home", "daily"),
+    ("catalog", "daily"),
+    ("post_list", "weekly"),
+    ("contacts", "monthly"),
+    ("points_of_sales", "monthly"),
+    ("price_list", "daily"),
+]
+
+
+# ---- разделы ---------------------------------------------------------------
+# section -> (queryset, поле lastmod, имя URL, поле для reverse)
+def _sections():
+    return {
+        "products": (Product.objects.all(), "update", "product-detail", "slug"),
+        "categories": (ProductCategory.objects.all(), "update", "catalog-by-slug", "slug"),
+        "posts": (Post.objects.exclude(slug__isnull=True).exclude(slug=""),
+                  "publish_date", "post_detail", "slug"),
+    }
+
+
+def _lastmod(value):
+    return value.date().isoformat() if value else ""
+
+
+def _url(loc, lastmod="", changefreq=""):
+    parts = [f"<url><loc>{escape(loc)}</loc>"]
+    if lastmod:
+        parts.append(f"<lastmod>{lastmod}</lastmod>")
+    if changefreq:
+        parts.append(f"<changefreq>{changefreq}</changefreq>")
+    parts.append("</url>\n")
+    return "".join(parts)
+
+
+# ---- версии в кеше --------------------------------------------------------
+def _version_key(section, n=None):
+    return f"sitemap:v:{section}" if n is None else f"sitemap:v:{section}:{n}"
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(key, version, None)
+    return version
+
+
+def invalidate(section, ids=None):
+    """
+    Сбрасывает чанки раздела: только корзины переданных id, либо все
+    (ids=None — массовые изменения). Индекс сбрасывается всегда.
+    """
+    if ids is None:
+        cache.set(_version_key(section), uuid.uuid4().hex, None)
+    else:
+        cache.set_many({_version_key(section, i // CHUNK_SIZE): uuid.uuid4().hex
+                        for i in ids if i is not None}, None)
+    cache.set(_version_key("index"), uuid.uuid4().hex, None)
+
+
+def _cached(key_parts, build):
+    key = "sitemap:" + ":".join(str(p) for p in key_parts)
+    body = cache.get(key)
+    if body is None:
+        with primary():   # чанк кешируется надолго — строим с primary
+            body = build()
+        cache.set(key, body, CACHE_TTL)
+    return body
+
+
+# ---- построение ------------------------------------------------------------
+def _buckets():
+    """[(section, n, lastmod)] — одним GROUP BY на раздел."""
+    out = []
+    for section, (qs, lastmod_field, _, _) in _sections().items():
+        rows = (qs.order_by()
+                .annotate(bucket=F("id") / CHUNK_SIZE)
+                .values_list("bucket")
+                .annotate(lastmod=Max(lastmod_field))
+                .order_by("bucket"))
+        out.extend((section, bucket, lastmod) for bucket, lastmod in rows)
+    return out
+
+
+def build_index(base):
+    lines = [XML_HEADER, INDEX_OPEN,
+             f"<sitemap><loc>{escape(base)}/sitemap-pages-0.xml</loc></sitemap>\n"]
+    for section, n, lastmod in _buckets():
+        lines.append(f"<sitemap><loc>{escape(base)}/sitemap-{section}-{n}.xml</loc>")
+        if lastmod:
+            lines.append(f"<lastmod>{_lastmod(lastmod)}</lastmod>")
+        lines.append("</sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    return "".join(lines).encode("utf-8")
+
+
+def build_chunk(base, section, n):
+    lines = [XML_HEADER, URLSET_OPEN]
+    if section == "pages":
+        if n != 0:
+            return None
+        for name, changefreq in STATIC_PAGES:
+            lines.append(_url(base + reverse(name), changefreq=changefreq))
+    else:
+        qs, lastmod_field, url_name, arg_field = _sections()[section]
+        rows = (qs.filter(id__gte=n * CHUNK_SIZE, id__lt=(n + 1) * CHUNK_SIZE)
+                .order_by("id")
+                .values_list(arg_field, lastmod_field)
+                .iterator(chunk_size=2000))
+        # reverse() на каждую строку дорог — подставляем slug в шаблон пути
+        prefix, _, suffix = reverse(url_name, args=["__slug__"]).partition("__slug__")
+        count = 0
+        for slug, lastmod in rows:
+            count += 1
+            lines.append(_url(f"{base}{prefix}{slug}{suffix}", _lastmod(lastmod)))
+        if not count:
+            return None
+    lines.append("</urlset>\n")
+    return "".join(lines).encode("utf-8")
+
+
+# ---- views -----------------------------------------------------------------
+def _base(request):
+    return getattr(settings, "SITEMAP_BASE_URL", None) or f"{request.scheme}://{request.get_host()}"
+
+
+def sitemap_index(request):
+    base = _base(request)
+    body = _cached(("index", base, _version(_version_key("index"))), lambda: build_index(base))
+    return HttpResponse(body, content_type=CONTENT_TYPE)
+
+
+def sitemap_chunk(request, section, n):
+    if section != "pages" and section not in _sections():
+        raise Http404
+    base = _base(request)
+    key = (section, n, base, _version(_version_key(section)), _version(_version_key(section, n)))
+    body = _cached(key, lambda: build_chunk(base, section, n) or b"")
+    if not body:
+        raise Http404
+    return HttpResponse(body, content_type=CONTENT_TYPE)
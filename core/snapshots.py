@@ -0,0 +1,63 @@
+"""
+Снимки редко меняющихся данных в памяти процесса.
+
+Снимок строится loader-ом один раз и дальше отдаётся без SQL. Версия
+хранится в Django cache: invalidate() меняет её, и каждый процесс,
+заметив новую версию, перестраивает свой снимок. С общим кешем (Redis,
+memcached) инвалидация видна всем воркерам сразу; с LocMem — только
+текущему, остальные догонят по ttl.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from core.db_router import primary
+
+_MISSING = object()
+
+
+class ProcessSnapshot:
+    def __init__(self, name, loader, ttl=300):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.version_key = f"snapshot:{name}:version"
+        self._lock = threading.Lock()
+        self._value = _MISSING
+        self._version = None
+        self._expires = 0.0
+
+    def get(self):
+        version = cache.get(self.version_key)
+        if self._value is not _MISSING and version == self._version and time.monotonic() < self._expires:
+            return self._value
+
+        with self._lock:
+            if self._value is _MISSING or version != self._version or time.monotonic() >= self._expires:
+                with primary():   # снимок переживёт запрос — отставшая реплика не годится
+                    self._value = self.loader()
+                self._version = version
+                self._expires = time.monotonic() + self.ttl
+            return self._value
+
+    def reload(self):
+        """
+        Перестраивает снимок только этого процесса, не меняя общую версию:
+        для промаха по id, который новее снимка, — остальным воркерам
+        перечитывать незачем.
+        """
+        version = cache.get(self.version_key)
+        with self._lock:
+            with primary():
+                self._value = self.loader()
+            self._version = version
+            self._expires = time.monotonic() + self.ttl
+            return self._value
+
+    def invalidate(self, **kwargs):
+        """Подходит и как receiver сигнала, и как callback для transaction.on_commit."""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        with self._lock:
+            self._value = _MISSING
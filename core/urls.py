@@ -2,10 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.generic import TemplateView, RedirectView
+from django.views.generic import TemplateView
 
-from products.views import catalog, product_detail, catalog_root
+from products.views import catalog, product_detail, catalog_root, price_list
 from blog.views import home
+from core.metrics import metrics_view
+from core.sitemaps import sitemap_index, sitemap_chunk
+
+if getattr(settings, "ASYNC_STOREFRONT", False):
+    # под ASGI: независимые запросы страниц идут в базу параллельно
+    from products.async_views import catalog_async as catalog, product_detail_async as product_detail
 
 urlpatterns = [
     path('', home, name='home'),
@@ -16,10 +22,14 @@ urlpatterns = [
     path('api/', include('products.urls', namespace='products')),
     path('blog/', include('blog.urls')),
     path('', include('contacts.urls')),
+    path("metrics", metrics_view, name="metrics"),
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
+    path("sitemap.xml", sitemap_index, name="sitemap"),
+    path("sitemap-<slug:section>-<int:n>.xml", sitemap_chunk, name="sitemap-chunk"),
 
     # Price list
-    path('price/', RedirectView.as_view(url='/static/price/index.html', permanent=False), name='price_list'),
+    path('price/', price_list, name='price_list'),
+    path('price/<str:filename>', price_list, name='price_list_file'),
 ]
 
 if settings.DEBUG:
@@ -31,4 +31,19 @@ def category_image_upload_path(instance, filename):
     import uuid, os
     ext = filename.split('.')[-1]
     name = f"{instance.slug}-{uuid.uuid4().hex[:8]}.{ext}"
-    return os.path.join("category_images", instance.slug, name)
\ No newline at end of file
+    return os.path.join("category_images", instance.slug, name)
+
+
+# ─────────── host для django.test.Client ───────────
+def client_host():
+    """
+    Host из ALLOWED_HOSTS для Client(HTTP_HOST=…) в командах (бенчмарки, прогрев,
+    проверки). setup_test_environment() для этого не годится: он подменяет
+    почтовый бэкенд и шаблонизатор на весь процесс и падает при повторном вызове.
+    """
+    from django.conf import settings
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip(".")
+        if host and host != "*":
+            return host
+    return "localhost"   # пустой список при DEBUG и "*" пропускают localhost
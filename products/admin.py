@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 from django import forms
 from image_cropping import ImageCroppingMixin
+from core.paginator import EstimatedCountPaginator
+from . import attribute_registry
 from .models import (
     ProductCategory, Product, Attribute,
     ProductImage, ProductAttributeValue, AttributeTemplate, AttributeGroup
@@ -20,13 +23,30 @@ class ProductImageInline(ImageCroppingMixin, admin.TabularInline):
 @admin.register(ProductCategory)
 class ProductCategoryAdmin(admin.ModelAdmin):
     list_display = ("title", "slug", "parent", "thumbnail_preview")
+    list_select_related = ("parent",)
     search_fields = ("title",)
+    autocomplete_fields = ["parent"]
 
 
+class RootCategoryFilter(admin.SimpleListFilter):
+    """Фильтр по корневым категориям (с подкатегориями) вместо списка всех категорий."""
+    title = "Категория"
+    parameter_name = "root"
+
+    def lookups(self, request, model_admin):
+        return ProductCategory.objects.filter(parent__isnull=True).values_list("id", "title")
+
+    def queryset(self, request, queryset):
+        if self.value():
+            ids = [self.value(), *ProductCategory.objects.filter(parent_id=self.value())
+                   .values_list("id", flat=True)]
+            return queryset.filter(category_id__in=ids)
+        return queryset
+
 
 @admin.register(Attribute)
 class AttributeAdmin(admin.ModelAdmin):
-    search_fields = ("label",)
+    search_fields = ("name",)
 
 class ProductAttributeValueForm(forms.ModelForm):
     class Meta:
@@ -40,20 +60,60 @@ class ProductAttributeValueForm(forms.ModelForm):
         self.instance.clean()      # вызовет ValidationError при неверном типе
         return self.cleaned_data
 
+class AttributeAutocompleteSelect(AutocompleteSelect):
+    """
+    Подпись выбранного атрибута — из attribute_registry, а не запросом
+    Attribute на каждую строку инлайна (у товара 7–15 характеристик).
+    """
+
+    def optgroups(self, name, value, attr=None):
+        registry = attribute_registry.get()
+        selected = [str(v) for v in value if str(v) not in self.choices.field.empty_values]
+        infos = [registry.by_id.get(int(v)) if v.isdigit() else None for v in selected]
+        if not all(infos):   # атрибут новее снимка или мусор в POST — как в Django
+            return super().optgroups(name, value, attr)
+        options = [] if self.is_required else [self.create_option(name, "", "", False, 0)]
+        for info in infos:
+            options.append(self.create_option(name, info.id, info.name, set(selected), len(options)))
+        return [(None, options, 0)]
+
+
 class ProductAttributeInline(admin.TabularInline):
     model  = ProductAttributeValue
     form   = ProductAttributeValueForm
     extra  = 0
     autocomplete_fields = ["attribute"]
 
+    def get_queryset(self, request):
+        # __str__ строки инлайна — attribute.name
+        return super().get_queryset(request).select_related("attribute")
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "attribute":
+            kwargs["widget"] = AttributeAutocompleteSelect(db_field, self.admin_site, using=kwargs.get("using"))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "sku", "price",  )
-    list_filter = ("category", ('old_price', admin.EmptyFieldListFilter))
+    list_filter = (RootCategoryFilter, ('old_price', admin.EmptyFieldListFilter))
+    list_select_related = ("category",)
     readonly_fields = ['discount_percent', 'create', 'update']
     search_fields = ("title", "sku")
+    autocomplete_fields = ["category"]
     inlines = [ProductImageInline, ProductAttributeInline]
 
+    # большие каталоги: без второго COUNT и с оценкой/кешем основного
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if request.resolver_match.url_name.endswith("_changelist"):
+            # на списке нужны только колонки list_display
+            qs = qs.only("title", "sku", "price", "category__title")
+        return qs
+
 @admin.register(AttributeGroup)
 class AttributeGroupAdmin(admin.ModelAdmin):
     list_display = ('title', 'template')
@@ -65,4 +125,4 @@ class AttributeTemplateAdmin(admin.ModelAdmin):
     list_display = ('title', 'is_base')
     list_editable = ('is_base',)
     search_fields = ('title',)
-    filter_horizontal = ('categories',)
\ No newline at end of file
+    autocomplete_fields = ['categories']
\ No newline at end of file
@@ -0,0 +1,115 @@
+# products/async_views.py
+"""
+Async-версии страниц каталога и товара для запуска под ASGI (core/asgi.py).
+
+Логика и контекст — общие с views.py; отличие в том, что независимые
+выборки идут в базу одновременно (core.aio.gather_queries), а шаблон
+рендерится в sync-потоке. Включаются настройкой ASYNC_STOREFRONT = True
+(core/urls.py, products/urls.py); под WSGI выигрыша нет — async-view там
+выполняется через async_to_sync. Сравнение: manage.py bench_async.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import prefetch_related_objects
+from django.http import Http404
+from django.shortcuts import render
+
+from core.aio import gather_queries
+from . import attribute_registry, filter_buckets
+from .filters_config import FILTER_CONFIG
+from .models import Product, ProductCategory
+from .views import (
+    catalog_dimension_slugs, catalog_attribute_values, catalog_page, catalog_filter_values,
+    catalog_context, catalog_category_context, product_detail_context,
+    base_group_name, category_chain, tag_catalog, tag_product,
+)
+
+arender = sync_to_async(render)
+
+
+async def catalog_async(request, category_slug=None):
+    filter_config = FILTER_CONFIG.get(category_slug, FILTER_CONFIG['default'])
+    filters = catalog_filter_values(request, category_slug)
+
+    def categories():
+        return list(ProductCategory.objects.values("id", "title", "slug").order_by("title"))
+
+    def category_with_children():
+        category = ProductCategory.objects.filter(slug=category_slug).first()
+        if category is None:
+            return None, []
+        return category, list(category.children.all())
+
+    if not category_slug:
+        (cats,) = await gather_queries(categories)
+        tag_catalog(request)
+        return await arender(request, "catalog.html", catalog_context(
+            None, cats, filter_buckets.filter_config(None, {}), filters))
+
+    # 1. категория, список категорий и slug-и размеров — независимы
+    cats, (category, children), slugs = await gather_queries(
+        categories, category_with_children, catalog_dimension_slugs,
+    )
+    if category is None:
+        raise Http404("No ProductCategory matches the given query.")   # как get_object_or_404
+    if children:
+        tag_catalog(request, category, children)
+        return await arender(request, "catalog_category.html",
+                             catalog_category_context(request, category, children))
+
+    # 2. значения фильтров и страница товаров
+    attribute_values, (page_obj, products), stats = await gather_queries(
+        lambda: catalog_attribute_values(category, filter_config),
+        lambda: catalog_page([category.id], slugs, filters, filter_config,
+                             request.GET.get("ordering"), request.GET.get('page', 1)),
+        lambda: filter_buckets.get_stats(category),
+    )
+    filter_config = filter_buckets.filter_config(category_slug, stats)
+    tag_catalog(request, category, products=products)
+    return await arender(request, "catalog.html", catalog_context(
+        category, cats, filter_config, filters, products, attribute_values, page_obj))
+
+
+async def product_detail_async(request, slug):
+    (product,) = await gather_queries(
+        lambda: Product.objects.select_related("category").filter(slug=slug).first())
+    if product is None:
+        raise Http404("No Product matches the given query.")
+
+    def attribute_groups():
+        return {title: list(qs.select_related("attribute"))
+                for title, qs in product.get_attribute_groups().items()}
+
+    attributes, group_name, groups, chain, _, _ = await gather_queries(
+        lambda: list(product.attribute_values.all()),   # имена — из attribute_registry
+        base_group_name,
+        attribute_groups,
+        lambda: category_chain(product.category),
+        lambda: prefetch_related_objects([product], "images"),   # галерея в шаблоне
+        attribute_registry.get,   # снимок строится в потоке — дальше только память
+    )
+    context = product_detail_context(request, product, attributes, group_name, groups, chain)
+    tag_product(request, product, chain)
+    return await arender(request, "product.html", context)
+
+
+# ---- API (DRF) ----------------------------------------------------------------
+def async_api_view(view):
+    """
+    View DRF-ViewSet-а (router.urls) как async-view. DRF диспетчеризует только
+    синхронно, поэтому запрос целиком — аутентификация, фильтры, пагинация,
+    сериализация — выполняется в потоке пула (как выборки gather_queries), а
+    ViewSet с parallel_queries внутри запроса ведёт независимые выборки
+    одновременно (core.aio.run_queries).
+    """
+    initkwargs = dict(view.initkwargs)
+    if hasattr(view.cls, "parallel_queries"):
+        initkwargs["parallel_queries"] = True
+    view = view.cls.as_view(view.actions, **initkwargs)
+
+    async def async_view(request, *args, **kwargs):
+        (response,) = await gather_queries(lambda: view(request, *args, **kwargs))
+        return response
+
+    async_view.csrf_exempt = True   # как у view DRF
+    async_view.cls, async_view.actions, async_view.initkwargs = view.cls, view.actions, view.initkwargs
+    return async_view
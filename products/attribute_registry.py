@@ -0,0 +1,90 @@
+# products/attribute_registry.py
+"""
+Справочник атрибутов в памяти процесса: id, имя, имя в нижнем регистре,
+slug и value_type с поиском по id, имени (без учёта регистра) и slug.
+
+Атрибутов десятки, меняются они из админки — держим снимок (core.snapshots),
+версия меняется по сигналу сохранения/удаления Attribute
+(products/signals.py). Views, фильтры, сериализаторы и импорт берут
+метаданные отсюда вместо name__iexact-запросов и JOIN-ов на attribute.
+"""
+from typing import NamedTuple
+
+from core.snapshots import ProcessSnapshot
+from .models import Attribute
+
+# имена атрибутов, на которые завязаны витрина и фильтры
+LENGTH = "длина"
+WIDTH = "ширина"
+HEIGHT = "высота"
+VID = "вид"
+PODSVETKA = "подсветка"
+
+
+class AttributeInfo(NamedTuple):
+    id: int
+    name: str
+    name_lower: str
+    slug: str
+    value_type: str
+
+
+class Registry:
+    def __init__(self, infos):
+        self.by_id = {a.id: a for a in infos}
+        self.by_name = {a.name_lower: a for a in infos}
+        self.by_slug = {a.slug: a for a in infos}
+
+    def named(self, name):
+        return self.by_name.get(name.lower())
+
+
+def load_registry():
+    return Registry([
+        AttributeInfo(pk, name, name.lower(), slug, value_type)
+        for pk, name, slug, value_type in
+        Attribute.objects.order_by("id").values_list("id", "name", "slug", "value_type")
+    ])
+
+
+attributes = ProcessSnapshot("attributes", load_registry, ttl=3600)
+
+
+def get():
+    return attributes.get()
+
+
+def get_with(ids):
+    """
+    Снимок для пакета строк с FK на атрибут — один на пакет, а не на строку.
+    Если какого-то id в нём нет (атрибут новее снимка), снимок процесса
+    перечитывается один раз. Id, которого нет и после этого, вызывающий
+    пропускает: registry.by_id.get(pk) вернёт None.
+    """
+    registry = get()
+    if not registry.by_id.keys() >= set(ids):
+        registry = attributes.reload()
+    return registry
+
+
+def by_id(pk):
+    """По id из FK; None — атрибута нет и в перечитанном снимке."""
+    return get_with([pk]).by_id.get(pk)
+
+
+def by_name(name):
+    return get().named(name)
+
+
+def by_slug(slug):
+    return get().by_slug.get(slug)
+
+
+def id_of(name):
+    info = get().named(name)
+    return info.id if info else None
+
+
+def slug_of(name):
+    info = get().named(name)
+    return info.slug if info else None
@@ -0,0 +1,119 @@
+# products/cards.py
+"""
+Карточки товаров для листинга каталога, собранные заранее.
+
+Карточка — всё, что catalog.html показывает о товаре в списке: цены и
+скидка, строка размеров, вид, URL превью в порядке галереи, alt/title.
+Она хранится в Product.card (JSON): страница каталога читает 20 пар
+(id, card) без prefetch-ей и разбора характеристик; URL превью берутся по
+имени файла (thumbnail_url), сами миниатюры генерирует сохранение фото.
+
+Сигналы пересобирают карточки затронутых товаров один раз на коммит
+(товар, его фото и характеристики, переименование категории,
+catalog_changed); build_product_cards — все сразу. Товар без карточки
+(ещё не собрана) листинг собирает на лету, не записывая.
+"""
+from decimal import Decimal
+
+from core import oncommit
+from . import attribute_registry
+from .models import Product, thumbnail_url
+
+CHUNK_SIZE = 500
+
+
+def format_number(value):
+    if isinstance(value, Decimal):   # value_num — без повторного разбора строки
+        return format(value.quantize(Decimal("0.01")), "f").rstrip('0').rstrip('.')
+    try:
+        return ('{:.2f}'.format(float(value))).rstrip('0').rstrip('.')
+    except (ValueError, TypeError):
+        return str(value)
+
+
+def _attribute_value(p, attribute_id, field, default):
+    return next((getattr(a, field) for a in p.attribute_values.all() if a.attribute_id == attribute_id), default)
+
+
+def _card_attribute_ids():
+    """Id высоты, ширины, длины и вида — один раз на пакет карточек."""
+    registry = attribute_registry.get()
+    return tuple(info.id if info else None for info in map(registry.named, (
+        attribute_registry.HEIGHT, attribute_registry.WIDTH, attribute_registry.LENGTH, attribute_registry.VID)))
+
+
+def card(p, attribute_ids=None):
+    """
+    Карточка товара; p — с select_related('category') и prefetch images / attribute_values.
+    attribute_ids — из _card_attribute_ids(), если карточек собирается много.
+    """
+    height, width, length, vid = attribute_ids or _card_attribute_ids()
+    return {
+        "id": p.id,
+        "title": p.title,
+        "slug": p.slug,
+        "price": int(p.price),
+        # ===== ПОЛЯ ДЛЯ СКИДОК =====
+        "old_price": int(p.old_price) if p.old_price else None,
+        "has_discount": p.has_discount,
+        "discount_percent": p.discount_percent,
+        "discount_display": p.get_discount_display(),
+        # ======================================
+        # URL по имени файла, как sync_main_images: без генерации миниатюр
+        # (сборка идёт в on_commit и на чтении — битый исходник не должен ронять её)
+        "images": [thumbnail_url(img.image.name, "preview") for img in p.images.all()],
+        "alt": f"{p.category.title} {p.title}",
+        "title_attr": f"{p.category.title} {p.title}",
+        "category_title": p.category.title,
+        "size": " × ".join([
+            format_number(_attribute_value(p, height, "number", '')),
+            format_number(_attribute_value(p, width, "number", '')),
+            format_number(_attribute_value(p, length, "number", '')),
+        ]),
+        "type": _attribute_value(p, vid, "value", 'не указан'),
+    }
+
+
+def _products(using=None):
+    return (Product.objects.using(using).order_by("id")
+            .select_related("category").prefetch_related("images", "attribute_values"))
+
+
+# ---- сборка -----------------------------------------------------------------
+def build(product_ids=None, using="default"):
+    """Пересобирает Product.card (None — у всех товаров). Возвращает число изменённых карточек."""
+    qs = _products(using)
+    if product_ids is not None:
+        qs = qs.filter(pk__in=set(product_ids))
+    attribute_ids = _card_attribute_ids()
+    changed = 0
+    batch = []
+    for p in qs.iterator(chunk_size=CHUNK_SIZE):
+        data = card(p, attribute_ids)
+        if p.card != data:
+            p.card = data
+            batch.append(p)
+        if len(batch) >= CHUNK_SIZE:
+            Product.objects.using(using).bulk_update(batch, ["card"])
+            changed, batch = changed + len(batch), []
+    Product.objects.using(using).bulk_update(batch, ["card"])
+    return changed + len(batch)
+
+
+# ---- пересборка по коммиту --------------------------------------------------
+# Импорт сохраняет товары и фото по одному — собираем карточки один раз на коммит.
+def schedule(product_ids):
+    oncommit.batch("cards", product_ids, build)
+
+
+# ---- чтение -----------------------------------------------------------------
+def listing(rows):
+    """Карточки страницы по парам (id, card); несобранные — на лету, без записи."""
+    rows = list(rows)
+    missing = [pk for pk, data in rows if not data]
+    if missing:
+        attribute_ids = _card_attribute_ids()
+        built = {p.id: card(p, attribute_ids) for p in _products().filter(pk__in=missing)}
+    else:
+        built = {}
+    return [data or built[pk] for pk, data in rows if data or pk in built]
@@ -0,0 +1,128 @@
+# products/export.py
+"""
+Потоковая выгрузка каталога для партнёров (CSV / JSONL).
+
+Товары читаются через values().iterator(chunk_size) и обогащаются пачками:
+характеристики и превью — один запрос на пачку, а не на товар. В памяти
+одновременно держится только текущая пачка.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+
+from . import attribute_registry
+from .models import Product, ProductCategory, ProductImage, ProductAttributeValue, thumbnail_url
+
+EXPORT_FIELDS = ("id", "sku", "slug", "title", "price", "old_price", "discount_percent", "category_id")
+CHUNK_SIZE = 1000
+
+
+def category_subtree(slug):
+    """id категории и всех её потомков (дерево маленькое — собираем в памяти)."""
+    rows = list(ProductCategory.objects.values_list("id", "parent_id", "slug"))
+    root = next((cid for cid, _, s in rows if s == slug), None)
+    if root is None:
+        return None
+    children = defaultdict(list)
+    for cid, parent_id, _ in rows:
+        children[parent_id].append(cid)
+    ids, stack = [], [root]
+    while stack:
+        cid = stack.pop()
+        ids.append(cid)
+        stack.extend(children[cid])
+    return ids
+
+
+def _enrich(batch, categories, absolute):
+    ids = [row["id"] for row in batch]
+
+    rows = list(
+        ProductAttributeValue.objects.filter(product_id__in=ids)
+        .values_list("product_id", "attribute_id", "value")
+    )
+    registry = attribute_registry.get_with(attribute_id for _, attribute_id, _ in rows)
+    attrs = defaultdict(dict)
+    for product_id, attribute_id, value in rows:
+        info = registry.by_id.get(attribute_id)
+        if info is not None:     # атрибута нет и в перечитанном снимке — без колонки
+            attrs[product_id][info.name] = value
+
+    images = defaultdict(list)
+    for product_id, name in (
+        ProductImage.objects.filter(product_id__in=ids)
+        .order_by("product_id", "-is_main", "id")
+        .values_list("product_id", "image")
+    ):
+        images[product_id].append(absolute(thumbnail_url(name)))
+
+    for row in batch:
+        row["category"] = categories.get(row.pop("category_id"))
+        row["attributes"] = attrs.get(row["id"], {})
+        row["images"] = images.get(row["id"], [])
+        yield row
+
+
+def iter_products(category_ids=None, absolute=lambda url: url, chunk_size=CHUNK_SIZE):
+    categories = {
+        c["id"]: c for c in ProductCategory.objects.values("id", "title", "slug")
+    }
+    qs = Product.objects.order_by("id").values(*EXPORT_FIELDS)
+    if category_ids is not None:
+        qs = qs.filter(category_id__in=category_ids)
+
+    batch = []
+    for row in qs.iterator(chunk_size=chunk_size):
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            yield from _enrich(batch, categories, absolute)
+            batch = []
+    if batch:
+        yield from _enrich(batch, categories, absolute)
+
+
+# ---- форматы ------------------------------------------------------------
+def _str(value):
+    return "" if value is None else str(value)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        for key in ("price", "old_price"):
+            row[key] = _str(row[key]) or None      # Decimal → строка, как в API
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def csv_lines(rows):
+    attr_names = sorted(a.name for a in attribute_registry.get().by_id.values())
+    header = ["id", "sku", "slug", "title", "category", "category_slug",
+              "price", "old_price", "discount_percent", "images", *attr_names]
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=";", lineterminator="\n")
+
+    def flush():
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    writer.writerow(header)
+    yield "\ufeff" + flush()     # BOM — чтобы Excel открыл UTF-8
+    for row in rows:
+        category = row["category"] or {}
+        writer.writerow([
+            row["id"], row["sku"], row["slug"], row["title"],
+            category.get("title", ""), category.get("slug", ""),
+            _str(row["price"]), _str(row["old_price"]), _str(row["discount_percent"]),
+            " ".join(row["images"]),
+            *(row["attributes"].get(name, "") for name in attr_names),
+        ])
+        yield flush()
+
+
+FORMATS = {
+    "csv":   (csv_lines, "text/csv; charset=utf-8"),
+    "jsonl": (jsonl_lines, "application/x-ndjson; charset=utf-8"),
+}
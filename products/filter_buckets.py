@@ -0,0 +1,239 @@
+# products/filter_buckets.py
+"""
+Диапазоны фильтров каталога (цена, длина, ширина, высота) из данных.
+
+Для категории (вместе с прямыми подкатегориями — как в catalog()) по ценам
+и value_num размеров считаются min/max, квантили и гистограмма. Границы
+корзин — квартили, округлённые до двух значащих цифр; корзины без товаров
+отбрасываются. Результат лежит в CategoryFilterStats: сигналы пересчитывают
+затронутые категории после коммита, build_filter_buckets — все сразу.
+
+catalog() берёт корзины через filter_config() (чекбоксы в filter_modal.html),
+API отдаёт статистику целиком: /api/categories/<slug>/filters/.
+
+NumPy — необязательная зависимость: без неё то же самое считается на Python.
+"""
+import bisect
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from core import oncommit
+from . import attribute_registry
+from .filters_config import FILTER_CONFIG
+from .models import CategoryFilterStats, Product, ProductAttributeValue, ProductCategory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ключ фильтра -> имя атрибута (без учёта регистра)
+DIMENSIONS = {"length": attribute_registry.LENGTH, "width": attribute_registry.WIDTH,
+              "height": attribute_registry.HEIGHT}
+RANGE_KEYS = ("price", *DIMENSIONS)
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+BUCKET_QUANTILES = (0.25, 0.5, 0.75)
+HISTOGRAM_BINS = 20
+ALL_OPTION = {"label": "Все", "value": ""}
+
+
+# ---- числа ------------------------------------------------------------------
+def _num(x):
+    x = round(float(x), 2)
+    return int(x) if x == int(x) else x
+
+
+def _nice(x):
+    """Округление до двух значащих цифр: 4370 -> 4400, 23.7 -> 24."""
+    if x <= 0:
+        return 0
+    step = 10 ** max(math.floor(math.log10(x)) - 1, 0)
+    return int(round(x / step) * step)
+
+
+def _histogram_edges(lo, hi):
+    # как np.linspace(lo, hi, HISTOGRAM_BINS + 1)
+    step = (hi - lo) / HISTOGRAM_BINS
+    return [lo + i * step for i in range(HISTOGRAM_BINS)] + [hi]
+
+
+def _summary(values):
+    """(квантили QUANTILES + BUCKET_QUANTILES, счётчики гистограммы) по отсортированным values."""
+    qs = QUANTILES + BUCKET_QUANTILES
+    lo, hi = values[0], values[-1]
+    if lo == hi:
+        return [lo] * len(qs), [len(values)] + [0] * (HISTOGRAM_BINS - 1)
+    if np is not None:
+        arr = np.asarray(values, dtype=float)
+        counts, _ = np.histogram(arr, bins=HISTOGRAM_BINS, range=(lo, hi))
+        return np.quantile(arr, qs).tolist(), counts.tolist()
+
+    # линейная интерполяция — как np.quantile по умолчанию
+    last = len(values) - 1
+    quantiles = []
+    for q in qs:
+        pos = q * last
+        i = math.floor(pos)
+        j = min(i + 1, last)
+        quantiles.append(values[i] + (values[j] - values[i]) * (pos - i))
+    # индекс корзины — как в np.histogram, с поправкой по границам
+    edges = _histogram_edges(lo, hi)
+    norm = HISTOGRAM_BINS / (hi - lo)
+    counts = [0] * HISTOGRAM_BINS
+    for v in values:
+        i = min(int((v - lo) * norm), HISTOGRAM_BINS - 1)
+        if v < edges[i]:
+            i -= 1
+        elif v >= edges[i + 1] and i != HISTOGRAM_BINS - 1:
+            i += 1
+        counts[i] += 1
+    return quantiles, counts
+
+
+def _label(key, lo, hi):
+    if key == "price":
+        fmt, unit = (lambda v: f"{v:,}".replace(",", " ")), "₸"
+    elif key == "length" and all(v % 100 == 0 and v >= 1000 for v in (lo, hi) if v):
+        fmt, unit = (lambda v: f"{v / 1000:g}".replace(".", ",")), " м"
+    else:
+        fmt, unit = str, " мм"
+    if hi is None:
+        return f"От {fmt(lo)}{unit}" if lo else ALL_OPTION["label"]
+    if not lo:
+        return f"До {fmt(hi)}{unit}"
+    return f"{fmt(lo)} – {fmt(hi)}{unit}"
+
+
+def range_stats(key, values):
+    """Статистика одного фильтра: min/max, квантили, гистограмма и корзины для чекбоксов."""
+    values = sorted(float(v) for v in values)
+    if not values:
+        return None
+    lo, hi = values[0], values[-1]
+    quantiles, counts = _summary(values)
+
+    edges = sorted({e for e in map(_nice, quantiles[len(QUANTILES):]) if lo < e < hi})
+    bounds = [0, *edges, None]
+    buckets = []
+    for a, b in zip(bounds, bounds[1:]):
+        # как apply_range_filters: обе границы включительно
+        start = bisect.bisect_left(values, a)
+        end = bisect.bisect_right(values, b) if b is not None else len(values)
+        if end > start:
+            buckets.append({"label": _label(key, a, b), "value": f"{a}-{'' if b is None else b}",
+                            "count": end - start})
+
+    return {
+        "count": len(values),
+        "min": _num(lo),
+        "max": _num(hi),
+        "quantiles": {f"p{round(q * 100)}": _num(v) for q, v in zip(QUANTILES, quantiles)},
+        "histogram": {
+            "edges": [_num(e) for e in _histogram_edges(lo, hi)],
+            "counts": [int(c) for c in counts],
+        },
+        # один вариант — фильтровать нечего
+        "buckets": buckets if len(buckets) > 1 else [],
+    }
+
+
+# ---- сборка -----------------------------------------------------------------
+def _dimension_attributes():
+    """{attribute_id: ключ фильтра} для атрибутов-размеров."""
+    infos = ((key, attribute_registry.by_name(name)) for key, name in DIMENSIONS.items())
+    return {info.id: key for key, info in infos if info}
+
+
+def _scopes(category_ids=None):
+    """{категория: [она и прямые подкатегории]} для категорий category_ids (None — все)."""
+    rows = list(ProductCategory.objects.values_list("id", "parent_id"))
+    scopes = {pk: [pk] for pk, _ in rows}
+    for pk, parent_id in rows:
+        if parent_id in scopes:
+            scopes[parent_id].append(pk)
+    if category_ids is not None:
+        scopes = {pk: scopes[pk] for pk in category_ids if pk in scopes}
+    return scopes
+
+
+def compute(category_ids=None):
+    """{category_id: (число товаров, stats)} — два запроса на все категории."""
+    scopes = _scopes(category_ids)
+    wanted = {pk for scope in scopes.values() for pk in scope}
+
+    values = defaultdict(lambda: defaultdict(list))   # category_id -> key -> [числа]
+    for category_id, price in (Product.objects.filter(category_id__in=wanted)
+                               .values_list("category_id", "price").iterator(chunk_size=5000)):
+        values[category_id]["price"].append(price)
+    attributes = _dimension_attributes()
+    for category_id, attribute_id, number in (
+        ProductAttributeValue.objects
+        .filter(product__category_id__in=wanted, attribute_id__in=attributes, value_num__isnull=False)
+        .values_list("product__category_id", "attribute_id", "value_num").iterator(chunk_size=5000)
+    ):
+        values[category_id][attributes[attribute_id]].append(number)
+
+    result = {}
+    for pk, scope in scopes.items():
+        stats = {}
+        for key in RANGE_KEYS:
+            key_stats = range_stats(key, [v for c in scope for v in values[c][key]])
+            if key_stats:
+                stats[key] = key_stats
+        if stats:
+            result[pk] = (stats["price"]["count"], stats)
+    return result
+
+
+def build(category_ids=None):
+    """Пересчитывает и сохраняет статистику категорий (None — всех). Возвращает число категорий."""
+    computed = compute(category_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        CategoryFilterStats.objects.bulk_create(
+            [CategoryFilterStats(category_id=pk, products=n, stats=stats, built_at=now)
+             for pk, (n, stats) in computed.items()],
+            update_conflicts=True, unique_fields=["category"],
+            update_fields=["products", "stats", "built_at"],
+        )
+        # категории, где товаров не осталось
+        stale = CategoryFilterStats.objects.exclude(category_id__in=computed)
+        if category_ids is not None:
+            stale = stale.filter(category_id__in=category_ids)
+        stale.delete()
+    return len(computed)
+
+
+# ---- пересчёт по коммиту ----------------------------------------------------
+# Импорт сохраняет товары по одному — пересчитываем категории один раз на коммит.
+def _rebuild(category_ids):
+    # статистика родителя включает прямые подкатегории
+    parents = (ProductCategory.objects.filter(id__in=category_ids, parent__isnull=False)
+               .values_list("parent_id", flat=True))
+    build(category_ids | set(parents))
+
+
+def schedule(category_ids):
+    oncommit.batch("filter_buckets", category_ids, _rebuild)
+
+
+# ---- чтение -----------------------------------------------------------------
+def get_stats(category):
+    """
+    Сохранённая статистика категории. Пока строки нет (build_filter_buckets
+    после деплоя ещё не прошёл) — {}: на запросе не считаем, filter_config
+    отдаёт FILTER_CONFIG без корзин диапазонов.
+    """
+    return CategoryFilterStats.objects.filter(category_id=category.id).values_list("stats", flat=True).first() or {}
+
+
+def filter_config(category_slug, stats):
+    """FILTER_CONFIG категории + корзины цены и размеров из stats (формат filter_modal.html)."""
+    config = dict(FILTER_CONFIG.get(category_slug, FILTER_CONFIG["default"]))
+    for key in RANGE_KEYS:
+        buckets = (stats.get(key) or {}).get("buckets")
+        config[key] = [ALL_OPTION, *({"label": b["label"], "value": b["value"]} for b in buckets)] if buckets else []
+    return config
@@ -1,32 +1,20 @@
 # products/filters.py
 import django_filters as df
-from django.db.models import (
-    DecimalField, OuterRef, Subquery,
-)
-from django.db.models.functions import Cast
+from django.db.models import OuterRef, Subquery
 
+from . import attribute_registry
 from .models import (
     Product,
-    Attribute,
     ProductAttributeValue,
 )
 
 # ────────────────────────────────────────────────────────────────
-# Получаем slug-и основных атрибутов только один раз
-def _slug(attr_name: str) -> str | None:
-    try:
-        return Attribute.objects.only("slug").get(
-            name__iexact=attr_name
-        ).slug
-    except Attribute.DoesNotExist:
-        return None
-
-
-def get_attr_slug(dim: str) -> str | None:
-    return _slug({
-        "length": "длина",
-        "width": "ширина",
-        "height": "высота",
+# id основных атрибутов — из attribute_registry, без запроса
+def get_attr_id(dim: str) -> int | None:
+    return attribute_registry.id_of({
+        "length": attribute_registry.LENGTH,
+        "width": attribute_registry.WIDTH,
+        "height": attribute_registry.HEIGHT,
     }[dim])
 # ────────────────────────────────────────────────────────────────
 
@@ -45,42 +33,45 @@ class ProductFilter(df.FilterSet):
     height_min  = df.NumberFilter(method="min_filter")
     height_max  = df.NumberFilter(method="max_filter")
 
+    # ─ только товары со скидкой (?on_sale=true) ──────────────────
+    on_sale = df.BooleanFilter(method="on_sale_filter")
+
     # ─ сортировка с фронта (ordering=-price …) ───────────────────
     ordering = df.OrderingFilter(fields=(("price", "price"),
-                                         ("title", "title")))
+                                         ("title", "title"),
+                                         ("discount_percent", "discount_percent")))
 
     # ======== вспомогательные ========
-    def _annotate_dim(self, qs, dim_alias: str, attr_slug: str):
+    def _annotate_dim(self, qs, dim_alias: str, attr_id: int | None):
         """
         Добавляет к QuerySet аннотацию <dim_alias> (Decimal) с числовым
-        значением нужного атрибута. Выполняется ровно один раз.
+        значением нужного атрибута (value_num). Выполняется ровно один раз.
         """
         if dim_alias in qs.query.annotations:
             return qs        # уже есть
 
         sub = Subquery(
             ProductAttributeValue.objects
-            .filter(product=OuterRef("pk"), attribute__slug=attr_slug)
-            .values("value")[:1]
+            .filter(product=OuterRef("pk"), attribute_id=attr_id)
+            .values("value_num")[:1]
         )
 
-        return qs.annotate(**{
-            dim_alias: Cast(sub, DecimalField(max_digits=12, decimal_places=2))
-        })
+        return qs.annotate(**{dim_alias: sub})
+
+    def on_sale_filter(self, qs, name, value):
+        return qs.on_sale() if value else qs.filter(discount_percent__isnull=True)
 
     # ======== универсальные методы ========
     def min_filter(self, qs, name, value):
         dim = name.removesuffix("_min")  # length / width / height
-        slug = get_attr_slug(dim)
         alias = f"{dim}_num"
-        qs = self._annotate_dim(qs, alias, slug)
+        qs = self._annotate_dim(qs, alias, get_attr_id(dim))
         return qs.filter(**{f"{alias}__gte": value})
 
     def max_filter(self, qs, name, value):
         dim = name.removesuffix("_max")
-        slug = get_attr_slug(dim)
         alias = f"{dim}_num"
-        qs = self._annotate_dim(qs, alias, slug)
+        qs = self._annotate_dim(qs, alias, get_attr_id(dim))
         return qs.filter(**{f"{alias}__lte": value})
 
     # ======== Meta ========
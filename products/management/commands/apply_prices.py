@@ -0,0 +1,154 @@
+# products/management/commands/apply_prices.py
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import Product, compute_discount
+from products.signals import catalog_changed
+
+LOOKUP_CHUNK = 1000
+
+
+class Command(BaseCommand):
+    help = ("Применяет прайс поставщика к Product.price по SKU: пересчитывает old_price / "
+            "discount_percent для всех строк сразу и пишет chunked bulk_update в одной транзакции. "
+            "Есть --dry-run (только отчёт) и --apply.")
+
+    def add_arguments(self, p):
+        p.add_argument('--file', required=True, help='Путь к price.csv (UTF-8)')
+        p.add_argument('--code-col', default='Код', help='Колонка SKU')
+        p.add_argument('--price-col', default='Цена: РРЦ', help='Колонка новой цены')
+        p.add_argument('--old-price-col', default='',
+                       help='Колонка старой цены (необязательно). Без неё old_price товара сохраняется, '
+                            'а скидка пересчитывается от новой цены.')
+        p.add_argument('--dry-run', action='store_true', help='Показать изменения без записи в БД')
+        p.add_argument('--apply', action='store_true', help='Записать изменения в БД')
+        p.add_argument('--batch-size', type=int, default=500)
+        p.add_argument('--report', default='apply_prices_report.csv', help='CSV с изменениями')
+        p.add_argument('--using', default='default', help='Алиас базы (DATABASES)')
+
+    # ---------- helpers ----------
+    def _sniff(self, fobj):
+        sample = fobj.read(4096); fobj.seek(0)
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=[',',';','\t','|'])
+        except csv.Error:
+            d = csv.get_dialect('excel')
+            d.delimiter = ';'
+            return d
+
+    def _norm_key(self, s: str) -> str:
+        return (s or '').replace('﻿', '').strip().lower()
+
+    def _parse_price(self, s: str):
+        s = (s or '').strip().replace(' ', '').replace(' ', '').replace(',', '.')
+        if not s:
+            return None
+        try:
+            return Decimal(s).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None
+
+    def _read_prices(self, o):
+        try:
+            with open(o['file'], 'r', encoding='utf-8', newline='') as f:
+                rows = list(csv.reader(f, self._sniff(f)))
+        except FileNotFoundError:
+            raise CommandError(f"Файл не найден: {o['file']}")
+        if not rows:
+            raise CommandError('Пустой CSV')
+
+        header = {self._norm_key(h): i for i, h in enumerate(rows[0])}
+        code_idx = header.get(self._norm_key(o['code_col']))
+        price_idx = header.get(self._norm_key(o['price_col']))
+        old_idx = header.get(self._norm_key(o['old_price_col'])) if o['old_price_col'] else None
+        if code_idx is None or price_idx is None:
+            raise CommandError(f"Нет колонок '{o['code_col']}' / '{o['price_col']}'")
+        if o['old_price_col'] and old_idx is None:
+            raise CommandError(f"Нет колонки '{o['old_price_col']}'")
+
+        # sku -> (price, old_price | ...); при повторе побеждает последняя строка
+        prices, bad = {}, []
+        cell = lambda row, i: row[i] if i is not None and i < len(row) else ''
+        for n, row in enumerate(rows[1:], start=2):
+            sku = cell(row, code_idx).strip()
+            if not sku:
+                continue
+            price = self._parse_price(cell(row, price_idx))
+            if price is None:
+                bad.append((n, sku, cell(row, price_idx)))
+                continue
+            old_price = self._parse_price(cell(row, old_idx)) if old_idx is not None else ...
+            prices[sku] = (price, old_price)
+        return prices, bad
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        if not (o['dry_run'] ^ o['apply']):
+            raise CommandError('Нужно выбрать ровно один режим: --dry-run ИЛИ --apply')
+        using = o['using']
+
+        prices, bad = self._read_prices(o)
+        for n, sku, raw in bad:
+            self.stderr.write(f"Строка {n}: {sku} — не цена: {raw!r}")
+
+        # текущие значения — пачками по SKU
+        skus = list(prices)
+        products = []
+        for i in range(0, len(skus), LOOKUP_CHUNK):
+            products += Product.objects.using(using).filter(sku__in=skus[i:i + LOOKUP_CHUNK]).only(
+                'id', 'sku', 'title', 'category_id', 'price', 'old_price', 'discount_percent')
+        found = {p.sku for p in products}
+        not_found = [s for s in skus if s not in found]
+
+        # новые значения для всех строк разом
+        now = timezone.now()
+        changed, report = [], []
+        for p in products:
+            price, old_price = prices[p.sku]
+            if old_price is ...:
+                old_price = p.old_price
+            old_price, discount = compute_discount(price, old_price)
+            before = (p.price, p.old_price, p.discount_percent)
+            after = (price, old_price, discount)
+            if before == after:
+                continue
+            report.append({
+                'product_id': p.id, 'sku': p.sku, 'title': p.title,
+                'price': f"{p.price} → {price}",
+                'old_price': f"{p.old_price or ''} → {old_price or ''}",
+                'discount_percent': f"{p.discount_percent or ''} → {discount or ''}",
+            })
+            p.price, p.old_price, p.discount_percent, p.update = price, old_price, discount, now
+            changed.append(p)
+
+        with open(o['report'], 'w', encoding='utf-8', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=['product_id', 'sku', 'title', 'price', 'old_price', 'discount_percent'])
+            w.writeheader()
+            w.writerows(report)
+
+        for r in report[:20]:
+            self.stdout.write(f"{r['sku']}: {r['price']}; старая {r['old_price']}; скидка {r['discount_percent']}")
+        if len(report) > 20:
+            self.stdout.write(f"… и ещё {len(report) - 20} (см. {o['report']})")
+
+        if o['apply'] and changed:
+            with transaction.atomic(using=using):
+                Product.objects.using(using).bulk_update(
+                    changed, ['price', 'old_price', 'discount_percent', 'update'],
+                    batch_size=o['batch_size'])
+            # кеши каталога — один раз на всё применение
+            catalog_changed.send(
+                sender=Product,
+                category_ids={p.category_id for p in changed},
+                product_ids=[p.id for p in changed],
+            )
+
+        mode = 'Применено' if o['apply'] else 'Будет изменено (dry-run)'
+        self.stdout.write(self.style.SUCCESS(
+            f"{mode}: {len(changed)} товаров. Без изменений: {len(products) - len(changed)}. "
+            f"SKU нет в БД: {len(not_found)}. Битых цен: {len(bad)}. Отчёт: {o['report']}"
+        ))
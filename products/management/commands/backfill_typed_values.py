@@ -0,0 +1,74 @@
+# products/management/commands/backfill_typed_values.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.models import (
+    Product, ProductAttributeValue, normalize_attribute_value, typed_attribute_value,
+)
+from products.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = ("Заполняет value_num / value_bool у ProductAttributeValue по типу атрибута. "
+            "Идёт пачками по id, каждая пачка — отдельная транзакция с bulk_update.")
+
+    def add_arguments(self, p):
+        p.add_argument('--batch-size', type=int, default=2000, help='Размер пачки (строк)')
+        p.add_argument('--only-missing', action='store_true',
+                       help='Только строки с пустыми value_num и value_bool')
+        p.add_argument('--using', default='default', help='Алиас базы (DATABASES)')
+
+    def handle(self, *args, **o):
+        batch_size = o['batch_size']
+        using = o['using']
+
+        qs = (ProductAttributeValue.objects.using(using)
+              .select_related('attribute')
+              .only('id', 'product_id', 'value', 'value_num', 'value_bool', 'attribute__value_type')
+              .order_by('id'))
+        if o['only_missing']:
+            qs = qs.filter(value_num__isnull=True, value_bool__isnull=True)
+
+        last_id = 0
+        seen = updated = failed = 0
+        product_ids = set()
+        while True:
+            batch = list(qs.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            changed = []
+            for pav in batch:
+                vt = pav.attribute.value_type
+                try:
+                    typed = typed_attribute_value(vt, normalize_attribute_value(vt, pav.value))
+                except (ValueError, ArithmeticError):
+                    # значение не проходит нормализацию — оставляем пустым
+                    typed = (None, None)
+                    failed += 1
+                if typed != (pav.value_num, pav.value_bool):
+                    pav.value_num, pav.value_bool = typed
+                    changed.append(pav)
+
+            with transaction.atomic(using=using):
+                ProductAttributeValue.objects.using(using).bulk_update(
+                    changed, ['value_num', 'value_bool'], batch_size=batch_size)
+
+            seen += len(batch)
+            updated += len(changed)
+            product_ids.update(pav.product_id for pav in changed)
+            self.stdout.write(f"… до id={last_id}: просмотрено {seen}, обновлено {updated}")
+
+        # bulk_update обходит сигналы — карточки, диапазоны и счётчики одним сигналом
+        if product_ids:
+            catalog_changed.send(
+                sender=Product,
+                category_ids=set(Product.objects.using(using).filter(pk__in=product_ids)
+                                 .values_list('category_id', flat=True)),
+                product_ids=list(product_ids),
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово. Просмотрено: {seen}, обновлено: {updated}, не разобрано: {failed}"
+        ))
@@ -0,0 +1,89 @@
+# products/management/commands/bench_api_list.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.utils import client_host
+from core.renderers import OrjsonRenderer
+from products.models import Product
+from products.serializers import ProductSerializer, product_list_data
+from products.views import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = ("Стоимость сериализации списка товаров API на 100 товаров: ProductSerializer + "
+            "JSONRenderer против product_list_data + OrjsonRenderer (и промежуточный вариант). "
+            "Заодно проверяет, что ответы совпадают побайтно.")
+
+    def add_arguments(self, p):
+        p.add_argument('--products', type=int, default=100, help='Товаров на страницу')
+        p.add_argument('--pages', type=int, default=5, help='Разных страниц (подряд по id)')
+        p.add_argument('--iterations', type=int, default=10, help='Повторов на страницу')
+
+    def _pages(self, o):
+        ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:o['products'] * o['pages']])
+        if not ids:
+            raise CommandError('В базе нет товаров — сначала запустите generate_catalog.')
+        return [ids[i:i + o['products']] for i in range(0, len(ids), o['products'])]
+
+    def _variants(self, request):
+        """имя -> (сборка данных, рендерер)"""
+        def serializer(ids):
+            by_id = {p.id: p for p in ProductViewSet.queryset.filter(id__in=ids)}
+            return ProductSerializer([by_id[i] for i in ids], many=True, context={'request': request}).data
+
+        def values(ids):
+            return product_list_data(ids, request)
+
+        return {
+            'serializer+json': (serializer, JSONRenderer()),
+            'values+json': (values, JSONRenderer()),
+            'values+orjson': (values, OrjsonRenderer()),
+        }
+
+    def handle(self, *args, **o):
+        if renderers.orjson is None:
+            self.stderr.write('orjson не установлен — OrjsonRenderer работает как JSONRenderer.')
+        request = RequestFactory(HTTP_HOST=client_host()).get('/api/products/')   # для build_absolute_uri
+        pages = self._pages(o)
+        variants = self._variants(request)
+
+        # совпадение побайтно (заодно прогрев)
+        mismatched = 0
+        for ids in pages:
+            outputs = {renderer.render(build(ids)) for build, renderer in variants.values()}
+            if len(outputs) != 1:
+                mismatched += 1
+        if mismatched:
+            raise CommandError(f'Ответы различаются на {mismatched} страницах из {len(pages)}')
+
+        self.stdout.write(f"мс на 100 товаров; {len(pages)} стр. × {o['iterations']} повторов")
+        self.stdout.write(f"{'вариант':<18}{'сборка':>9}{'рендер':>9}{'всего':>9}{'SQL':>6}{'байт':>10}")
+        baseline = None
+        for name, (build, renderer) in variants.items():
+            with CaptureQueriesContext(connection) as ctx:
+                size = len(renderer.render(build(pages[0])))
+            queries = len(ctx.captured_queries)
+            build_time = render_time = 0.0
+            count = 0
+            for _ in range(o['iterations']):
+                for ids in pages:
+                    start = time.perf_counter()
+                    data = build(ids)
+                    middle = time.perf_counter()
+                    renderer.render(data)
+                    build_time += middle - start
+                    render_time += time.perf_counter() - middle
+                    count += len(ids)
+            build_ms, render_ms = build_time * 1e5 / count, render_time * 1e5 / count
+            total = build_ms + render_ms
+            baseline = baseline or total
+            self.stdout.write(f"{name:<18}{build_ms:>9.1f}{render_ms:>9.2f}{total:>9.1f}{queries:>6}{size:>10}"
+                              f"  ×{baseline / total:.1f}")
+
+        self.stdout.write(self.style.SUCCESS('Ответы совпадают побайтно.'))
@@ -0,0 +1,113 @@
+# products/management/commands/bench_async.py
+import asyncio
+import importlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import clear_url_caches, reverse
+
+from core.utils import client_host
+from products.models import Product, ProductCategory
+from .bench_views import percentile
+
+
+class Command(BaseCommand):
+    help = ("Сравнивает пропускную способность страниц каталога и товара и API товаров: sync-view через "
+            "WSGI-обработчик (пул потоков, как gunicorn gthread) и async-view (ASYNC_STOREFRONT) "
+            "через ASGI-обработчик при одинаковом числе одновременных клиентов. "
+            "Запускать на масштабированном каталоге и на PostgreSQL: SQLite сериализует запись, "
+            "а главное — задержки сети до базы, которые async-версия перекрывает.")
+
+    def add_arguments(self, p):
+        p.add_argument('--concurrency', type=int, default=8, help='Одновременных клиентов')
+        p.add_argument('--requests', type=int, default=200, help='Запросов на режим')
+        p.add_argument('--warmup', type=int, default=10, help='Прогревочных запросов (не считаются)')
+
+    def _urls(self):
+        leaf = (ProductCategory.objects.filter(children__isnull=True, products__isnull=False)
+                .order_by('id').first())
+        products = list(Product.objects.order_by('id').values_list('slug', flat=True)[:10])
+        if leaf is None or not products:
+            raise CommandError('В базе нет товаров — сначала запустите generate_catalog.')
+        catalog_url = reverse('catalog-by-slug', args=[leaf.slug])
+        api_products = reverse('products:product-list')
+        return [catalog_url, f"{catalog_url}?page=3&ordering=-price",
+                api_products, f"{api_products}?category__slug={leaf.slug}&page=2",
+                reverse('products:category-list')] + [
+            url for slug in products
+            for url in (reverse('product-detail', args=[slug]),
+                        reverse('products:product-detail', args=[slug]))]
+
+    def _use_async_views(self, enabled):
+        """Перечитывает URLconf-ы: core/urls.py и products/urls.py выбирают view по ASYNC_STOREFRONT."""
+        clear_url_caches()
+        with override_settings(ASYNC_STOREFRONT=enabled):
+            importlib.reload(importlib.import_module('products.urls'))   # include() берёт модуль из sys.modules
+            importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+
+    # ---------- режимы ----------
+    def _run_sync(self, urls, n, concurrency):
+        def worker(k):
+            client, timings = Client(HTTP_HOST=client_host()), []
+            for i in range(k, n, concurrency):
+                start = time.perf_counter()
+                response = client.get(urls[i % len(urls)])
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f"{urls[i % len(urls)]}: HTTP {response.status_code}")
+            return timings
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            return [t for ts in pool.map(worker, range(concurrency)) for t in ts]
+
+    async def _run_async(self, urls, n, concurrency):
+        async def worker(k):
+            client, timings = AsyncClient(), []
+            for i in range(k, n, concurrency):
+                start = time.perf_counter()
+                response = await client.get(urls[i % len(urls)])
+                timings.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise CommandError(f"{urls[i % len(urls)]}: HTTP {response.status_code}")
+            return timings
+
+        results = await asyncio.gather(*(worker(k) for k in range(concurrency)))
+        return [t for ts in results for t in ts]
+
+    def _report(self, label, timings, elapsed):
+        ms = [t * 1000 for t in timings]
+        self.stdout.write(
+            f"{label:<12}{len(timings) / elapsed:>10.1f}{statistics.median(ms):>10.1f}{percentile(ms, 95):>10.1f}")
+        return len(timings) / elapsed
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        urls = self._urls()
+        n, concurrency = o['requests'], o['concurrency']
+
+        self.stdout.write(f"{'режим':<12}{'req/s':>10}{'p50, мс':>10}{'p95, мс':>10}")
+        try:
+            self._use_async_views(False)
+            self._run_sync(urls, o['warmup'], concurrency)
+            start = time.perf_counter()
+            timings = self._run_sync(urls, n, concurrency)
+            sync_rps = self._report('sync/WSGI', timings, time.perf_counter() - start)
+
+            self._use_async_views(True)
+            # AsyncClient всегда шлёт host: testserver — разрешаем его только на время замера
+            with override_settings(ASYNC_STOREFRONT=True,
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                asyncio.run(self._run_async(urls, o['warmup'], concurrency))
+                start = time.perf_counter()
+                timings = asyncio.run(self._run_async(urls, n, concurrency))
+                async_rps = self._report('async/ASGI', timings, time.perf_counter() - start)
+        finally:
+            self._use_async_views(getattr(settings, 'ASYNC_STOREFRONT', False))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"async/sync: ×{async_rps / sync_rps:.2f} при {concurrency} клиентах"))
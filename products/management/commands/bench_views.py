@@ -0,0 +1,139 @@
+# products/management/commands/bench_views.py
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.utils import client_host
+from products.models import Product, ProductCategory
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def git_commit():
+    """Короткий хеш текущего коммита — baseline помнит, на каком дереве снят."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Замер горячих страниц и API через Django test client: p50/p95 латентности и число "
+            "SQL-запросов. Результат можно сохранить как baseline и сравнивать с ним последующие "
+            "прогоны. Запускать на масштабированном каталоге (generate_catalog). "
+            "Эталон в репозитории — products/bench/baseline.json: дерево до оптимизаций (коммит в "
+            "поле commit), generate_catalog --products 20000, SQLite; число SQL сравнимо везде, "
+            "миллисекунды — только на той же машине.")
+
+    def add_arguments(self, p):
+        p.add_argument('--iterations', type=int, default=30, help='Замеров на каждый URL')
+        p.add_argument('--warmup', type=int, default=3, help='Прогревочных запросов (не считаются)')
+        p.add_argument('--only', default='', help='Через запятую: имена целей, которые замерять')
+        p.add_argument('--save-baseline', metavar='PATH', help='Сохранить результаты в JSON')
+        p.add_argument('--baseline', metavar='PATH', help='Сравнить с сохранённым JSON')
+        p.add_argument('--max-regression', type=float, default=20.0,
+                       help='Допустимый рост p95, %% (при --baseline); больше — ошибка')
+
+    # ---------- цели ----------
+    def _targets(self):
+        # листовая категория с наибольшим числом товаров — худший случай для catalog()
+        leaf = (ProductCategory.objects.filter(children__isnull=True)
+                .annotate(n=Count('products')).filter(n__gt=0).order_by('-n', 'id').first())
+        product = Product.objects.order_by('id').first()
+        if leaf is None or product is None:
+            raise CommandError('В базе нет товаров — сначала запустите generate_catalog.')
+
+        catalog_url = reverse('catalog-by-slug', args=[leaf.slug])
+        api_products = reverse('products:product-list')
+        return {
+            'home': reverse('home'),
+            'catalog_root': reverse('catalog'),
+            'catalog': catalog_url,
+            'catalog_page_5': f"{catalog_url}?page=5",
+            'catalog_price': f"{catalog_url}?ordering=-price&price=0-10000",
+            'product_detail': reverse('product-detail', args=[product.slug]),
+            'api_products': api_products,
+            'api_products_search': f"{api_products}?search={product.title.split()[0]}",
+            'api_products_category': f"{api_products}?category__slug={leaf.slug}",
+            'api_categories': reverse('products:category-list'),
+        }
+
+    def _measure(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url}: HTTP {response.status_code}")
+            queries.append(len(ctx.captured_queries))
+        return {
+            'url': url,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'queries': max(queries),
+        }
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        client = Client(HTTP_HOST=client_host())
+
+        targets = self._targets()
+        if o['only']:
+            names = {n.strip() for n in o['only'].split(',')}
+            targets = {k: v for k, v in targets.items() if k in names}
+
+        results = {}
+        for name, url in targets.items():
+            results[name] = self._measure(client, url, o['iterations'], o['warmup'])
+
+        baseline = {}
+        if o['baseline']:
+            with open(o['baseline'], encoding='utf-8') as f:
+                saved = json.load(f)
+            baseline = saved['results']
+            self.stdout.write(f"baseline: коммит {saved.get('commit') or '?'}, товаров {saved.get('products')}")
+
+        self.stdout.write(f"{'цель':<24}{'p50, мс':>10}{'p95, мс':>10}{'SQL':>6}   baseline p95 / SQL")
+        regressions = []
+        for name, r in results.items():
+            line = f"{name:<24}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['queries']:>6}"
+            base = baseline.get(name)
+            if base:
+                delta = (r['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+                line += f"   {base['p95_ms']} ({delta:+.0f}%) / {base['queries']}"
+                if delta > o['max_regression'] or r['queries'] > base['queries']:
+                    regressions.append(name)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if o['save_baseline']:
+            with open(o['save_baseline'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'commit': git_commit(),
+                    'products': Product.objects.count(),
+                    'iterations': o['iterations'],
+                    'results': results,
+                }, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline сохранён: {o['save_baseline']}"))
+
+        if regressions:
+            raise CommandError(f"Регрессия относительно baseline: {', '.join(regressions)}")
@@ -0,0 +1,40 @@
+# products/management/commands/build_filter_buckets.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from products import filter_buckets
+from products.models import ProductCategory
+
+
+class Command(BaseCommand):
+    help = ("Пересчитывает диапазоны фильтров каталога (цена, длина, ширина, высота) по данным: "
+            "квантили, гистограммы и корзины для чекбоксов. Сигналы пересчитывают изменённые "
+            "категории сами; команда — после импорта в обход save() или для полной пересборки.")
+
+    def add_arguments(self, p):
+        p.add_argument('--category', action='append', default=[], help='slug категории (можно несколько раз)')
+        p.add_argument('--show', action='store_true', help='Напечатать корзины')
+
+    def handle(self, *args, **o):
+        ids = None
+        if o['category']:
+            ids = list(ProductCategory.objects.filter(slug__in=o['category']).values_list('id', flat=True))
+        start = time.perf_counter()
+        built = filter_buckets.build(ids)
+        elapsed = time.perf_counter() - start
+
+        if o['show']:
+            rows = ProductCategory.objects.filter(filter_stats__isnull=False).select_related('filter_stats')
+            if ids is not None:
+                rows = rows.filter(id__in=ids)
+            for category in rows.order_by('title'):
+                self.stdout.write(f"{category.title} ({category.filter_stats.products}):")
+                for key in filter_buckets.RANGE_KEYS:
+                    stats = category.filter_stats.stats.get(key)
+                    if stats:
+                        buckets = ", ".join(f"{b['label']} [{b['count']}]" for b in stats['buckets']) or "—"
+                        self.stdout.write(f"  {key:<7}{stats['min']}…{stats['max']}  {buckets}")
+
+        engine = "NumPy" if filter_buckets.np is not None else "Python"
+        self.stdout.write(self.style.SUCCESS(f"Категорий: {built} за {elapsed:.2f} с ({engine})."))
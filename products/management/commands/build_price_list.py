@@ -0,0 +1,28 @@
+# products/management/commands/build_price_list.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from products import pricelist
+
+
+class Command(BaseCommand):
+    help = ("Собирает прайс-лист (HTML, CSV, PDF) из БД. По умолчанию пересобирает только "
+            "секции категорий, где менялись товары; запускать по cron или после импорта цен.")
+
+    def add_arguments(self, p):
+        p.add_argument('--full', action='store_true', help='Пересобрать все секции')
+        p.add_argument('--no-pdf', action='store_true', help='Не строить PDF (оставить прежний)')
+
+    def handle(self, *args, **o):
+        start = time.perf_counter()
+        result = pricelist.build(full=o['full'], with_pdf=not o['no_pdf'])
+        if not result['files']:
+            self.stdout.write("Изменений нет — прайс-лист актуален.")
+            return
+        if not o['no_pdf'] and pricelist.PDF_NAME not in result['files']:
+            self.stderr.write("reportlab не установлен — PDF не собран.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Секций пересобрано: {result['sections']}, файлы: {', '.join(result['files'])} "
+            f"({time.perf_counter() - start:.1f} с)"
+        ))
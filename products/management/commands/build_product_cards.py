@@ -0,0 +1,25 @@
+# products/management/commands/build_product_cards.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from products import cards
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = ("Пересобирает карточки товаров для листинга каталога (Product.card): цены, размеры, "
+            "вид, превью, alt. Сигналы пересобирают изменённые товары сами; команда — после "
+            "миграции, смены формата карточки или изменений в обход save().")
+
+    def add_arguments(self, p):
+        p.add_argument('--category', action='append', default=[], help='slug категории (можно несколько раз)')
+
+    def handle(self, *args, **o):
+        ids = None
+        if o['category']:
+            ids = list(Product.objects.filter(category__slug__in=o['category']).values_list('id', flat=True))
+        start = time.perf_counter()
+        changed = cards.build(ids)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Изменено карточек: {changed} за {elapsed:.2f} с."))
@@ -0,0 +1,70 @@
+# products/management/commands/check_admin_queries.py
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.utils import client_host
+from products.models import Product
+
+# страницы, которым нужен свой бюджет (label → запросов); число запросов формы
+# товара не должно расти с числом характеристик — это проверяет products/tests.py
+BUDGETS = {}
+
+
+class Command(BaseCommand):
+    help = ("Открывает changelist каждой зарегистрированной в админке модели (и форму "
+            "изменения товара) от имени временного суперпользователя и падает, если число "
+            "SQL-запросов на страницу больше бюджета. Запускать на масштабированном каталоге "
+            "(generate_catalog): N+1 в list_display видно только на полной странице.")
+
+    def add_arguments(self, p):
+        p.add_argument('--budget', type=int, default=12, help='Запросов на страницу по умолчанию')
+        p.add_argument('--verbose-queries', action='store_true', help='Печатать SQL страниц сверх бюджета')
+
+    def _pages(self):
+        pages = []
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            label = f"{opts.app_label}.{opts.model_name}"
+            pages.append((label, reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")))
+            obj = Product.objects.order_by('pk').first() if label == 'products.product' else None
+            if obj is not None:
+                pages.append((f"{label} (форма)",
+                              reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=[obj.pk])))
+        return pages
+
+    def handle(self, *args, **o):
+        failed = []
+        with transaction.atomic():
+            user = get_user_model().objects.create_superuser(
+                'admin-query-budget', 'admin-query-budget@example.com', None)
+            client = Client(HTTP_HOST=client_host())
+            client.force_login(user)
+
+            for label, url in self._pages():
+                client.get(url)   # прогрев: кеши, ContentType, сессия
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"{url}: HTTP {response.status_code}")
+                budget = BUDGETS.get(label, o['budget'])
+                used = len(ctx.captured_queries)
+                line = f"{label:<36}{used:>4} / {budget}"
+                if used > budget:
+                    failed.append(label)
+                    self.stdout.write(self.style.ERROR(f"✗ {line}"))
+                    if o['verbose_queries']:
+                        for q in ctx.captured_queries:
+                            self.stdout.write(f"    {q['sql'][:200]}")
+                else:
+                    self.stdout.write(f"✓ {line}")
+
+            transaction.set_rollback(True)   # временного пользователя не оставляем
+
+        if failed:
+            raise CommandError(f"Бюджет запросов превышен: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('Все страницы админки в бюджете.'))
@@ -0,0 +1,78 @@
+# products/management/commands/check_db_routing.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.db_router import STICKY_COOKIE
+from core.utils import client_host
+from products.models import Product, ProductCategory
+
+
+class Command(BaseCommand):
+    help = ("Проверяет маршрутизацию чтений (core.db_router): GET-страницы витрины и API читают "
+            "с реплик, админка и management-код — с primary, после записи клиент прилипает к "
+            "primary. Локально достаточно второго алиаса на ту же базу, например "
+            "DATABASES['replica'] = {**DATABASES['default']} и DATABASE_REPLICAS = ['replica'].")
+
+    def _aliases_used(self, fn):
+        aliases = ['default', *settings.DATABASE_REPLICAS]
+        contexts = [CaptureQueriesContext(connections[a]) for a in aliases]
+        for ctx in contexts:
+            ctx.__enter__()
+        try:
+            fn()
+        finally:
+            for ctx in contexts:
+                ctx.__exit__(None, None, None)
+        return {a: len(ctx.captured_queries) for a, ctx in zip(aliases, contexts)}
+
+    def _expect(self, label, used, replica):
+        on_replica = sum(n for a, n in used.items() if a != 'default')
+        ok = used['default'] == 0 if replica else on_replica == 0
+        line = f"{label:<40}primary: {used['default']:>3}, реплики: {on_replica:>3}"
+        self.stdout.write(("✓ " if ok else self.style.ERROR("✗ ")) + line)
+        return ok
+
+    def handle(self, *args, **o):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            raise CommandError('DATABASE_REPLICAS не задан — маршрутизировать некуда.')
+
+        product = Product.objects.order_by('id').first()
+        leaf = (ProductCategory.objects.filter(children__isnull=True, products__isnull=False)
+                .order_by('id').first())
+        if product is None or leaf is None:
+            raise CommandError('В базе нет товаров — сначала наполните каталог.')
+
+        checks = []
+        client = Client(HTTP_HOST=client_host())
+        for label, url in [
+            ('catalog', reverse('catalog-by-slug', args=[leaf.slug])),
+            ('product_detail', reverse('product-detail', args=[product.slug])),
+            ('api: products', reverse('products:product-list')),
+            ('blog', reverse('post_list')),
+            ('contacts', reverse('points_of_sales')),
+        ]:
+            client.get(url)   # прогрев: снимки (core.snapshots) строятся с primary
+            used = self._aliases_used(lambda: client.get(url))
+            checks.append(self._expect(f"GET {label}", used, replica=True))
+
+        used = self._aliases_used(lambda: Product.objects.filter(pk=product.pk).exists())
+        checks.append(self._expect('вне запроса (команды, shell)', used, replica=False))
+
+        used = self._aliases_used(lambda: client.get(reverse('admin:login')))
+        checks.append(self._expect('GET /admin/', used, replica=False))
+
+        # после записи — cookie и чтения с primary
+        client.post(reverse('admin:login'), {'username': '-', 'password': '-'})
+        sticky = STICKY_COOKIE in client.cookies
+        self.stdout.write(("✓ " if sticky else self.style.ERROR("✗ ")) + "POST ставит cookie прилипания")
+        checks.append(sticky)
+        used = self._aliases_used(lambda: client.get(reverse('product-detail', args=[product.slug])))
+        checks.append(self._expect('GET после записи', used, replica=False))
+
+        if not all(checks):
+            raise CommandError('Маршрутизация чтений работает не так, как ожидается.')
+        self.stdout.write(self.style.SUCCESS('Маршрутизация реплик в порядке.'))
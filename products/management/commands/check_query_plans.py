@@ -0,0 +1,118 @@
+# products/management/commands/check_query_plans.py
+import re
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import OuterRef
+
+from products.models import (
+    Product, ProductCategory, ProductImage, ProductAttributeValue, Attribute,
+)
+
+# Большие таблицы, по которым полный скан недопустим.
+# Справочники (категории, атрибуты) маленькие — их скан планировщик выбирает сам.
+GUARDED_TABLES = {
+    Product._meta.db_table,
+    ProductImage._meta.db_table,
+    ProductAttributeValue._meta.db_table,
+}
+
+# PostgreSQL: "Seq Scan on products_product"
+PG_SEQ_SCAN = re.compile(r'Seq Scan on "?(\w+)"?')
+# SQLite: "SCAN products_product" (без USING INDEX — значит перебор всей таблицы)
+SQLITE_SCAN = re.compile(r'\bSCAN (\w+)(?: AS \w+)?(?! USING)(?:\s|$)')
+
+
+class Command(BaseCommand):
+    help = ("Снимает EXPLAIN для горячих запросов каталога / фильтров / поиска / карточки товара "
+            "и падает, если какой-то из них ушёл в полный скан большой таблицы. "
+            "Запускать на масштабированной базе: на 50 товарах планировщик "
+            "законно выбирает seq scan.")
+
+    def add_arguments(self, p):
+        p.add_argument('--using', default='default', help='Алиас базы (DATABASES)')
+        p.add_argument('--show-plans', action='store_true', help='Печатать планы целиком')
+
+    # ---------- горячие запросы ----------
+    def _queries(self, using):
+        P = Product.objects.using(using)
+        PAV = ProductAttributeValue.objects.using(using)
+
+        product = P.order_by('id').first()
+        if product is None:
+            raise CommandError('В базе нет товаров — сначала наполните каталог.')
+        category = product.category
+        category_ids = [category.id] + list(category.children.values_list('id', flat=True))
+        product_ids = list(P.filter(category_id__in=category_ids).values_list('id', flat=True)[:20])
+
+        attrs = {a.name.lower(): a for a in Attribute.objects.using(using).all()}
+        vid = attrs.get('вид')
+        length = attrs.get('длина')
+
+        queries = [
+            ("catalog: товары категории по цене",
+             P.filter(category__id__in=category_ids).order_by('price')),
+            ("catalog: товары категории по названию",
+             P.filter(category__id__in=category_ids).order_by('title')),
+            ("catalog: подкатегории",
+             ProductCategory.objects.using(using).filter(parent=category)),
+            ("catalog: prefetch изображений",
+             ProductImage.objects.using(using).filter(product_id__in=product_ids)),
+            ("catalog: prefetch характеристик",
+             PAV.filter(product_id__in=product_ids).select_related('attribute')),
+            ("detail: товар по slug",
+             P.filter(slug=product.slug)),
+            ("detail: главное изображение",
+             ProductImage.objects.using(using).filter(product=product, is_main=True)),
+            ("api: поиск по sku",
+             P.filter(sku=product.sku)),
+            ("api: товары со скидкой",
+             P.on_sale().order_by('-discount_percent')),
+        ]
+        if vid:
+            queries += [
+                ("filters: значения «вид» в категории",
+                 PAV.filter(attribute=vid, product__category=category)
+                 .values_list('value', flat=True).distinct()),
+                ("filters: товары по «вид»",
+                 P.filter(attribute_values__attribute=vid, attribute_values__value__in=['скрытый'])),
+            ]
+        if length:
+            sub = PAV.filter(product=OuterRef('pk'), attribute=length, value_num__gte=Decimal('2000'))
+            queries.append(
+                ("filters: диапазон по длине",
+                 P.filter(category__id__in=category_ids, pk__in=sub.values('product_id'))),
+            )
+        return queries
+
+    # ---------- разбор плана ----------
+    def _full_scans(self, vendor, plan):
+        if vendor == 'postgresql':
+            tables = PG_SEQ_SCAN.findall(plan)
+        elif vendor == 'sqlite':
+            tables = SQLITE_SCAN.findall(plan)
+        else:
+            raise CommandError(f'EXPLAIN-проверка не поддерживает {vendor}')
+        return sorted(set(tables) & GUARDED_TABLES)
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        using = o['using']
+        vendor = connections[using].vendor
+
+        failed = []
+        for label, qs in self._queries(using):
+            plan = qs.explain()
+            scans = self._full_scans(vendor, plan)
+            if o['show_plans']:
+                self.stdout.write(f"--- {label}\n{plan}")
+            if scans:
+                failed.append(label)
+                self.stdout.write(self.style.ERROR(f"✗ {label}: полный скан {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"✓ {label}")
+
+        if failed:
+            raise CommandError(f"Полный скан в {len(failed)} запрос(ах): {'; '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS('Все горячие запросы идут по индексам.'))
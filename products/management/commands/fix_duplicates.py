@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from products.models import ProductImage
+from products import cards
+from products.models import ProductImage, sync_main_images
 
 class Command(BaseCommand):
     help = "Автоматически перепривязывает дубликаты и формирует bash-скрипт для их удаления."
@@ -10,6 +11,7 @@ class Command(BaseCommand):
 
         dupe_groups_path = './dupe_groups.txt'
         actions = []
+        relinked = set()   # товары, у которых поменялись файлы фото
 
         with open(dupe_groups_path) as f:
             group = []
@@ -44,11 +46,17 @@ class Command(BaseCommand):
                         dup_db_path = f"product_images/{x.lstrip('./')}"
                         self.stdout.write(self.style.WARNING(
                             f"Перепривязка {dup_db_path} -> {original_db_path}"))
-                        ProductImage.objects.filter(image=dup_db_path).update(image=original_db_path)
+                        images = ProductImage.objects.filter(image=dup_db_path)
+                        relinked.update(images.values_list('product_id', flat=True))
+                        images.update(image=original_db_path)
                 # Формируем команды на удаление неиспользуемых файлов
                 for d in not_used:
                     cmd = f"rm -f media/product_images/{d}\n"
                     out.write(cmd)
                     self.stdout.write(self.style.NOTICE(cmd.strip()))
 
+        # update() обходит сигналы — URL главного фото и карточки пересчитываем сами
+        sync_main_images(relinked)
+        cards.build(relinked)
+
         self.stdout.write(self.style.SUCCESS("Файл delete_duplicates.sh создан. Запусти его на локальной машине для удаления дублей!"))
@@ -0,0 +1,170 @@
+# products/management/commands/generate_catalog.py
+import io
+import random
+from decimal import Decimal
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from easy_thumbnails.files import get_thumbnailer
+from PIL import Image
+
+from products import cards
+from products.models import (
+    Product, ProductCategory, ProductImage, ProductAttributeValue,
+    Attribute, AttributeTemplate, AttributeGroup, compute_discount,
+    normalize_attribute_value, typed_attribute_value, sync_main_images,
+)
+
+PREFIX = "gen"   # всё сгенерированное помечается slug-ом gen-…
+
+# name -> (value_type, генератор значения)
+ATTRIBUTES = {
+    "длина":     ("decimal", lambda r: r.choice(["2000", "2500", "2700", "3000", "4000"])),
+    "ширина":    ("decimal", lambda r: str(r.choice([8, 10, 12, 13, 16.74, 19, 25, 33.7, 45]))),
+    "высота":    ("decimal", lambda r: str(r.choice([6.94, 11, 15, 21.94, 32, 36.5, 44.2, 52, 80]))),
+    "вид":       ("str",     lambda r: r.choice(["теневой", "скрытый", "микро", "L-образный", "накладной"])),
+    "подсветка": ("bool",    lambda r: r.choice(["Да", "Нет"])),
+    "цвет":      ("str",     lambda r: r.choice(["черный", "белый", "серебристый", "шампань"])),
+    "покрытие":  ("str",     lambda r: r.choice(["муар", "анодированное", "порошковое"])),
+}
+GROUPS = {
+    "Размеры": ["длина", "ширина", "высота"],
+    "Основные": ["вид", "подсветка", "цвет", "покрытие"],
+}
+ROOT_TITLES = ["Молдинги", "Плинтусы", "Рейки", "Профили", "Карнизы", "Панели"]
+
+
+class Command(BaseCommand):
+    help = ("Генерирует реалистичный каталог заданного размера для нагрузочных проверок: "
+            "вложенные категории, размеры/вид/подсветка, изображения с реальными thumbnail-ами, "
+            "шаблоны и группы характеристик. Всё сгенерированное имеет slug с префиксом gen-.")
+
+    def add_arguments(self, p):
+        p.add_argument('--products', type=int, default=50_000, help='Сколько товаров создать')
+        p.add_argument('--roots', type=int, default=6, help='Корневых категорий')
+        p.add_argument('--children', type=int, default=5, help='Подкатегорий у каждого корня')
+        p.add_argument('--images', type=int, default=3, help='Изображений на товар')
+        p.add_argument('--image-pool', type=int, default=24,
+                       help='Сколько разных файлов изображений создать (товары делят их между собой)')
+        p.add_argument('--batch-size', type=int, default=2000)
+        p.add_argument('--seed', type=int, default=42)
+        p.add_argument('--clear', action='store_true', help='Сначала удалить ранее сгенерированное')
+        p.add_argument('--using', default='default', help='Алиас базы (DATABASES)')
+
+    # ---------- справочники ----------
+    def _attributes(self, using):
+        attrs = {}
+        for name, (value_type, _) in ATTRIBUTES.items():
+            attr, _ = Attribute.objects.using(using).get_or_create(
+                name=name, defaults={'value_type': value_type})
+            attrs[name] = attr
+        return attrs
+
+    def _categories(self, roots, children, using):
+        leaves = []
+        for i in range(roots):
+            title = ROOT_TITLES[i % len(ROOT_TITLES)]
+            root = ProductCategory(title=f"{title} {i + 1}", slug=f"{PREFIX}-cat-{i + 1}")
+            root.save(using=using)
+            for j in range(children):
+                child = ProductCategory(title=f"{title} {i + 1}.{j + 1}", parent=root,
+                                        slug=f"{PREFIX}-cat-{i + 1}-{j + 1}")
+                child.save(using=using)
+                leaves.append(child)
+        return leaves
+
+    def _template(self, attrs, leaves, using):
+        # product_detail ждёт базовый шаблон — делаем свой базовым, если в базе его нет
+        has_base = AttributeTemplate.objects.using(using).filter(is_base=True).exists()
+        template = AttributeTemplate(title=f"{PREFIX}: шаблон", is_base=not has_base)
+        template.save(using=using)
+        template.categories.set(leaves)
+        for title, names in GROUPS.items():
+            group = AttributeGroup.objects.using(using).create(template=template, title=title)
+            group.attributes.set([attrs[n] for n in names])
+
+    def _image_pool(self, size, rnd):
+        """Создаёт файлы-исходники и сразу их thumbnail-ы (строки easy_thumbnails)."""
+        names = []
+        for i in range(size):
+            buf = io.BytesIO()
+            color = tuple(rnd.randrange(256) for _ in range(3))
+            Image.new("RGB", (800, 800), color).save(buf, "JPEG")
+            name = default_storage.save(f"product_images/{PREFIX}/pool-{i}.jpg", ContentFile(buf.getvalue()))
+            thumbnailer = get_thumbnailer(default_storage.open(name), relative_name=name)
+            thumbnailer['default']
+            thumbnailer['preview']
+            names.append(name)
+        return names
+
+    def _clear(self, using):
+        products = Product.objects.using(using).filter(slug__startswith=f"{PREFIX}-")
+        ProductAttributeValue.objects.using(using).filter(product__in=products).delete()
+        ProductImage.objects.using(using).filter(product__in=products).delete()
+        products.delete()
+        ProductCategory.objects.using(using).filter(slug__startswith=f"{PREFIX}-", parent__isnull=False).delete()
+        ProductCategory.objects.using(using).filter(slug__startswith=f"{PREFIX}-").delete()
+        AttributeTemplate.objects.using(using).filter(title__startswith=f"{PREFIX}:").delete()
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        using = o['using']
+        rnd = random.Random(o['seed'])
+        batch = o['batch_size']
+
+        if o['clear']:
+            self._clear(using)
+            self.stdout.write("Старые сгенерированные данные удалены.")
+        if Product.objects.using(using).filter(slug__startswith=f"{PREFIX}-").exists():
+            raise CommandError("Сгенерированный каталог уже есть — запустите с --clear.")
+
+        with transaction.atomic(using=using):
+            attrs = self._attributes(using)
+            leaves = self._categories(o['roots'], o['children'], using)
+            self._template(attrs, leaves, using)
+        pool = self._image_pool(o['image_pool'], rnd)
+        self.stdout.write(f"Категорий: {len(leaves)} листовых, изображений в пуле: {len(pool)}")
+
+        created = 0
+        while created < o['products']:
+            n = min(batch, o['products'] - created)
+            with transaction.atomic(using=using):
+                products = []
+                for i in range(created, created + n):
+                    category = leaves[i % len(leaves)]
+                    price = Decimal(rnd.randrange(500, 30_000, 10))
+                    old_price = price + Decimal(rnd.randrange(100, 5000, 10)) if rnd.random() < 0.15 else None
+                    old_price, discount = compute_discount(price, old_price)   # как Product.save()
+                    products.append(Product(
+                        title=f"{category.title} модель {i + 1}",
+                        slug=f"{PREFIX}-{i + 1}",
+                        sku=f"{PREFIX}{i + 1:08d}",
+                        category=category,
+                        price=price, old_price=old_price, discount_percent=discount,
+                        description=f"Сгенерированный товар №{i + 1}",
+                    ))
+                # bulk_create без save(): slug/sku/скидка уже посчитаны выше
+                products = Product.objects.using(using).bulk_create(products, batch_size=batch)
+
+                values, images = [], []
+                for p in products:
+                    for name, (value_type, gen) in ATTRIBUTES.items():
+                        value = normalize_attribute_value(value_type, gen(rnd))
+                        value_num, value_bool = typed_attribute_value(value_type, value)
+                        values.append(ProductAttributeValue(
+                            product=p, attribute=attrs[name], value=value,
+                            value_num=value_num, value_bool=value_bool,
+                        ))
+                    for k in range(o['images']):
+                        images.append(ProductImage(product=p, image=rnd.choice(pool), is_main=(k == 0)))
+                ProductAttributeValue.objects.using(using).bulk_create(values, batch_size=batch)
+                ProductImage.objects.using(using).bulk_create(images, batch_size=batch)
+                sync_main_images([p.id for p in products], using=using)
+                cards.build([p.id for p in products], using=using)
+
+            created += n
+            self.stdout.write(f"… создано товаров: {created}")
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: {created} товаров в {len(leaves)} категориях."))
@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand
-from products.models import Product, Attribute, ProductAttributeValue, ProductCategory
+from products import attribute_registry
+from products.models import Product, Attribute, ProductCategory
+from products.services import bulk_upsert_attribute_values
+from products.signals import catalog_changed
 from decimal import Decimal
 import csv
 import os
@@ -25,6 +28,9 @@ class Command(BaseCommand):
         print('Названия товаров:', product_names)
         print('Категории:', categories)
 
+        attributes = {}   # name -> attribute_id
+        values = []       # (product_id, attribute_id, value) для bulk-записи
+
         for col_index, (product_name, category_name) in enumerate(zip(product_names, categories), start=1):
             if not product_name or not product_name.strip():
                 continue
@@ -63,19 +69,38 @@ class Command(BaseCommand):
                 #     value_type = 'str'
 
                 # Создаём характеристику при необходимости
-                attribute, attr_created = Attribute.objects.get_or_create(
-                    name=attr_name,
-                    defaults={'value_type': 'str'}
-                )
-                if attr_created:
-                    self.stdout.write(f"Создан атрибут: {attribute.name}")
-
-                pav, pav_created = ProductAttributeValue.objects.update_or_create(
-                    product=product,
-                    attribute=attribute,
-                    defaults={'value': attr_value}
-                )
-                action = 'создано' if pav_created else 'обновлено'
-                self.stdout.write(f"Значение {action}: {attribute.name} = {attr_value}")
+                attribute_id = attributes.get(attr_name)
+                if attribute_id is None:
+                    # известные атрибуты — из attribute_registry, без запроса
+                    info = attribute_registry.get().by_name.get(attr_name.lower())
+                    if info is not None and info.name == attr_name:
+                        attribute_id = info.id
+                    else:
+                        attribute, attr_created = Attribute.objects.get_or_create(
+                            name=attr_name,
+                            defaults={'value_type': 'str'}
+                        )
+                        attribute_id = attribute.pk
+                        if attr_created:
+                            self.stdout.write(f"Создан атрибут: {attribute.name}")
+                    attributes[attr_name] = attribute_id
+
+                values.append((product.pk, attribute_id, attr_value))
+
+        # Все значения — одной пачкой, с теми же правилами нормализации, что и в admin
+        report = bulk_upsert_attribute_values(values)
+        self.stdout.write(f"Значений записано: {report['saved']}")
+        # bulk-запись обходит сигналы: карточки, фильтры и счётчики — одним сигналом
+        product_ids = {product_id for product_id, _, _ in values}
+        if product_ids:
+            catalog_changed.send(
+                sender=Product,
+                category_ids=set(Product.objects.filter(pk__in=product_ids).values_list('category_id', flat=True)),
+                product_ids=list(product_ids),
+            )
+        for r in report['rejected']:
+            self.stderr.write(
+                f"Отклонено: товар {r['product_id']}, атрибут {r['attribute_id']} = {r['value']!r} — {r['error']}"
+            )
 
         self.stdout.write(self.style.SUCCESS('Импорт завершён!'))
@@ -0,0 +1,32 @@
+# products/management/commands/recompute_discounts.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products.models import Product
+from products.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = ("Пересчитывает old_price / discount_percent одним UPDATE по всем товарам "
+            "(или по категориям из --category). Нужен после queryset.update(price=…), "
+            "bulk_update и сырых импортов, которые обходят Product.save().")
+
+    def add_arguments(self, p):
+        p.add_argument('--category', type=int, action='append', default=[],
+                       help='ID категории (можно несколько раз)')
+        p.add_argument('--using', default='default', help='Алиас базы (DATABASES)')
+
+    def handle(self, *args, **o):
+        qs = Product.objects.using(o['using'])
+        if o['category']:
+            qs = qs.filter(category_id__in=o['category'])
+
+        with transaction.atomic(using=o['using']):
+            updated = qs.recompute_discounts()
+        category_ids = set(qs.values_list('category_id', flat=True).distinct())
+        catalog_changed.send(sender=Product, category_ids=category_ids, product_ids=None)
+
+        on_sale = qs.on_sale().count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересчитано товаров: {updated}, со скидкой: {on_sale}."
+        ))
@@ -0,0 +1,183 @@
+# products/management/commands/warm_catalog.py
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+
+from blog.models import Post
+from core.utils import client_host
+from products import filter_buckets
+from products.models import ProductCategory, ProductImage
+
+PRODUCT_ALIASES = ("default", "preview")
+CATEGORY_ALIASES = ("default", "preview")
+POST_ALIASES = ("blog_default",)
+ORDERINGS = ("price", "-price")
+
+
+class Command(BaseCommand):
+    help = ("Прогрев после деплоя или сброса кеша: создаёт недостающие thumbnail-ы всех "
+            "изображений, затем обходит дерево категорий и запрашивает каталог, первую страницу "
+            "каждой категории (и популярные фильтры), карточки товаров и страницы API "
+            "пулом из --workers потоков. Без --base-url страницы запрашиваются в процессе "
+            "(прогреваются общие кеши и thumbnail-ы); с --base-url — по HTTP у работающего сайта.")
+
+    def add_arguments(self, p):
+        p.add_argument('--workers', type=int, default=4, help='Одновременных запросов')
+        p.add_argument('--base-url', default='', help='Например https://decorkz.kz — прогревать по HTTP')
+        p.add_argument('--products-per-category', type=int, default=20,
+                       help='Карточек товаров на категорию (первая страница каталога); 0 — все')
+        p.add_argument('--api-pages', type=int, default=3, help='Страниц /api/products/')
+        p.add_argument('--no-filters', action='store_true', help='Не прогревать комбинации фильтров')
+        p.add_argument('--no-thumbnails', action='store_true', help='Пропустить thumbnail-ы')
+        p.add_argument('--no-pages', action='store_true', help='Пропустить страницы')
+        p.add_argument('--slowest', type=int, default=10, help='Сколько самых медленных URL показать')
+
+    # ---------- thumbnail-ы ----------
+    def _thumbnail_jobs(self):
+        """[(поле, алиасы)] — каждый исходник один раз: товары делят файлы."""
+        jobs = {}
+        for image in ProductImage.objects.only('id', 'image').iterator(chunk_size=2000):
+            jobs.setdefault(image.image.name, (image.image, PRODUCT_ALIASES))
+        for category in ProductCategory.objects.exclude(image='').only('id', 'image'):
+            jobs.setdefault(category.image.name, (category.image, CATEGORY_ALIASES))
+        for post in Post.objects.exclude(image='').only('id', 'image'):
+            jobs.setdefault(post.image.name, (post.image, POST_ALIASES))
+        return list(jobs.values())
+
+    def _warm_thumbnails(self, pool):
+        def warm(job):
+            field, alias_names = job
+            created = 0
+            try:
+                thumbnailer = get_thumbnailer(field)
+                for alias in alias_names:
+                    options = aliases.get(alias, target=thumbnailer.alias_target)
+                    if options is None:
+                        continue   # алиас не настроен в THUMBNAIL_ALIASES
+                    if thumbnailer.get_existing_thumbnail(options) is None:
+                        thumbnailer.get_thumbnail(options)
+                        created += 1
+            except Exception as exc:   # битый/отсутствующий файл не должен останавливать прогрев
+                return 0, f"{field.name}: {exc}"
+            return created, None
+
+        start = time.perf_counter()
+        jobs = self._thumbnail_jobs()
+        created, errors = 0, []
+        for n, error in pool.map(warm, jobs):
+            created += n
+            if error:
+                errors.append(error)
+        for error in errors[:20]:
+            self.stderr.write(f"thumbnail: {error}")
+        self.stdout.write(
+            f"Thumbnail-ы: исходников {len(jobs)}, создано {created}, ошибок {len(errors)} "
+            f"за {time.perf_counter() - start:.1f} с")
+
+    # ---------- страницы ----------
+    def _urls(self, o):
+        urls = [('home', reverse('home')), ('catalog', reverse('catalog'))]
+        per_category = o['products_per_category']
+
+        for category in ProductCategory.objects.order_by('id'):
+            url = reverse('catalog-by-slug', args=[category.slug])
+            urls.append(('category', url))
+            if not category.products.exists():
+                continue   # страница подкатегорий — без фильтров и товаров
+            if not o['no_filters']:
+                config = filter_buckets.filter_config(category.slug, filter_buckets.get_stats(category))
+                for key in ('price', 'length', 'width', 'height'):
+                    for option in config.get(key, []):
+                        if option['value']:
+                            urls.append(('filter', f"{url}?{key}={option['value']}"))
+                urls += [('filter', f"{url}?ordering={ordering}") for ordering in ORDERINGS]
+            # карточки — в порядке первой страницы каталога
+            slugs = category.products.order_by('id').values_list('slug', flat=True)
+            if per_category:
+                slugs = slugs[:per_category]
+            urls += [('product', reverse('product-detail', args=[slug])) for slug in slugs]
+
+        api_products = reverse('products:product-list')
+        urls += [('api', f"{api_products}?page={page}") for page in range(1, o['api_pages'] + 1)]
+        urls.append(('api', reverse('products:category-list')))
+        return urls
+
+    def _fetcher(self, base_url):
+        if base_url:
+            def fetch(url):
+                try:
+                    with urllib.request.urlopen(base_url.rstrip('/') + url, timeout=60) as response:
+                        response.read()
+                        return response.status
+                except urllib.error.HTTPError as exc:
+                    return exc.code
+            return fetch
+
+        # host из ALLOWED_HOSTS: кеши страниц и абсолютные URL API — как у боевых запросов
+        host = client_host()
+        local = threading.local()
+
+        def fetch(url):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client(HTTP_HOST=host)
+            return client.get(url).status_code
+        return fetch
+
+    def _warm_pages(self, pool, o):
+        fetch = self._fetcher(o['base_url'])
+        urls = self._urls(o)
+
+        def warm(item):
+            kind, url = item
+            start = time.perf_counter()
+            try:
+                status = fetch(url)
+            except Exception as exc:
+                status = f"ошибка: {exc}"
+            return kind, url, status, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = list(pool.map(warm, urls))
+        elapsed = time.perf_counter() - start
+
+        by_kind = defaultdict(list)
+        for kind, url, status, duration in results:
+            by_kind[kind].append(duration)
+        self.stdout.write(f"{'тип':<12}{'URL':>7}{'сумма, с':>10}{'макс, мс':>10}")
+        for kind, durations in by_kind.items():
+            self.stdout.write(f"{kind:<12}{len(durations):>7}{sum(durations):>10.1f}{max(durations) * 1000:>10.0f}")
+
+        self.stdout.write("Самые медленные:")
+        for kind, url, status, duration in sorted(results, key=lambda r: -r[3])[:o['slowest']]:
+            self.stdout.write(f"  {duration * 1000:>7.0f} мс  {status}  {url}")
+
+        failed = [(url, status) for _, url, status, _ in results if status != 200]
+        for url, status in failed[:20]:
+            self.stderr.write(f"{url}: {status}")
+        self.stdout.write(f"Страницы: {len(results)} URL за {elapsed:.1f} с, с ошибкой: {len(failed)}")
+        return failed
+
+    # ---------- main ----------
+    def handle(self, *args, **o):
+        if o['workers'] < 1:
+            raise CommandError('--workers должен быть ≥ 1')
+        failed = []
+        with ThreadPoolExecutor(o['workers']) as pool:
+            if not o['no_thumbnails']:
+                self._warm_thumbnails(pool)
+            if not o['no_pages']:
+                failed = self._warm_pages(pool, o)
+
+        if failed:
+            raise CommandError(f"Не прогрето URL: {len(failed)}")
+        self.stdout.write(self.style.SUCCESS('Прогрев завершён.'))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_discount_percent_product_old_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productattributevalue',
+            name='value_bool',
+            field=models.BooleanField(blank=True, editable=False, null=True, verbose_name='Логическое значение'),
+        ),
+        migrations.AddField(
+            model_name='productattributevalue',
+            name='value_num',
+            field=models.DecimalField(blank=True, decimal_places=4, editable=False, max_digits=14, null=True, verbose_name='Числовое значение'),
+        ),
+        migrations.AddIndex(
+            model_name='productattributevalue',
+            index=models.Index(fields=['attribute', 'value_num'], name='pav_attr_value_num_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceListSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('html', models.TextField(blank=True)),
+                ('csv', models.TextField(blank=True)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('is_dirty', models.BooleanField(db_index=True, default=True)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='price_section', to='products.productcategory')),
+            ],
+            options={
+                'verbose_name': 'Секция прайс-листа',
+                'verbose_name_plural': 'Секции прайс-листа',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_pricelistsection'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('discount_percent__isnull', False)), fields=['-discount_percent'], name='product_discount_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:57
+
+import django.db.models.deletion
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import Thumbnailer
+
+
+def thumbnail_url(name, alias="preview"):
+    """URL превью по имени исходника (как products.models.thumbnail_url на момент миграции)."""
+    if not name:
+        return ""
+    thumbnailer = Thumbnailer(file=None, name=name, source_storage=default_storage)
+    return thumbnailer.thumbnail_storage.url(thumbnailer.get_thumbnail_name(aliases.get(alias)))
+
+
+def single_main(apps, schema_editor):
+    """Перед уникальным ограничением: у товара остаётся одно главное фото (первое по id)."""
+    ProductImage = apps.get_model('products', 'ProductImage')
+    seen, demote = set(), []
+    for image_id, product_id in (ProductImage.objects.filter(is_main=True)
+                                 .order_by('product_id', 'id').values_list('id', 'product_id')):
+        if product_id in seen:
+            demote.append(image_id)
+        seen.add(product_id)
+    for i in range(0, len(demote), 1000):
+        ProductImage.objects.filter(pk__in=demote[i:i + 1000]).update(is_main=False)
+
+
+def fill_main_image(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    main = {}
+    for image_id, product_id, name in (ProductImage.objects
+                                       .order_by('product_id', '-is_main', 'id')
+                                       .values_list('id', 'product_id', 'image')):
+        main.setdefault(product_id, (image_id, name))
+    products = list(Product.objects.filter(pk__in=main).only('id'))
+    for p in products:
+        p.main_image_id, name = main[p.id]
+        p.main_image_url = thumbnail_url(name)
+    Product.objects.bulk_update(products, ['main_image', 'main_image_url'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_product_discount_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='main_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productimage'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='main_image_url',
+            field=models.CharField(blank=True, editable=False, max_length=500, verbose_name='URL превью'),
+        ),
+        migrations.RunPython(single_main, migrations.RunPython.noop),
+        migrations.RunPython(fill_main_image, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='productimage',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_main', True)), fields=('product',), name='productimage_single_main'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_product_main_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryFilterStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stats', models.JSONField(default=dict)),
+                ('products', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='filter_stats', to='products.productcategory')),
+            ],
+            options={
+                'verbose_name': 'Диапазоны фильтров',
+                'verbose_name_plural': 'Диапазоны фильтров',
+            },
+        ),
+    ]
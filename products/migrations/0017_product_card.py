@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0016_categoryfilterstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='card',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Карточка каталога'),
+        ),
+    ]
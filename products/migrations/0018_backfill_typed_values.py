@@ -0,0 +1,63 @@
+# Заполняет value_num / value_bool у строк, записанных до 0011: фильтры
+# размеров читают только value_num. Логика разбора — копия на момент
+# миграции (не импортируется из products.models, который будет меняться).
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+PLACES = Decimal("0.0001")   # decimal_places=4
+LIMIT = Decimal("1E10")      # max_digits=14
+
+
+def _typed(value_type, value):
+    value = (value or "").strip()
+    if value_type in ("int", "decimal"):
+        if value_type == "int" and not value.isdigit():
+            return None, None
+        try:
+            d = Decimal(value.replace(",", ".")).quantize(PLACES)
+        except InvalidOperation:
+            return None, None
+        return (d if d.is_finite() and abs(d) < LIMIT else None), None
+    if value_type == "bool":
+        norm = value.lower()
+        if norm in ("да", "yes", "true", "1"):
+            return None, True
+        if norm in ("нет", "no", "false", "0"):
+            return None, False
+    return None, None
+
+
+def backfill(apps, schema_editor):
+    ProductAttributeValue = apps.get_model("products", "ProductAttributeValue")
+    db = schema_editor.connection.alias
+    qs = (ProductAttributeValue.objects.using(db)
+          .filter(value_num__isnull=True, value_bool__isnull=True,
+                  attribute__value_type__in=("int", "decimal", "bool"))
+          .select_related("attribute")
+          .order_by("id"))
+    last_id = 0
+    while True:
+        batch = list(qs.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        changed = []
+        for pav in batch:
+            typed = _typed(pav.attribute.value_type, pav.value)
+            if typed != (None, None):
+                pav.value_num, pav.value_bool = typed
+                changed.append(pav)
+        ProductAttributeValue.objects.using(db).bulk_update(changed, ["value_num", "value_bool"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0017_product_card'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,17 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Cast, Round, Upper
 from django.utils import timezone
 from django.utils.safestring import mark_safe
-from easy_thumbnails.files import get_thumbnailer
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import Thumbnailer, get_thumbnailer
+from django.core.files.storage import default_storage
 from image_cropping import ImageRatioField
 from django.core.exceptions import ValidationError
 from urllib.parse import urlparse, parse_qs
 
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import functools
 import random
 import string
 
@@ -34,12 +39,14 @@ class ProductCategory(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = unique_slug(self, self.title, model=ProductCategory)
+        self.update = timezone.now()   # lastmod в sitemap.xml
         super().save(*args, **kwargs)
 
         # после обычного save прогреваем thumbnail-ы
-        if self.image and self.cropping:
+        if self.image:
             t = get_thumbnailer(self.image)
-            t['default']   # 600×600, crop = self.cropping
+            if self.cropping:
+                t['default']   # 600×600, crop = self.cropping
             t['preview']   # 320×320, crop = False
 
     # маленькая утилита
@@ -48,10 +55,11 @@ class ProductCategory(models.Model):
             return ""
         return get_thumbnailer(self.image)[alias].url
 
-    # чтобы видеть превью в админке
+    # чтобы видеть превью в админке: URL по имени файла, без генерации
+    # и запросов на каждую строку changelist-а (preview прогрет в save())
     def thumbnail_preview(self):
         if self.image:
-            url = self.thumb("preview")
+            url = thumbnail_url(self.image.name, "preview")
             return mark_safe(f'<img src="{url}" style="height:80px">')
         return "—"
     thumbnail_preview.short_description = "Превью"
@@ -76,6 +84,10 @@ class Attribute(models.Model):
     update = models.DateTimeField(default=timezone.now)
 
     class Meta:
+        indexes = [
+            # name__iexact → UPPER("name") = UPPER(%s) на PostgreSQL
+            models.Index(Upper("name"), name="attribute_name_upper_idx"),
+        ]
         verbose_name = "Атрибут"
         verbose_name_plural = "Атрибуты"
 
@@ -124,6 +136,64 @@ class AttributeGroup(models.Model):
         return f"{self.template.title} → {self.title}"
 
 # ---- PRODUCT ------------------------------------------------------------
+def compute_discount(price, old_price):
+    """
+    (old_price, discount_percent) для цены: скидка есть, только если старая
+    цена больше текущей; иначе старая цена сбрасывается. Округление — как у
+    ROUND() в SQL (половина от нуля), чтобы совпадать с recompute_discounts().
+    """
+    if old_price and price:
+        old_price_decimal = Decimal(str(old_price))
+        price_decimal = Decimal(str(price))
+
+        if old_price_decimal > price_decimal:
+            # Расчет процента скидки
+            discount = ((old_price_decimal - price_decimal) / old_price_decimal) * 100
+            return old_price, int(discount.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+        # Если старая цена меньше или равна текущей - сбрасываем скидку
+        return None, None
+    # Если нет старой цены - нет и процента скидки
+    return old_price, None
+
+
+# То же, что compute_discount(), но выражениями для queryset.update()
+_HAS_DISCOUNT = Q(old_price__isnull=False, price__gt=0, old_price__gt=F("price"))
+_DISCOUNT_RATIO = (
+    # в float: SQLite иначе приводит 100.0 к целому и делит нацело
+    Cast(F("old_price") - F("price"), models.FloatField()) * Value(100.0)
+    / Cast(F("old_price"), models.FloatField())
+)
+_DISCOUNT_EXPR = Cast(
+    # через numeric: у PostgreSQL round(numeric) — половина от нуля, как ROUND_HALF_UP
+    Round(Cast(_DISCOUNT_RATIO, models.DecimalField(max_digits=20, decimal_places=6))),
+    output_field=models.IntegerField(),
+)
+
+
+class ProductQuerySet(models.QuerySet):
+    def on_sale(self):
+        return self.filter(discount_percent__isnull=False)
+
+    def recompute_discounts(self):
+        """
+        Пересчитывает old_price / discount_percent одним UPDATE — после
+        queryset.update(price=…), bulk_update и сырых импортов, которые
+        обходят save(). Возвращает число затронутых строк.
+        """
+        return self.update(
+            old_price=Case(
+                When(_HAS_DISCOUNT, then=F("old_price")),
+                When(old_price__gt=0, price__gt=0, then=Value(None)),
+                default=F("old_price"),
+            ),
+            discount_percent=Case(
+                When(_HAS_DISCOUNT, then=_DISCOUNT_EXPR),
+                default=Value(None),
+                output_field=models.IntegerField(),
+            ),
+        )
+
+
 class Product(models.Model):
     title = models.CharField("Название товара", max_length=255)
     slug = models.SlugField(unique=True, blank=True)
@@ -154,11 +224,29 @@ class Product(models.Model):
 
     youtube_url = models.URLField("YouTube URL", blank=True, help_text="Абсолютная ссылка на видео YouTube")
 
+    # главное (или первое) изображение и URL его превью — денормализация
+    # для карточек, og:image и API; ведётся sync_main_images()
+    main_image = models.ForeignKey("ProductImage", null=True, blank=True, editable=False,
+                                   related_name="+", on_delete=models.SET_NULL)
+    main_image_url = models.CharField("URL превью", max_length=500, blank=True, editable=False)
+    # карточка для листинга каталога — ведётся products/cards.py
+    card = models.JSONField("Карточка каталога", default=dict, blank=True, editable=False)
+
     create = models.DateTimeField(default=timezone.now)
     update = models.DateTimeField(default=timezone.now)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ["title"]
+        indexes = [
+            # листинг категории с сортировкой по цене / названию
+            models.Index(fields=["category", "price"], name="product_category_price_idx"),
+            models.Index(fields=["category", "title"], name="product_category_title_idx"),
+            # «товары со скидкой» и сортировка по скидке — только строки со скидкой
+            models.Index(fields=["-discount_percent"], name="product_discount_idx",
+                         condition=Q(discount_percent__isnull=False)),
+        ]
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
 
@@ -176,23 +264,10 @@ class Product(models.Model):
                     break
 
         # ===== АВТОМАТИЧЕСКИЙ РАСЧЕТ ПРОЦЕНТА СКИДКИ =====
-        if self.old_price and self.price:
-            old_price_decimal = Decimal(str(self.old_price))
-            price_decimal = Decimal(str(self.price))
-
-            if old_price_decimal > price_decimal:
-                # Расчет процента скидки
-                discount = ((old_price_decimal - price_decimal) / old_price_decimal) * 100
-                self.discount_percent = int(round(discount))
-            else:
-                # Если старая цена меньше или равна текущей - сбрасываем скидку
-                self.old_price = None
-                self.discount_percent = None
-        else:
-            # Если нет старой цены - нет и процента скидки
-            self.discount_percent = None
+        self.old_price, self.discount_percent = compute_discount(self.price, self.old_price)
         # ================================================
 
+        self.update = timezone.now()   # lastmod в sitemap.xml
         super().save(*args, **kwargs)
 
         # переименование картинок при смене slug
@@ -251,6 +326,20 @@ class Product(models.Model):
         return self.title
 
 # ---- PRODUCT IMAGE ------------------------------------------------------
+@functools.lru_cache(maxsize=50_000)
+def thumbnail_url(name, alias="preview"):
+    """
+    URL миниатюры по имени исходника — без обращения к таблицам easy_thumbnails.
+    Имя миниатюры детерминировано (исходник + опции алиаса), поэтому годится
+    для пакетной выдачи и кешируется в процессе; сама миниатюра должна быть
+    уже сгенерирована.
+    """
+    if not name:
+        return ""
+    thumbnailer = Thumbnailer(file=None, name=name, source_storage=default_storage)
+    return thumbnailer.thumbnail_storage.url(thumbnailer.get_thumbnail_name(aliases.get(alias)))
+
+
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, related_name="images", on_delete=models.CASCADE)
     image = models.ImageField(upload_to=product_image_upload_path)
@@ -260,6 +349,14 @@ class ProductImage(models.Model):
 
     class Meta:
         ordering = ["-is_main", "id"]
+        indexes = [
+            # prefetch галереи и поиск главного фото в порядке ordering
+            models.Index(fields=["product", "-is_main", "id"], name="productimage_main_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["product"], condition=Q(is_main=True),
+                                    name="productimage_single_main"),
+        ]
         verbose_name = "Изображение товара"
         verbose_name_plural = "Изображения товара"
 
@@ -290,21 +387,125 @@ class ProductImage(models.Model):
         get_thumbnailer(self.image).clear()
         self.image.name = new_path
         super().save(update_fields=["image"])
+        thumb = get_thumbnailer(self.image)
+        thumb['default']   # default_url в API
+        thumb['preview']   # main_image_url указывает на него
 
     # ---------- admin preview --------------------------------------------
     def thumbnail_preview(self):
-        return mark_safe(f'<img src="{self.thumb("preview")}" style="height:80px">')
+        return mark_safe(f'<img src="{thumbnail_url(self.image.name, "preview")}" style="height:80px">')
     thumbnail_preview.short_description = "Превью"
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        if self.image and self.cropping:
+        if self.image:
             thumb = get_thumbnailer(self.image)
-            thumb.get_thumbnail({'size': (550, 550), 'crop': True})
+            # админка, список API и выгрузки берут URL через thumbnail_url(), без генерации
+            thumb['default']
+            thumb['preview']
+            if self.cropping:
+                thumb.get_thumbnail({'size': (550, 550), 'crop': True})
 
     def __str__(self):
         return f"{self.product} | {self.pk}"
 
+
+def sync_main_images(product_ids, using="default"):
+    """
+    Пересчитывает Product.main_image / main_image_url: главное изображение,
+    иначе первое по id (тот же порядок, что ProductImage.Meta.ordering).
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    main = {}
+    for image_id, product_id, name in (
+        ProductImage.objects.using(using)
+        .filter(product_id__in=product_ids)
+        .order_by("product_id", "-is_main", "id")
+        .values_list("id", "product_id", "image")
+    ):
+        main.setdefault(product_id, (image_id, thumbnail_url(name)))
+
+    products = list(Product.objects.using(using).filter(pk__in=product_ids)
+                    .only("id", "main_image_id", "main_image_url"))
+    changed = []
+    for p in products:
+        image_id, url = main.get(p.id, (None, ""))
+        if (p.main_image_id, p.main_image_url) != (image_id, url):
+            p.main_image_id, p.main_image_url = image_id, url
+            changed.append(p)
+    Product.objects.using(using).bulk_update(changed, ["main_image", "main_image_url"], batch_size=1000)
+
+# ---- НОРМАЛИЗАЦИЯ ЗНАЧЕНИЙ ---------------------------------------------
+# Единые правила для admin (clean), импортёров и bulk-загрузки (services)
+BOOL_TRUE  = ("да", "yes", "true", "1")
+BOOL_FALSE = ("нет", "no", "false", "0")
+
+
+def _normalize_int(v: str) -> str:
+    v = v.strip()
+    if not v.isdigit():
+        raise ValueError("Ожидается целое число")
+    return str(int(v))
+
+
+def _normalize_decimal(v: str) -> str:
+    try:
+        # «3,5» → «3.5», далее проверка
+        d = Decimal(v.strip().replace(",", "."))
+    except (InvalidOperation, ValueError):
+        raise ValueError("Ожидается десятичное число")
+    # нормализуем до строки: '3.50' → '3.5'
+    return str(d.normalize())
+
+
+def _normalize_bool(v: str) -> str:
+    norm = v.strip().lower()
+    if norm in BOOL_TRUE:
+        return "Да"
+    if norm in BOOL_FALSE:
+        return "Нет"
+    raise ValueError("Введите Да / Нет")
+
+
+VALUE_NORMALIZERS = {
+    "int":     _normalize_int,
+    "decimal": _normalize_decimal,
+    "bool":    _normalize_bool,
+}
+
+
+def normalize_attribute_value(value_type: str, value) -> str:
+    """
+    Приводит значение к каноническому виду для value_type атрибута.
+    Для str значение не меняется. При неверном формате — ValueError.
+    """
+    normalizer = VALUE_NORMALIZERS.get(value_type)
+    if normalizer is None:
+        return value
+    return normalizer(value or "")
+
+
+VALUE_NUM_PLACES = Decimal("0.0001")   # decimal_places=4 у value_num
+VALUE_NUM_LIMIT  = Decimal("1E10")     # max_digits=14 → 10 знаков до запятой
+
+
+def typed_attribute_value(value_type: str, value: str):
+    """
+    (value_num, value_bool) для уже нормализованного значения.
+    Для str — (None, None).
+    """
+    if value_type in ("int", "decimal"):
+        try:
+            d = Decimal(value).quantize(VALUE_NUM_PLACES)
+        except InvalidOperation:   # 1E+30: не влезает даже в quantize
+            return None, None
+        return (d if abs(d) < VALUE_NUM_LIMIT else None), None
+    if value_type == "bool":
+        return None, value == "Да"
+    return None, None
+
 # ---- PRODUCT ↔ ATTRIBUTE VALUE -----------------------------------------
 class ProductAttributeValue(models.Model):
     product   = models.ForeignKey(
@@ -313,8 +514,19 @@ class ProductAttributeValue(models.Model):
 
     value     = models.CharField("Значение", max_length=255)
 
+    # типизированные копии value, заполняются в clean() по attribute.value_type
+    value_num  = models.DecimalField("Числовое значение", max_digits=14, decimal_places=4,
+                                     null=True, blank=True, editable=False)
+    value_bool = models.BooleanField("Логическое значение", null=True, blank=True, editable=False)
+
     class Meta:
         unique_together = ("product", "attribute")
+        indexes = [
+            # фильтр «вид» и списки значений для фильтров
+            models.Index(fields=["attribute", "value"], name="pav_attr_value_idx"),
+            # диапазоны по размерам
+            models.Index(fields=["attribute", "value_num"], name="pav_attr_value_num_idx"),
+        ]
         verbose_name = "Характеристика товара"
         verbose_name_plural = "Характеристики товара"
 
@@ -324,35 +536,61 @@ class ProductAttributeValue(models.Model):
             return
 
         vt = self.attribute.value_type   # str / int / decimal / bool
-        v  = (self.value or "").strip()
-
-        if vt == "int":
-            if not v.isdigit():
-                raise ValidationError({"value": "Ожидается целое число"})
-            # нормализуем
-            self.value = str(int(v))
-
-        elif vt == "decimal":
-            try:
-                # «3,5» → «3.5», далее проверка
-                d = Decimal(v.replace(",", "."))
-            except (InvalidOperation, ValueError):
-                raise ValidationError({"value": "Ожидается десятичное число"})
-            # нормализуем до строки: '3.50' → '3.5'
-            self.value = str(d.normalize())
-
-        elif vt == "bool":
-            norm = v.lower()
-            if norm in ("да", "yes", "true", "1"):
-                self.value = "Да"
-            elif norm in ("нет", "no", "false", "0"):
-                self.value = "Нет"
-            else:
-                raise ValidationError({"value": "Введите Да / Нет"})
+        try:
+            self.value = normalize_attribute_value(vt, self.value)
+        except ValueError as e:
+            raise ValidationError({"value": str(e)})
+        self.value_num, self.value_bool = typed_attribute_value(vt, self.value)
+
+    @property
+    def number(self):
+        """Числовое значение (Decimal), а для нечисловых атрибутов — исходная строка."""
+        return self.value_num if self.value_num is not None else self.value
 
     def save(self, *args, **kwargs):
         self.full_clean()           # вызывает clean()
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.attribute.name}: {self.value}"
\ No newline at end of file
+        return f"{self.attribute.name}: {self.value}"
+
+
+# ---- ПРАЙС-ЛИСТ ---------------------------------------------------------
+class PriceListSection(models.Model):
+    """
+    Готовые фрагменты прайс-листа по категории (products/pricelist.py).
+    При изменении товаров категория помечается is_dirty и пересобирается
+    командой build_price_list — остальные секции берутся как есть.
+    """
+    category = models.OneToOneField(ProductCategory, related_name="price_section", on_delete=models.CASCADE)
+    html = models.TextField(blank=True)
+    csv = models.TextField(blank=True)
+    rows = models.PositiveIntegerField(default=0)
+    is_dirty = models.BooleanField(default=True, db_index=True)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Секция прайс-листа"
+        verbose_name_plural = "Секции прайс-листа"
+
+    def __str__(self):
+        return f"{self.category} ({self.rows})"
+
+
+class CategoryFilterStats(models.Model):
+    """
+    Диапазоны фильтров категории, посчитанные по данным (products/filter_buckets.py):
+    min/max, квантили, гистограмма и корзины по цене и размерам. Пересчитываются
+    сигналами после коммита и командой build_filter_buckets.
+    """
+    category = models.OneToOneField(ProductCategory, related_name="filter_stats", on_delete=models.CASCADE)
+    stats = models.JSONField(default=dict)
+    products = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Диапазоны фильтров"
+        verbose_name_plural = "Диапазоны фильтров"
+
+    def __str__(self):
+        return f"{self.category} ({self.products})"
@@ -0,0 +1,268 @@
+# products/pricelist.py
+"""
+Прайс-лист из БД: HTML, CSV и PDF.
+
+Каждая категория с товарами собирается в PriceListSection (фрагменты HTML и
+CSV). Сигналы помечают секции изменённых категорий is_dirty; build() пересобирает
+только их, склеивает готовые фрагменты в итоговые файлы и кладёт их в хранилище
+вместе с manifest.json (ETag = sha256 содержимого). PDF строится здесь же, а не
+на запросе.
+
+Хранилище: settings.STORAGES["pricelist"], если задано, иначе каталог
+settings.PRICELIST_ROOT (по умолчанию MEDIA_ROOT/pricelist). Не STATIC_ROOT:
+collectstatic копирует туда static/price и затирал бы собранные файлы.
+Файлы на диске заменяются атомарно (временное имя + rename) — запрос не
+застаёт файл удалённым.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, InvalidStorageError, storages
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import Product, ProductCategory, PriceListSection
+
+HTML_NAME = "index.html"
+CSV_NAME = "price.csv"
+PDF_NAME = "price.pdf"
+MANIFEST_NAME = "manifest.json"
+
+CONTENT_TYPES = {
+    HTML_NAME: "text/html; charset=utf-8",
+    CSV_NAME: "text/csv; charset=utf-8",
+    PDF_NAME: "application/pdf",
+}
+
+CSV_HEADER = ["Категория", "Артикул", "Наименование", "Цена", "Старая цена", "Скидка, %"]
+ROW_FIELDS = ("sku", "title", "price", "old_price", "discount_percent")
+PDF_FONT = Path(settings.BASE_DIR) / "static" / "dist" / "fonts" / "gothampro.ttf"
+
+HTML_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Прайс-лист — Decorkz.kz</title>
+<style>
+body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;margin:0;background:#f5f5f5}}
+header{{background:#fff;border-bottom:1px solid #e0e0e0;padding:12px 16px;display:flex;gap:12px;align-items:center;position:sticky;top:0}}
+header h1{{font-size:18px;margin:0;white-space:nowrap}}
+header input{{flex:1;max-width:600px;margin-left:auto;padding:10px 16px;border:0;border-radius:6px;background:#f5f5f5}}
+main{{padding:16px;max-width:1100px;margin:auto}}
+section{{background:#fff;border-radius:8px;margin-bottom:16px;padding:8px 16px}}
+h2{{font-size:16px}}
+table{{width:100%;border-collapse:collapse;font-size:14px}}
+td,th{{padding:6px 4px;border-bottom:1px solid #eee;text-align:left}}
+td.n{{text-align:right;white-space:nowrap}}
+</style>
+</head>
+<body>
+<header><h1>Прайс-лист</h1><a href="{csv}">CSV</a><a href="{pdf}">PDF</a>
+<input type="search" placeholder="Поиск по названию или артикулу" oninput="f(this.value)"></header>
+<main>
+<p>Обновлено: {built}</p>
+{sections}
+</main>
+<script>
+function f(q){{q=q.toLowerCase();document.querySelectorAll('tbody tr').forEach(function(r){{r.hidden=q&&r.textContent.toLowerCase().indexOf(q)<0}})}}
+</script>
+</body>
+</html>
+"""
+
+
+def get_storage():
+    try:
+        return storages["pricelist"]
+    except InvalidStorageError:
+        root = getattr(settings, "PRICELIST_ROOT", None) or Path(settings.MEDIA_ROOT) / "pricelist"
+        return FileSystemStorage(location=root)
+
+
+def _money(value):
+    return f"{int(value):,}".replace(",", " ") if value is not None else ""
+
+
+def _category_path(category, by_id):
+    titles = []
+    while category is not None:
+        titles.append(category.title)
+        category = by_id.get(category.parent_id)
+    return " / ".join(reversed(titles))
+
+
+# ---- секции -------------------------------------------------------------
+def _rows(category_id):
+    return (
+        Product.objects
+        .filter(category_id=category_id)
+        .order_by("title")
+        .values_list(*ROW_FIELDS)
+        .iterator(chunk_size=2000)
+    )
+
+
+def build_section(category, path):
+    html_rows = []
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=";", lineterminator="\n")
+    count = 0
+    for sku, title, price, old_price, discount in _rows(category.id):
+        count += 1
+        html_rows.append(
+            f"<tr><td>{escape(sku)}</td><td>{escape(title)}</td>"
+            f"<td class=\"n\">{_money(price)} ₸</td>"
+            f"<td class=\"n\">{_money(old_price)}</td>"
+            f"<td class=\"n\">{f'-{discount}%' if discount else ''}</td></tr>"
+        )
+        writer.writerow([path, sku, title, price, old_price or "", discount or ""])
+    html = (
+        f"<section id=\"c{category.id}\"><h2>{escape(path)}</h2><table>"
+        f"<thead><tr><th>Артикул</th><th>Наименование</th><th>Цена</th><th>Старая цена</th><th>Скидка</th></tr></thead>"
+        f"<tbody>{''.join(html_rows)}</tbody></table></section>"
+    )
+    PriceListSection.objects.update_or_create(
+        category=category,
+        defaults={"html": html, "csv": buf.getvalue(), "rows": count,
+                  "is_dirty": False, "built_at": timezone.now()},
+    )
+    return count
+
+
+def mark_dirty(category_ids):
+    ids = {i for i in category_ids if i}
+    if ids:
+        PriceListSection.objects.filter(category_id__in=ids).update(is_dirty=True)
+
+
+# ---- итоговые файлы -----------------------------------------------------
+def _write(storage, name, content: bytes):
+    if isinstance(storage, FileSystemStorage):
+        path = Path(storage.path(name))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(content)
+        if storage.file_permissions_mode is not None:
+            os.chmod(tmp, storage.file_permissions_mode)
+        os.replace(tmp, path)   # атомарно в пределах каталога
+    else:
+        # прочие хранилища не умеют rename — заменяем как есть
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content))
+    return {"etag": hashlib.sha256(content).hexdigest(), "size": len(content)}
+
+
+def _build_pdf(ordered, paths):
+    """PDF построчно по страницам; reportlab — необязательная зависимость."""
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        return None
+
+    pdfmetrics.registerFont(TTFont("GothamPro", str(PDF_FONT)))
+    out = io.BytesIO()
+    pdf = canvas.Canvas(out, pagesize=A4, invariant=1)
+    width, height = A4
+    margin, line = 36, 14
+    y = height - margin
+
+    def newline(step=line):
+        nonlocal y
+        y -= step
+        if y < margin:
+            pdf.showPage()
+            y = height - margin
+
+    for category in ordered:
+        pdf.setFont("GothamPro", 12)
+        pdf.drawString(margin, y, paths[category.id])
+        newline(line * 1.5)
+        pdf.setFont("GothamPro", 9)
+        for sku, title, price, old_price, discount in _rows(category.id):
+            pdf.drawString(margin, y, sku[:18])
+            pdf.drawString(margin + 90, y, title[:70])
+            pdf.drawRightString(width - margin - 90, y, f"{_money(price)} ₸")
+            if discount:
+                pdf.drawRightString(width - margin, y, f"{_money(old_price)} (-{discount}%)")
+            newline()
+        newline(line)
+    pdf.save()
+    return out.getvalue()
+
+
+def build(full=False, with_pdf=True, storage=None):
+    """
+    Пересобирает грязные (или все при full=True) секции и итоговые файлы.
+    Возвращает {"sections": пересобрано, "files": [...]} ; если ничего не
+    менялось и файлы на месте — файлы не трогаются.
+    """
+    storage = storage or get_storage()
+    categories = list(ProductCategory.objects.filter(products__isnull=False).distinct())
+    by_id = {c.id: c for c in ProductCategory.objects.all()}
+    paths = {c.id: _category_path(c, by_id) for c in categories}
+    ordered = sorted(categories, key=lambda c: paths[c.id])
+
+    sections = {s.category_id: s for s in PriceListSection.objects.only("category_id", "is_dirty")}
+    # секции категорий, где товаров больше нет
+    stale = set(sections) - set(paths)
+    if stale:
+        PriceListSection.objects.filter(category_id__in=stale).delete()
+
+    rebuilt = 0
+    for c in ordered:
+        section = sections.get(c.id)
+        if full or section is None or section.is_dirty:
+            build_section(c, paths[c.id])
+            rebuilt += 1
+
+    if not (full or rebuilt or stale) and storage.exists(MANIFEST_NAME):
+        return {"sections": 0, "files": []}
+
+    fragments = {s.category_id: s for s in PriceListSection.objects.all()}
+    now = timezone.localtime()
+    manifest = {"built": now.isoformat()}
+
+    html = HTML_PAGE.format(
+        csv=CSV_NAME, pdf=PDF_NAME, built=now.strftime("%d.%m.%Y %H:%M"),
+        sections="\n".join(fragments[c.id].html for c in ordered),
+    )
+    manifest[HTML_NAME] = _write(storage, HTML_NAME, html.encode("utf-8"))
+
+    header = io.StringIO()
+    csv.writer(header, delimiter=";", lineterminator="\n").writerow(CSV_HEADER)
+    body = header.getvalue() + "".join(fragments[c.id].csv for c in ordered)
+    manifest[CSV_NAME] = _write(storage, CSV_NAME, body.encode("utf-8-sig"))
+
+    if with_pdf:
+        pdf = _build_pdf(ordered, paths)
+        if pdf is not None:
+            manifest[PDF_NAME] = _write(storage, PDF_NAME, pdf)
+    elif storage.exists(MANIFEST_NAME):
+        # PDF не пересобирали — оставляем прежний
+        with storage.open(MANIFEST_NAME) as f:
+            previous = json.load(f)
+        if PDF_NAME in previous:
+            manifest[PDF_NAME] = previous[PDF_NAME]
+
+    _write(storage, MANIFEST_NAME, json.dumps(manifest).encode("utf-8"))
+    return {"sections": rebuilt, "files": [n for n in (HTML_NAME, CSV_NAME, PDF_NAME) if n in manifest]}
+
+
+def read_manifest(storage=None):
+    storage = storage or get_storage()
+    if not storage.exists(MANIFEST_NAME):
+        return {}
+    with storage.open(MANIFEST_NAME) as f:
+        return json.load(f)
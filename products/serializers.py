@@ -1,9 +1,13 @@
+from collections import defaultdict
+
+from django.db.models import Manager
 from rest_framework import serializers
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
+from . import attribute_registry
 from .models import (
     Product, ProductCategory,
-    ProductImage, ProductAttributeValue
+    ProductImage, ProductAttributeValue, thumbnail_url
 )
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -24,45 +28,86 @@ class ProductImageSerializer(serializers.ModelSerializer):
     def get_preview_url(self, obj):
         return self._abs(obj.thumb("preview"))
 
+class ProductAttributeValueListSerializer(serializers.ListSerializer):
+    """Снимок атрибутов берётся один раз на список; строки неизвестных атрибутов пропускаются."""
+
+    def to_representation(self, data):
+        values = list(data.all() if isinstance(data, Manager) else data)
+        registry = attribute_registry.get_with(v.attribute_id for v in values)
+        return [
+            attribute_data(info, v.value, v.value_num, v.value_bool)
+            for v in values if (info := registry.by_id.get(v.attribute_id))
+        ]
+
+
 class ProductAttributeValueSerializer(serializers.ModelSerializer):
     # ← название атрибута одной строкой
-    attribute = serializers.CharField(source="attribute.name", read_only=True)
-    value     = serializers.SerializerMethodField()
+    # (имя и тип — из attribute_registry, без JOIN-а на attribute)
+    attribute = serializers.CharField(read_only=True)
+    value     = serializers.JSONField(read_only=True)
 
     class Meta:
         model  = ProductAttributeValue
         fields = ("attribute", "value")
+        list_serializer_class = ProductAttributeValueListSerializer
+
+    def to_representation(self, obj):
+        info = attribute_registry.by_id(obj.attribute_id)
+        return attribute_data(info, obj.value, obj.value_num, obj.value_bool) if info else None
+
+
+def attribute_data(info, value, value_num, value_bool):
+    return {"attribute": info.name, "value": attribute_value(info.value_type, value, value_num, value_bool)}
 
-    def get_value(self, obj):
-        vt = obj.attribute.value_type
-        v  = (obj.value or "").strip()
 
-        if vt == "int":
-            return int(v) if v.isdigit() else None
+def attribute_value(vt, value, value_num, value_bool):
+    """Значение характеристики в API по типу атрибута (общее для сериализатора и product_list_data)."""
+    # типизированные колонки (заполняются в clean / backfill_typed_values)
+    if vt in ("int", "decimal") and value_num is not None:
+        d = value_num
+        return int(d) if d == d.to_integral() else float(d.normalize())
 
-        if vt == "decimal":
-            try:
-                d = Decimal(v.replace(",", "."))
-                # убираем экспоненту
-                d = d.quantize(Decimal('1.'), rounding=ROUND_HALF_UP) if d == d.to_integral() else d.normalize()
-                return float(d) if d.as_tuple().exponent else int(d)
-            except (InvalidOperation, ValueError):
-                return v     # оставим как строку, если не парсится
+    if vt == "bool" and value_bool is not None:
+        return value_bool
 
-        if vt == "bool":
-            return v.lower() in ("да", "yes", "true", "1")
+    # строки, ещё не прошедшие backfill, — разбираем как раньше
+    v  = (value or "").strip()
 
-        return v            # тип str
+    if vt == "int":
+        return int(v) if v.isdigit() else None
+
+    if vt == "decimal":
+        try:
+            d = Decimal(v.replace(",", "."))
+            # убираем экспоненту
+            d = d.quantize(Decimal('1.'), rounding=ROUND_HALF_UP) if d == d.to_integral() else d.normalize()
+            return float(d) if d.as_tuple().exponent else int(d)
+        except (InvalidOperation, ValueError):
+            return v     # оставим как строку, если не парсится
+
+    if vt == "bool":
+        return v.lower() in ("да", "yes", "true", "1")
+
+    return v            # тип str
 
 
 class ProductSerializer(serializers.ModelSerializer):
     category = serializers.SerializerMethodField()
+    main_image = serializers.SerializerMethodField()
     images = ProductImageSerializer(many=True, read_only=True)
     attributes = ProductAttributeValueSerializer(source="attribute_values", many=True, read_only=True)
 
     class Meta:
         model = Product
-        fields = ["id", "title", "sku", "slug", "description", "price", "category", "images", "attributes"]
+        fields = ["id", "title", "sku", "slug", "description", "price", "category",
+                  "main_image", "images", "attributes"]
+
+    def get_main_image(self, obj):
+        # превью главного фото из денормализованного поля — без обращения к images
+        if not obj.main_image_url:
+            return None
+        req = self.context.get("request")
+        return req.build_absolute_uri(obj.main_image_url) if req else obj.main_image_url
 
     def get_category(self, obj):
         if obj.category:
@@ -73,6 +118,90 @@ class ProductSerializer(serializers.ModelSerializer):
             }
         return None
 
+# ---- быстрый список --------------------------------------------------------
+PRODUCT_LIST_FIELDS = ("id", "title", "sku", "slug", "description", "price",
+                       "category_id", "main_image_url")
+
+
+def _in_order(*fns):
+    return [fn() for fn in fns]
+
+
+def product_list_data(ids, request=None, gather=_in_order):
+    """
+    То же, что ProductSerializer(many=True).data для товаров ids (в их порядке),
+    но из values() и трёх пакетных запросов — без экземпляров моделей и
+    вложенных сериализаторов. URL-ы миниатюр строятся по имени файла
+    (thumbnail_url), поэтому миниатюры должны быть уже созданы (warm_catalog);
+    совпадение с сериализатором проверяет manage.py bench_api_list.
+
+    gather(*fns) выполняет независимые выборки (товары, фото, характеристики):
+    по умолчанию по очереди, в async-API — одновременно (core.aio.run_queries).
+    """
+    absolute = request.build_absolute_uri if request else (lambda url: url)
+    price = ProductSerializer().fields["price"]   # тот же формат Decimal, что в сериализаторе
+
+    def products():
+        rows = {r["id"]: r for r in Product.objects.filter(id__in=ids).values(*PRODUCT_LIST_FIELDS)}
+        categories = {
+            c["id"]: c for c in ProductCategory.objects
+            .filter(id__in={r["category_id"] for r in rows.values()})
+            .values("id", "title", "slug")
+        }
+        return rows, categories
+
+    def images():
+        images = defaultdict(list)
+        for image_id, product_id, name, is_main in (
+            ProductImage.objects.filter(product_id__in=ids)
+            .order_by("product_id", "-is_main", "id")          # как ProductImage.Meta.ordering
+            .values_list("id", "product_id", "image", "is_main")
+        ):
+            images[product_id].append({
+                "id": image_id,
+                "default_url": absolute(thumbnail_url(name, "default")),
+                "preview_url": absolute(thumbnail_url(name, "preview")),
+                "is_main": is_main,
+            })
+        return images
+
+    def attributes():
+        rows = list(
+            ProductAttributeValue.objects.filter(product_id__in=ids)
+            .order_by("product_id", "id")
+            .values_list("product_id", "attribute_id", "value", "value_num", "value_bool")
+        )
+        registry = attribute_registry.get_with(row[1] for row in rows)
+        attributes = defaultdict(list)
+        for product_id, attribute_id, value, value_num, value_bool in rows:
+            info = registry.by_id.get(attribute_id)
+            if info is not None:     # как ProductAttributeValueListSerializer
+                attributes[product_id].append(attribute_data(info, value, value_num, value_bool))
+        return attributes
+
+    (rows, categories), images, attributes = gather(products, images, attributes)
+
+    data = []
+    for pk in ids:
+        row = rows.get(pk)
+        if row is None:     # удалён между страницей и выборкой
+            continue
+        main_image_url = row["main_image_url"]
+        data.append({
+            "id": pk,
+            "title": row["title"],
+            "sku": row["sku"],
+            "slug": row["slug"],
+            "description": row["description"],
+            "price": price.to_representation(row["price"]),
+            "category": categories.get(row["category_id"]),
+            "main_image": absolute(main_image_url) if main_image_url else None,
+            "images": images.get(pk, []),
+            "attributes": attributes.get(pk, []),
+        })
+    return data
+
+
 # products/serializers.py
 class CategorySerializer(serializers.ModelSerializer):
     image_default = serializers.SerializerMethodField()
@@ -1,12 +1,33 @@
+import functools
+from collections import defaultdict
+
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import filters
+from django.conf import settings
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Product
+from core.paginator import CachedCountPaginator
+from . import attribute_registry
+from .models import (
+    Product, Attribute, ProductAttributeValue, VALUE_NORMALIZERS, typed_attribute_value,
+)
 from .serializers import ProductSerializer
 
 
+# ---- ПАГИНАЦИЯ ------------------------------------------------------------
+# области версий счётчиков (core.paginator.invalidate_counts, сбрасывают сигналы):
+# COUNTS_ALL — любое изменение товаров (API), category-<id> — товары категории,
+# COUNTS_CATALOG — массовые изменения без списка категорий
+COUNTS_ALL = "products"
+COUNTS_CATALOG = "catalog"
+
+
+def catalog_count_scopes(category_ids):
+    return [COUNTS_CATALOG, *(f"category-{pk}" for pk in sorted(category_ids))]
+
+
 class StandardResultsSetPagination(PageNumberPagination):
     """
     Универсальная пагинация:
@@ -19,6 +40,26 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class CachedCountPagination(StandardResultsSetPagination):
+    """
+    StandardResultsSetPagination с COUNT из кеша (core.paginator.CachedCountPaginator):
+    ключ — query-параметры без page/page_size/ordering, сброс — по версии COUNTS_ALL.
+    """
+    ignored_params = ("page", "page_size", "ordering", "format")
+
+    @property
+    def django_paginator_class(self):
+        # self.request выставляет paginate_queryset до создания пагинатора
+        params = self.request.query_params
+        state = sorted((k, sorted(set(params.getlist(k)))) for k in params if k not in self.ignored_params)
+        return functools.partial(
+            CachedCountPaginator,
+            count_key=f"api|{state}",
+            scopes=[COUNTS_ALL],
+            approximate=getattr(settings, "CATALOG_APPROXIMATE_COUNTS", False),
+        )
+
+
 class ProductViewSet(ReadOnlyModelViewSet):
     """
     Только чтение (GET /list, GET /detail) — безопасно для PIM‑витрины.
@@ -47,3 +88,91 @@ class ProductViewSet(ReadOnlyModelViewSet):
     }
     search_fields = ["sku", "name", "description"]
     ordering_fields = ["price", "name"]
+
+
+# ---- BULK-ЗАГРУЗКА ХАРАКТЕРИСТИК ----------------------------------------
+def bulk_upsert_attribute_values(rows, *, batch_size=1000, using="default"):
+    """
+    Массовая запись ProductAttributeValue без full_clean() на каждую строку.
+
+    rows — итерируемое (product_id, attribute_id, value).
+    Значения группируются по атрибуту и нормализуются «колонкой» тем же
+    нормализатором, что и в ProductAttributeValue.clean(). FK проверяются
+    одним запросом на товары и одним на атрибуты. Запись —
+    bulk_create(update_conflicts=True) по (product, attribute).
+
+    Возвращает {"saved": int, "rejected": [{row, product_id, attribute_id, value, error}]}
+    """
+    rows = list(rows)
+    rejected = []
+    max_len = ProductAttributeValue._meta.get_field("value").max_length
+
+    attr_ids = {r[1] for r in rows}
+    attr_types = {}
+    if using == "default":
+        # основная база — типы из attribute_registry, в БД только неизвестные ему id
+        registry = attribute_registry.get().by_id
+        attr_types = {pk: registry[pk].value_type for pk in attr_ids if pk in registry}
+    attr_types.update(
+        Attribute.objects.using(using)
+        .filter(pk__in=attr_ids - attr_types.keys())
+        .values_list("id", "value_type")
+    )
+    product_ids = set(
+        Product.objects.using(using)
+        .filter(pk__in={r[0] for r in rows})
+        .values_list("id", flat=True)
+    )
+
+    # группируем по атрибуту: attribute_id -> [(row_no, product_id, value)]
+    columns = defaultdict(list)
+    for row_no, (product_id, attribute_id, value) in enumerate(rows, start=1):
+        if product_id not in product_ids:
+            error = "Товар не найден"
+        elif attribute_id not in attr_types:
+            error = "Атрибут не найден"
+        else:
+            columns[attribute_id].append((row_no, product_id, value))
+            continue
+        rejected.append({"row": row_no, "product_id": product_id,
+                         "attribute_id": attribute_id, "value": value, "error": error})
+
+    # (product_id, attribute_id) -> value; при повторе побеждает последняя строка
+    clean_rows = {}
+    for attribute_id, column in columns.items():
+        value_type = attr_types[attribute_id]
+        normalizer = VALUE_NORMALIZERS.get(value_type)
+        for row_no, product_id, value in column:
+            try:
+                value = normalizer(value or "") if normalizer else value
+            except ValueError as e:
+                error = str(e)
+            else:
+                if not value:
+                    error = "Пустое значение"
+                elif len(value) > max_len:
+                    error = f"Длиннее {max_len} символов"
+                else:
+                    clean_rows[(product_id, attribute_id)] = value
+                    continue
+            rejected.append({"row": row_no, "product_id": product_id,
+                             "attribute_id": attribute_id, "value": value, "error": error})
+
+    objs = []
+    for (product_id, attribute_id), value in clean_rows.items():
+        value_num, value_bool = typed_attribute_value(attr_types[attribute_id], value)
+        objs.append(ProductAttributeValue(
+            product_id=product_id, attribute_id=attribute_id, value=value,
+            value_num=value_num, value_bool=value_bool,
+        ))
+    with transaction.atomic(using=using):
+        ProductAttributeValue.objects.using(using).bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["product", "attribute"],
+            update_fields=["value", "value_num", "value_bool"],
+        )
+
+    rejected.sort(key=lambda r: r["row"])
+    return {"saved": len(objs), "rejected": rejected}
@@ -1,11 +1,212 @@
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
-from .models import ProductImage
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+
+from core import edge_cache, sitemaps
+from core.paginator import invalidate_counts
+from . import attribute_registry, cards, filter_buckets
+from .models import Attribute, Product, ProductAttributeValue, ProductCategory, ProductImage, sync_main_images
+from .pricelist import mark_dirty
+from .services import COUNTS_ALL, COUNTS_CATALOG
+
+# Receiver-ы моделей выходят сразу при raw=True: loaddata пишет фикстуры как
+# есть, без пересчёта карточек, диапазонов, purge и счётчиков.
+
+# Массовые изменения каталога в обход save() (bulk_update, queryset.update):
+# отправитель шлёт сигнал один раз в конце, кеши каталога сбрасываются по нему.
+# kwargs: category_ids, product_ids
+catalog_changed = Signal()
 
 @receiver(pre_save, sender=ProductImage)
 def ensure_single_main(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    # снимаем флаг с прежнего главного (уникальность — productimage_single_main);
+    # если другого главного нет, UPDATE не нужен
     if instance.is_main:
-        (ProductImage.objects
-         .filter(product=instance.product, is_main=True)
-         .exclude(pk=instance.pk)
-         .update(is_main=False))
+        others = (ProductImage.objects
+                  .filter(product_id=instance.product_id, is_main=True)
+                  .exclude(pk=instance.pk))
+        if others.exists():
+            others.update(is_main=False)
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def refresh_main_image(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    sync_main_images([instance.product_id])
+
+
+# ---- прайс-лист: помечаем секции затронутых категорий ---------------------
+@receiver(pre_save, sender=Product)
+def remember_old_category(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    if instance.pk:
+        instance._old_category_id = (
+            Product.objects.filter(pk=instance.pk).values_list("category_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Product)
+def price_list_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    mark_dirty([instance.category_id, getattr(instance, "_old_category_id", None)])
+
+
+@receiver(post_save, sender=ProductCategory)
+def price_list_category_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    # заголовок секции — путь категории, поэтому и дочерние
+    mark_dirty([instance.pk, *instance.children.values_list("id", flat=True)])
+
+
+@receiver(catalog_changed)
+def price_list_catalog_changed(sender, category_ids=(), **kwargs):
+    mark_dirty(category_ids)
+
+
+# ---- sitemap.xml: сбрасываем только корзины затронутых id -------------------
+@receiver([post_save, post_delete], sender=Product)
+def sitemap_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    transaction.on_commit(lambda: sitemaps.invalidate("products", [instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def sitemap_category_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    transaction.on_commit(lambda: sitemaps.invalidate("categories", [instance.pk]))
+
+
+@receiver(catalog_changed)
+def sitemap_catalog_changed(sender, product_ids=None, **kwargs):
+    transaction.on_commit(lambda: sitemaps.invalidate("products", product_ids))
+
+
+# ---- edge-кеш: purge по surrogate-ключам ----------------------------------
+# Карточка товара помечена и ключами категорий цепочки, поэтому purge
+# category-<id> обновляет и список, и карточки этой категории.
+@receiver([post_save, post_delete], sender=Product)
+def edge_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    category_ids = {instance.category_id, getattr(instance, "_old_category_id", None)} - {None}
+    edge_cache.purge(edge_cache.product_key(instance.pk),
+                     *(edge_cache.category_key(i) for i in category_ids))
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def edge_category_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    # список категорий — на каждой странице каталога
+    edge_cache.purge(edge_cache.CATALOG, edge_cache.category_key(instance.pk))
+
+
+@receiver(catalog_changed)
+def edge_catalog_changed(sender, category_ids=(), product_ids=None, **kwargs):
+    keys = [edge_cache.category_key(i) for i in category_ids or () if i]
+    keys += [edge_cache.product_key(i) for i in product_ids or ()]
+    edge_cache.purge(*keys or [edge_cache.CATALOG])
+
+
+# ---- счётчики пагинации: новые версии областей после коммита ---------------
+def _invalidate_counts_on_commit(category_ids):
+    scopes = [COUNTS_ALL, *(f"category-{i}" for i in category_ids if i)]
+    if len(scopes) == 1:   # категории неизвестны — сбрасываем все
+        scopes.append(COUNTS_CATALOG)
+    transaction.on_commit(lambda: invalidate_counts(*scopes))
+
+
+@receiver([post_save, post_delete], sender=Product)
+def counts_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    _invalidate_counts_on_commit([instance.category_id, getattr(instance, "_old_category_id", None)])
+
+
+@receiver(catalog_changed)
+def counts_catalog_changed(sender, category_ids=(), **kwargs):
+    _invalidate_counts_on_commit(category_ids or ())
+
+
+# ---- карточки каталога: пересборка затронутых товаров после коммита --------
+@receiver(post_save, sender=Product)
+def cards_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    cards.schedule([instance.pk])
+
+
+@receiver(pre_save, sender=ProductCategory)
+def remember_old_title(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    if instance.pk:
+        instance._old_title = (
+            ProductCategory.objects.filter(pk=instance.pk).values_list("title", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=ProductCategory)
+def cards_category_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    # название категории — в alt/title карточек
+    if getattr(instance, "_old_title", instance.title) != instance.title:
+        cards.schedule(instance.products.values_list("id", flat=True))
+
+
+@receiver(catalog_changed)
+def cards_catalog_changed(sender, category_ids=(), product_ids=None, **kwargs):
+    if product_ids is None:
+        products = Product.objects.all()
+        if category_ids:
+            products = products.filter(category_id__in=category_ids)
+        product_ids = products.values_list("id", flat=True)
+    cards.schedule(product_ids)
+
+
+# ---- фото и характеристики товара: категория ищется один раз ----------------
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductAttributeValue)
+def product_part_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    cards.schedule([instance.product_id])
+    # при каскадном удалении товара категорию уже учли receiver-ы Product
+    category_id = Product.objects.filter(pk=instance.product_id).values_list("category_id", flat=True).first()
+    # фото и размеры видны и в списке категории
+    edge_cache.purge(edge_cache.product_key(instance.product_id),
+                     edge_cache.category_key(category_id) if category_id else None)
+    if sender is ProductAttributeValue and category_id:
+        # размеры и «вид» участвуют в фильтрах: счётчики и диапазоны
+        _invalidate_counts_on_commit([category_id])
+        filter_buckets.schedule([category_id])
+
+
+# ---- справочник атрибутов: новый снимок после коммита ---------------------
+@receiver([post_save, post_delete], sender=Attribute)
+def attribute_registry_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    transaction.on_commit(attribute_registry.attributes.invalidate)
+
+
+# ---- диапазоны фильтров: пересчёт затронутых категорий после коммита -------
+@receiver([post_save, post_delete], sender=Product)
+def filter_buckets_product_changed(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    filter_buckets.schedule([instance.category_id, getattr(instance, "_old_category_id", None)])
+
+
+@receiver(catalog_changed)
+def filter_buckets_catalog_changed(sender, category_ids=(), **kwargs):
+    filter_buckets.schedule(category_ids)
@@ -0,0 +1,277 @@
+from decimal import Decimal
+from io import BytesIO, StringIO
+import random
+import tempfile
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.files import get_thumbnailer
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from products import attribute_registry, export, filter_buckets
+from products.filter_buckets import HISTOGRAM_BINS, range_stats
+from products.management.commands import check_admin_queries, check_query_plans
+from products.models import (
+    Attribute, CategoryFilterStats, Product, ProductAttributeValue, ProductCategory, ProductImage,
+)
+from products.serializers import ProductSerializer, product_list_data
+from products.views import ProductViewSet
+
+
+def make_catalog(products=12, start=0, images=True):
+    """Маленький каталог: категория с подкатегорией, «вид» / «длина», фото, скидки."""
+    parent, _ = ProductCategory.objects.get_or_create(title="Двери", parent=None)
+    child, _ = ProductCategory.objects.get_or_create(title="Межкомнатные", parent=parent)
+    vid, _ = Attribute.objects.get_or_create(name="Вид", defaults={"value_type": "str"})
+    length, _ = Attribute.objects.get_or_create(name="Длина", defaults={"value_type": "decimal"})
+    created = []
+    for i in range(start, start + products):
+        p = Product.objects.create(
+            title=f"Дверь {i}", category=parent if i % 2 else child,
+            price=Decimal(1000 + i * 10), old_price=Decimal(1500) if i % 3 == 0 else None,
+        )
+        ProductAttributeValue.objects.create(product=p, attribute=vid, value="скрытый" if i % 2 else "открытый")
+        ProductAttributeValue.objects.create(product=p, attribute=length, value=str(1800 + i * 50))
+        created.append(p)
+    if not images:
+        return
+    # bulk_create: без генерации миниатюр по несуществующим файлам
+    ProductImage.objects.bulk_create(
+        ProductImage(product=p, image=f"product_images/{p.slug}/{p.slug}.jpg", is_main=True)
+        for p in created
+    )
+
+
+# ---- EXPLAIN горячих запросов (check_query_plans) ---------------------------
+class QueryPlanTests(TestCase):
+    # на десятках строк планировщик законно выбирает полный скан: нужен
+    # масштабированный каталог (generate_catalog) и собранная статистика
+    PRODUCTS = 5000
+
+    @classmethod
+    def setUpClass(cls):
+        media = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media))   # пул изображений generate_catalog
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("generate_catalog", products=cls.PRODUCTS, images=1, image_pool=2, stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_hot_queries_avoid_full_scans(self):
+        command = check_query_plans.Command()
+        if connection.vendor not in ("postgresql", "sqlite"):
+            self.skipTest(f"EXPLAIN-проверка не поддерживает {connection.vendor}")
+        queries = command._queries("default")
+        self.assertTrue(queries)
+        for label, qs in queries:
+            with self.subTest(label):
+                plan = qs.explain()
+                self.assertEqual(command._full_scans(connection.vendor, plan), [], plan)
+
+
+# ---- бюджет запросов админки (check_admin_queries) --------------------------
+class AdminQueryBudgetTests(TestCase):
+    DEFAULT_BUDGET = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        make_catalog()
+        cls.user = get_user_model().objects.create_superuser("admin", "admin@example.com", None)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        # снимок атрибутов сбрасывается в on_commit, которого у TestCase нет
+        attribute_registry.attributes.invalidate()
+
+    def _queries(self, url):
+        self.client.get(url)   # прогрев: кеши, ContentType, сессия
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries)
+
+    def test_pages_within_budget(self):
+        for label, url in check_admin_queries.Command()._pages():
+            with self.subTest(label):
+                budget = check_admin_queries.BUDGETS.get(label, self.DEFAULT_BUDGET)
+                self.assertLessEqual(self._queries(url), budget)
+
+    def test_product_changelist_has_no_n_plus_one(self):
+        url = reverse("admin:products_product_changelist")
+        used = self._queries(url)
+        make_catalog(8, start=12)
+        with self.assertNumQueries(used):
+            self.client.get(url)
+
+    def test_product_form_does_not_grow_with_attributes(self):
+        product = Product.objects.order_by("pk").first()
+        url = reverse("admin:products_product_change", args=[product.pk])
+        used = self._queries(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(6):
+                attribute = Attribute.objects.create(name=f"Характеристика {i}")
+                ProductAttributeValue.objects.create(product=product, attribute=attribute, value=str(i))
+        self.client.get(url)   # снимок атрибутов перечитывается один раз
+        with self.assertNumQueries(used):
+            self.client.get(url)
+
+    def test_command_passes(self):
+        call_command("check_admin_queries", stdout=StringIO())
+
+
+# ---- список API из values() (product_list_data) -----------------------------
+class ProductListDataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        media = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        make_catalog(3, images=False)
+        bool_attr = Attribute.objects.create(name="Подсветка", value_type="bool")
+        int_attr = Attribute.objects.create(name="Количество", value_type="int")
+        for i, product in enumerate(Product.objects.order_by("pk")):
+            ProductAttributeValue.objects.create(product=product, attribute=bool_attr, value="да" if i % 2 else "нет")
+            ProductAttributeValue.objects.create(product=product, attribute=int_attr, value=str(i + 1))
+        # через save(): миниатюры генерирует модель, как при загрузке в админке
+        product = Product.objects.order_by("pk").first()
+        ProductImage.objects.create(product=product, image=cls._jpeg("cropped.jpg"), cropping="100,100,500,500")
+        ProductImage.objects.create(product=product, image=cls._jpeg("plain.jpg"))
+
+    @staticmethod
+    def _jpeg(name):
+        buf = BytesIO()
+        Image.new("RGB", (800, 600), (200, 120, 40)).save(buf, "JPEG")
+        return ContentFile(buf.getvalue(), name=name)
+
+    def setUp(self):
+        attribute_registry.attributes.invalidate()   # on_commit у TestCase не выполняется
+
+    def test_matches_serializer(self):
+        ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+        request = RequestFactory().get("/api/products/")
+        data = product_list_data(ids, request)
+        # миниатюры созданы save(); проверяем до сериализатора — он генерирует их сам
+        for image in ProductImage.objects.all():
+            for alias in ("default", "preview"):
+                with self.subTest(image=image.image.name, alias=alias):
+                    self.assertIsNotNone(get_thumbnailer(image.image).get_existing_thumbnail(aliases.get(alias)))
+        by_id = {p.id: p for p in ProductViewSet.queryset.filter(id__in=ids)}
+        expected = ProductSerializer([by_id[i] for i in ids], many=True, context={"request": request}).data
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def _outputs(self, product):
+        request = RequestFactory().get("/api/products/")
+        listed = product_list_data([product.pk], request)[0]["attributes"]
+        product = ProductViewSet.queryset.get(pk=product.pk)
+        serialized = ProductSerializer(product, context={"request": request}).data["attributes"]
+        exported = next(export.iter_products())["attributes"]
+        return listed, serialized, exported
+
+    def test_attribute_newer_than_snapshot(self):
+        product = Product.objects.order_by("pk").first()
+        attribute_registry.get()
+        # без on_commit снимок не сброшен: новый атрибут находится перечитыванием
+        attribute = Attribute.objects.create(name="Покрытие")
+        ProductAttributeValue.objects.create(product=product, attribute=attribute, value="шпон")
+        listed, serialized, exported = self._outputs(product)
+        self.assertIn({"attribute": "Покрытие", "value": "шпон"}, listed)
+        self.assertEqual(list(serialized), listed)
+        self.assertEqual(exported["Покрытие"], "шпон")
+
+    def test_unknown_attribute_is_skipped(self):
+        product = Product.objects.order_by("pk").first()
+        stale = attribute_registry.get()
+        attribute = Attribute.objects.create(name="Покрытие")
+        ProductAttributeValue.objects.create(product=product, attribute=attribute, value="шпон")
+        with mock.patch.object(attribute_registry.attributes, "reload", return_value=stale):
+            listed, serialized, exported = self._outputs(product)
+        self.assertEqual(len(listed), product.attribute_values.count() - 1)
+        self.assertEqual(list(serialized), listed)
+        self.assertNotIn("Покрытие", exported)
+
+
+# ---- сохранённая статистика фильтров (filter_buckets.get_stats) -------------
+class FilterStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_catalog(images=False)
+        cls.category = ProductCategory.objects.get(title="Двери")
+
+    def test_missing_row_is_not_computed_on_request(self):
+        CategoryFilterStats.objects.all().delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(filter_buckets.get_stats(self.category), {})
+
+    def test_built_row(self):
+        filter_buckets.build([self.category.id])
+        stats = filter_buckets.get_stats(self.category)
+        self.assertEqual(stats["price"]["count"], 12)
+
+
+# ---- диапазоны фильтров (filter_buckets.range_stats) ------------------------
+class RangeStatsTests(SimpleTestCase):
+    def _python(self, key, values):
+        with mock.patch.object(filter_buckets, "np", None):
+            return range_stats(key, values)
+
+    def test_known_values(self):
+        stats = self._python("length", [10, 20, 30, 40, 50, 60, 70, 80, 90, 100])
+        self.assertEqual(stats["count"], 10)
+        self.assertEqual((stats["min"], stats["max"]), (10, 100))
+        self.assertEqual(stats["quantiles"], {"p10": 19, "p25": 32.5, "p50": 55, "p75": 77.5, "p90": 91})
+        self.assertEqual(stats["histogram"]["edges"][:3], [10, 14.5, 19])
+        self.assertEqual(stats["histogram"]["counts"],
+                         [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1])
+        # границы корзин — квартили 32.5 / 55 / 77.5, округлённые до двух значащих цифр
+        self.assertEqual(stats["buckets"], [
+            {"label": "До 32 мм", "value": "0-32", "count": 3},
+            {"label": "32 – 55 мм", "value": "32-55", "count": 2},
+            {"label": "55 – 78 мм", "value": "55-78", "count": 2},
+            {"label": "От 78 мм", "value": "78-", "count": 3},
+        ])
+
+    def test_single_value(self):
+        stats = self._python("price", [4500, 4500])
+        self.assertEqual(stats["quantiles"]["p50"], 4500)
+        self.assertEqual(stats["histogram"]["counts"], [2] + [0] * (HISTOGRAM_BINS - 1))
+        self.assertEqual(stats["buckets"], [])
+        self.assertIsNone(self._python("price", []))
+
+    def test_histogram_bin_edges(self):
+        # (v - lo) * norm даёт 3.0000000000000004, а левая граница 4-й корзины —
+        # 0.15000000000000002: 0.15 относится к 3-й (как в np.histogram)
+        self.assertEqual(self._python("width", [0, 0.15, 1])["histogram"]["counts"][2:4], [1, 0])
+        # обратный случай: (v - lo) * norm < 1, но v уже на правой границе 1-й корзины
+        self.assertEqual(self._python("width", [0, 0.16499999999999998, 3.3])["histogram"]["counts"][:2],
+                         [1, 1])
+
+    @skipIf(filter_buckets.np is None, "NumPy не установлен")
+    def test_matches_numpy(self):
+        rnd = random.Random(42)
+        samples = [
+            [0, 0.15, 1],
+            [0, 0.16499999999999998, 3.3],
+            [rnd.choice([6.94, 11, 15, 21.94, 32, 36.5, 44.2, 52, 80]) for _ in range(500)],
+            [rnd.randrange(500, 30_000, 10) for _ in range(1000)],
+            [rnd.uniform(0, 1) for _ in range(1000)],
+        ]
+        for values in samples:
+            with self.subTest(n=len(values)):
+                expected, actual = range_stats("width", values), self._python("width", values)
+                self.assertEqual(actual["histogram"], expected["histogram"])
+                for name, value in expected["quantiles"].items():
+                    self.assertAlmostEqual(actual["quantiles"][name], value, delta=0.01)
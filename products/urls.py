@@ -1,10 +1,23 @@
 # products/urls.py
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet
+from .views import ProductViewSet, CategoryViewSet, CategoryFiltersView, ProductExportView
 
 router = DefaultRouter()
 router.register("products", ProductViewSet, basename="product")
 router.register("categories", CategoryViewSet, basename="category")
 
+api_urls = router.urls
+if getattr(settings, "ASYNC_STOREFRONT", False):
+    # под ASGI: list/retrieve ViewSet-ов — async, независимые выборки параллельно
+    from .async_views import async_api_view
+    for pattern in api_urls:
+        if hasattr(pattern.callback, "actions"):   # кроме корня API
+            pattern.callback = async_api_view(pattern.callback)
+
 app_name = "products"
-urlpatterns = router.urls
+urlpatterns = api_urls + [
+    path("categories/<slug:slug>/filters/", CategoryFiltersView.as_view(), name="category-filters"),
+    path("export/products.<str:fmt>", ProductExportView.as_view(), name="product-export"),
+]
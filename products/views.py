@@ -1,31 +1,46 @@
 # views.py
 from rest_framework import filters, viewsets
-from django.shortcuts import render, get_object_or_404
-from django.db.models import Q, OuterRef
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+from django.shortcuts import render, get_object_or_404, redirect
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.views.decorators.http import condition
+from django.db.models import Q, OuterRef, Prefetch, prefetch_related_objects
 import django_filters as df
+from decimal import Decimal, InvalidOperation
 
 
 from .filters import ProductFilter
 from .filters_config import FILTER_CONFIG
+from . import attribute_registry, cards, export, filter_buckets, pricelist
+from .cards import format_number
+
+from django.conf import settings
+
+from core import edge_cache
+from core.aio import run_queries
+from core.paginator import CachedCountPaginator
+from core.renderers import OrjsonRenderer
+from .services import CachedCountPagination, catalog_count_scopes
+from .models import Product, ProductCategory, ProductAttributeValue, AttributeGroup
+from .serializers import ProductSerializer, CategorySerializer, product_list_data
+from django_filters.rest_framework import DjangoFilterBackend, BooleanFilter
 
-from django.core.paginator import Paginator
+PRODUCT_PREFETCHES = (
+    "images",                     # галерея
+    Prefetch("attribute_values",  # порядок как в product_list_data
+             queryset=ProductAttributeValue.objects.order_by("id")),
+)
 
-from .services import StandardResultsSetPagination
-from .models import Product, ProductCategory, ProductAttributeValue, Attribute, AttributeGroup
-from .serializers import ProductSerializer, CategorySerializer
-from django_filters.rest_framework import DjangoFilterBackend, BooleanFilter
 
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = (
-        Product.objects
-        .select_related("category")
-        .prefetch_related(
-            "images",                     # галерея
-            "attribute_values__attribute" # ← правильный путь
-        )
-    )
+    queryset = Product.objects.select_related("category").prefetch_related(*PRODUCT_PREFETCHES)
     lookup_field = "slug"
     serializer_class = ProductSerializer
+    renderer_classes = [OrjsonRenderer, *api_settings.DEFAULT_RENDERER_CLASSES]
     filter_backends   = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -41,10 +56,48 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ["title", "description", "sku"]
 
     # ➌ Сортировка
-    ordering_fields = ["price", "title"]
+    ordering_fields = ["price", "title", "discount_percent"]
 
     # ➍ Стандартная пагинация (если нужна)
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CachedCountPagination
+
+    # True — ViewSet обслуживает async-view (async_views.async_api_view):
+    # независимые выборки идут в базу одновременно
+    parallel_queries = False
+
+    def gather(self, *fns):
+        return run_queries(*fns) if self.parallel_queries else [fn() for fn in fns]
+
+    def list(self, request, *args, **kwargs):
+        # страница — только id, тела товаров собирает product_list_data пакетными запросами
+        ids = self.filter_queryset(self.get_queryset()).prefetch_related(None).values_list("id", flat=True)
+        page = self.paginate_queryset(ids)
+        if page is None:
+            return Response(product_list_data(list(ids), request, self.gather))
+        return self.get_paginated_response(product_list_data(list(page), request, self.gather))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.parallel_queries:
+            return super().retrieve(request, *args, **kwargs)
+        # товар — одним запросом, галерея и характеристики — одновременно
+        self.queryset = self.queryset.prefetch_related(None)
+        instance = self.get_object()
+        self.gather(*(lambda lookup=lookup: prefetch_related_objects([instance], lookup)
+                      for lookup in PRODUCT_PREFETCHES))
+        return Response(self.get_serializer(instance).data)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if response.status_code == 200:
+            data = response.data
+            if isinstance(data, dict):
+                items = data["results"] if "results" in data else [data]
+            else:
+                items = data
+            edge_cache.add_keys(request._request, edge_cache.CATALOG,
+                                *(edge_cache.product_key(item["id"]) for item in items),
+                                *(edge_cache.category_key(item["category"]["id"])
+                                  for item in items if item.get("category")))
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 class CategoryFilter(df.FilterSet):
@@ -60,12 +113,58 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_class = CategoryFilter
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        edge_cache.add_keys(request._request, edge_cache.CATALOG)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+class CategoryFiltersView(APIView):
+    """
+    GET /api/categories/<slug>/filters/ — диапазоны фильтров категории из данных
+    (products/filter_buckets.py): min/max, квантили, гистограмма и корзины по цене
+    и размерам.
+    """
+
+    def get(self, request, slug):
+        category = get_object_or_404(ProductCategory, slug=slug)
+        edge_cache.add_keys(request._request, edge_cache.category_key(category.id))
+        return Response(filter_buckets.get_stats(category))
+
+
+class ProductExportView(APIView):
+    """
+    Потоковая выгрузка всего каталога или поддерева категории для партнёров:
+    GET /api/export/products.csv|jsonl[?category=<slug>]
+    """
+    authentication_classes = [BasicAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, fmt):
+        if fmt not in export.FORMATS:
+            raise Http404
+        category_ids = None
+        if request.GET.get("category"):
+            category_ids = export.category_subtree(request.GET["category"])
+            if category_ids is None:
+                raise Http404
+
+        render_lines, content_type = export.FORMATS[fmt]
+        rows = export.iter_products(category_ids, absolute=request.build_absolute_uri)
+        response = StreamingHttpResponse(render_lines(rows), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="products.{fmt}"'
+        return response
+
 # --- Получаем slug-и атрибутов ---
 def get_attr_slug(attr_name):
+    return attribute_registry.slug_of(attr_name)
+
+def _range_bound(raw):
+    """Граница диапазона из query-параметра; пустая или нечисловая — None (без границы)."""
     try:
-        return Attribute.objects.only("slug").get(name__iexact=attr_name).slug
-    except Attribute.DoesNotExist:
+        bound = Decimal(raw.strip())
+    except InvalidOperation:
         return None
+    return bound if bound.is_finite() else None
+
 
 def apply_range_filters(queryset, field, values, attr_slug=None):
     """
@@ -82,39 +181,38 @@ def apply_range_filters(queryset, field, values, attr_slug=None):
         min_val, max_val = None, None
         parts = val.split('-')
         if len(parts) == 2:
-            min_val = parts[0] if parts[0] else None
-            max_val = parts[1] if parts[1] else None
+            min_val = _range_bound(parts[0])
+            max_val = _range_bound(parts[1])
         elif parts:
-            min_val = parts[0]
+            min_val = _range_bound(parts[0])
 
         if field == 'price':
             cond = Q()
-            if min_val:
-                cond &= Q(price__gte=float(min_val))
-            if max_val:
-                cond &= Q(price__lte=float(max_val))
+            if min_val is not None:
+                cond &= Q(price__gte=min_val)
+            if max_val is not None:
+                cond &= Q(price__lte=max_val)
             q_filter |= cond
         else:
+            attribute = attribute_registry.by_slug(attr_slug)
+            if attribute is None:
+                q_filter |= Q(pk__in=[])
+                continue
             subq = ProductAttributeValue.objects.filter(
                 product=OuterRef('pk'),
-                attribute__slug=attr_slug
+                attribute_id=attribute.id
             )
-            if min_val:
-                subq = subq.filter(value__gte=min_val)
-            if max_val:
-                subq = subq.filter(value__lte=max_val)
+            if min_val is not None:
+                subq = subq.filter(value_num__gte=min_val)
+            if max_val is not None:
+                subq = subq.filter(value_num__lte=max_val)
             q_filter |= Q(pk__in=subq.values('product_id'))
 
     return queryset.filter(q_filter)
 
-def format_number(value):
-    try:
-        return ('{:.2f}'.format(float(value))).rstrip('0').rstrip('.')
-    except (ValueError, TypeError):
-        return str(value)
-
 
 def catalog_root(request):
+    edge_cache.add_keys(request, edge_cache.CATALOG)
     categories = ProductCategory.objects.filter(parent__isnull=True).order_by("title")
     return render(request, "catalog_root.html", {
         "categories": categories,
@@ -126,132 +224,112 @@ def catalog_root(request):
     })
 
 
-def catalog(request, category_slug=None):
-    category = None
-    categories = list(ProductCategory.objects.values("id", "title", "slug").order_by("title"))
-    seo_title = "Каталог товаров decorkz.kz"
-    seo_description = "decor.kz - производим декоративные решения, карнизы, плинтусы, рейки"
-    allowed_orderings = ["title", "-title", "price", "-price"]
-    filter_config = FILTER_CONFIG.get(category_slug, FILTER_CONFIG['default'])
+CATALOG_ORDERINGS = ["title", "-title", "price", "-price"]
+
 
-    products = []
+# ---- части catalog(): общие для sync и async (async_views.py) версий --------
+def catalog_attribute_values(category, filter_config):
+    """Значения атрибутов-фильтров в категории: {имя атрибута: [значения]}."""
     attribute_values = {}
-    vid_values = []
-    page_obj = None
-
-    price_values = request.GET.getlist('price') if category_slug else []
-    length_values = request.GET.getlist('length') if category_slug else []
-    width_values = request.GET.getlist('width') if category_slug else []
-    height_values = request.GET.getlist('height') if category_slug else []
-    vid_selected = request.GET.getlist('vid') if category_slug else []
-
-    if category_slug:
-        category = get_object_or_404(ProductCategory, slug=category_slug)
-        # 1. Сначала ищем подкатегории
-        subcategories = ProductCategory.objects.filter(parent=category)
-
-        if category.image and category.thumb("preview"):
-            og_image = request.build_absolute_uri(category.thumb("preview"))
-        else:
-            og_image = request.build_absolute_uri("/static/static/img/catalog-og.jpg")
-
-        if subcategories.exists():
-            # Если есть подкатегории — показываем их (без товаров)
-            return render(request, "catalog_category.html", {
-                "category": category,
-                "subcategories": subcategories,
-                "seo_title": f"{category.title} — Категория",
-                "seo_description": f"Список подкатегорий {category.title}",
-                "meta_description": f"Список подкатегорий {category.title}",
-                "meta_keywords": f"{category.title}, каталог, подкатегории, декор, молдинги",
-                "og_image": og_image,
-                "og_title": f"{category.title} — Категория",
-                "og_description": f"Список подкатегорий {category.title}",
-            })
-
-        # 2. Если подкатегорий нет — показываем товары
-        children_ids = list(category.children.values_list('id', flat=True))
-        category_ids = [category.id] + children_ids
-
-        products_qs = Product.objects.filter(category__id__in=category_ids).prefetch_related(
-            'images', 'attribute_values__attribute'
-        )
-
-        for attr_name in filter_config.get('attributes', []):
-            values = ProductAttributeValue.objects.filter(
-                attribute__name__iexact=attr_name,
-                product__category=category
-            ).values_list('value', flat=True).distinct()
-            attribute_values[attr_name] = list(values)
-
-        length_slug = get_attr_slug('длина')
-        width_slug = get_attr_slug('ширина')
-        height_slug = get_attr_slug('высота')
-
-        products_qs = apply_range_filters(products_qs, 'price', price_values)
-        products_qs = apply_range_filters(products_qs, 'length', length_values, length_slug)
-        products_qs = apply_range_filters(products_qs, 'width', width_values, width_slug)
-        products_qs = apply_range_filters(products_qs, 'height', height_values, height_slug)
-
-        if 'вид' in filter_config.get('attributes', []) and vid_selected:
-            products_qs = products_qs.filter(
-                attribute_values__attribute__name__iexact='вид',
-                attribute_values__value__in=vid_selected
-            ).distinct()
-
-        ordering = request.GET.get("ordering")
-        if ordering in allowed_orderings:
-            products_qs = products_qs.order_by(ordering)
-        else:
-            products_qs = products_qs.order_by('id')
-
-        products_qs = products_qs.select_related('category').prefetch_related('images', 'attribute_values__attribute')
-
-        # ВАЖНО: Создаем пагинатор с products_qs, а НЕ с products
-        paginator = Paginator(products_qs, 20)
-        page_obj = paginator.get_page(request.GET.get('page', 1))
-
-        # Теперь формируем products из page_obj.object_list
-        products = [
-            {
-                "id": p.id,
-                "title": p.title,
-                "slug": p.slug,
-                "price": int(p.price),
-                # ===== ПОЛЯ ДЛЯ СКИДОК =====
-                "old_price": int(p.old_price) if p.old_price else None,
-                "has_discount": p.has_discount,
-                "discount_percent": p.discount_percent,
-                "discount_display": p.get_discount_display(),
-                # ======================================
-                "images": [img.preview_url for img in p.images.all()],
-                "alt": f"{p.category.title} {p.title}",
-                "title_attr": f"{p.category.title} {p.title}",
-                "category_title": p.category.title,
-                "size": " × ".join([
-                    format_number(
-                        next((a.value for a in p.attribute_values.all() if a.attribute.name.lower() == 'высота'), '')),
-                    format_number(
-                        next((a.value for a in p.attribute_values.all() if a.attribute.name.lower() == 'ширина'), '')),
-                    format_number(
-                        next((a.value for a in p.attribute_values.all() if a.attribute.name.lower() == 'длина'), '')),
-                ]),
-                "type": next((a.value for a in p.attribute_values.all() if a.attribute.name.lower() == 'вид'),
-                             'не указан'),
-            }
-            for p in page_obj.object_list  # ИСПОЛЬЗУЕМ page_obj.object_list вместо products_qs
-        ]
+    for attr_name in filter_config.get('attributes', []):
+        values = ProductAttributeValue.objects.filter(
+            attribute_id=attribute_registry.id_of(attr_name),
+            product__category=category
+        ).values_list('value', flat=True).distinct()
+        attribute_values[attr_name] = list(values)
+    return attribute_values
+
+
+def catalog_dimension_slugs():
+    return {
+        'length': get_attr_slug(attribute_registry.LENGTH),
+        'width': get_attr_slug(attribute_registry.WIDTH),
+        'height': get_attr_slug(attribute_registry.HEIGHT),
+    }
+
+
+def catalog_page(category_ids, slugs, filters, filter_config, ordering, page_number):
+    """Страница товаров с фильтрами: (page_obj, карточки). Все запросы выполняются здесь."""
+    products_qs = Product.objects.filter(category__id__in=category_ids)
+
+    products_qs = apply_range_filters(products_qs, 'price', filters['price'])
+    for dim in ('length', 'width', 'height'):
+        products_qs = apply_range_filters(products_qs, dim, filters[dim], slugs[dim])
+
+    if attribute_registry.VID in filter_config.get('attributes', []) and filters['vid']:
+        # подзапрос вместо JOIN + distinct(): DISTINCT по JSON-колонке card не нужен
+        products_qs = products_qs.filter(pk__in=ProductAttributeValue.objects.filter(
+            attribute_id=attribute_registry.id_of(attribute_registry.VID),
+            value__in=filters['vid'],
+        ).values('product_id'))
+
+    if ordering in CATALOG_ORDERINGS:
+        products_qs = products_qs.order_by(ordering)
+    else:
+        products_qs = products_qs.order_by('id')
+
+    # карточки собраны заранее (products/cards.py) — ни JOIN-ов, ни prefetch
+    products_qs = products_qs.values_list('id', 'card')
+
+    # ВАЖНО: Создаем пагинатор с products_qs, а НЕ с products
+    # COUNT — из кеша по состоянию фильтров, пока товары категорий не менялись
+    paginator = CachedCountPaginator(
+        products_qs, 20,
+        count_key=catalog_count_key(category_ids, filters, filter_config),
+        scopes=catalog_count_scopes(category_ids),
+        approximate=getattr(settings, "CATALOG_APPROXIMATE_COUNTS", False),
+    )
+    page_obj = paginator.get_page(page_number)
+    return page_obj, cards.listing(page_obj.object_list)
+
+
+def catalog_count_key(category_ids, filters, filter_config):
+    """Нормализованное состояние фильтров: порядок и повторы значений на COUNT не влияют."""
+    state = {k: sorted(set(v)) for k, v in filters.items() if v}
+    if attribute_registry.VID not in filter_config.get('attributes', []):
+        state.pop('vid', None)
+    return f"catalog|{sorted(category_ids)}|{sorted(state.items())}"
 
-        seo_title = f"{category.title} — Купить по лучшей цене"
-        seo_description = f"{category.title}: широкий ассортимент по доступным ценам."
 
-        vid_values = attribute_values.get('вид', [])
+def catalog_filter_values(request, category_slug):
+    keys = ('price', 'length', 'width', 'height', 'vid')
+    return {k: request.GET.getlist(k) if category_slug else [] for k in keys}
 
-        # Убираем дублирующую пагинацию - page_obj уже создан выше!
 
-    context = {
+def catalog_category_context(request, category, subcategories):
+    """Контекст страницы категории с подкатегориями (catalog_category.html)."""
+    if category.image and category.thumb("preview"):
+        og_image = request.build_absolute_uri(category.thumb("preview"))
+    else:
+        og_image = request.build_absolute_uri("/static/static/img/catalog-og.jpg")
+
+    return {
+        "category": category,
+        "subcategories": subcategories,
+        "seo_title": f"{category.title} — Категория",
+        "seo_description": f"Список подкатегорий {category.title}",
+        "meta_description": f"Список подкатегорий {category.title}",
+        "meta_keywords": f"{category.title}, каталог, подкатегории, декор, молдинги",
+        "og_image": og_image,
+        "og_title": f"{category.title} — Категория",
+        "og_description": f"Список подкатегорий {category.title}",
+    }
+
+
+def catalog_context(category, categories, filter_config, filters,
+                    products=(), attribute_values=None, page_obj=None):
+    """Контекст catalog.html из уже полученных данных — без запросов к БД."""
+    attribute_values = attribute_values or {}
+    if category:
+        seo_title = f"{category.title} — Купить по лучшей цене"
+        seo_description = f"{category.title}: широкий ассортимент по доступным ценам."
+    else:
+        seo_title = "Каталог товаров decorkz.kz"
+        seo_description = "decor.kz - производим декоративные решения, карнизы, плинтусы, рейки"
+
+    return {
         "categories": categories,
-        "products": products,  # Теперь products содержит данные со скидками
+        "products": list(products),  # Теперь products содержит данные со скидками
         "current_category": category,
         "seo_title": seo_title,
         "seo_description": seo_description,
@@ -261,16 +339,59 @@ def catalog(request, category_slug=None):
         "og_description": seo_description,
         "attribute_values": attribute_values,
         "filter_config": filter_config,
-        "length_values": length_values,
-        "width_values": width_values,
-        "height_values": height_values,
-        "price_values": price_values,
-        "vid_selected": vid_selected,
-        "vid_values": vid_values,
+        "length_values": filters['length'],
+        "width_values": filters['width'],
+        "height_values": filters['height'],
+        "price_values": filters['price'],
+        "vid_selected": filters['vid'],
+        "vid_values": attribute_values.get(attribute_registry.VID, []),
         "page_obj": page_obj,  # page_obj остается для навигации по страницам
-        "podsvetka_values": attribute_values.get('подсветка', []),
+        "podsvetka_values": attribute_values.get(attribute_registry.PODSVETKA, []),
     }
-    return render(request, "catalog.html", context)
+
+
+def tag_catalog(request, category=None, subcategories=(), products=()):
+    """Ключи edge-кеша страницы каталога: список категорий есть на каждой."""
+    edge_cache.add_keys(
+        request, edge_cache.CATALOG,
+        *(edge_cache.category_key(c.id) for c in (category, *subcategories) if c is not None),
+        *(edge_cache.product_key(p["id"]) for p in products),
+    )
+
+
+def catalog(request, category_slug=None):
+    categories = list(ProductCategory.objects.values("id", "title", "slug").order_by("title"))
+    filter_config = FILTER_CONFIG.get(category_slug, FILTER_CONFIG['default'])
+    filters = catalog_filter_values(request, category_slug)
+
+    if not category_slug:
+        tag_catalog(request)
+        filter_config = filter_buckets.filter_config(None, {})
+        return render(request, "catalog.html", catalog_context(None, categories, filter_config, filters))
+
+    category = get_object_or_404(ProductCategory, slug=category_slug)
+    # 1. Сначала ищем подкатегории
+    subcategories = ProductCategory.objects.filter(parent=category)
+    if subcategories.exists():
+        tag_catalog(request, category, subcategories)
+        # Если есть подкатегории — показываем их (без товаров)
+        return render(request, "catalog_category.html",
+                      catalog_category_context(request, category, subcategories))
+
+    # 2. Если подкатегорий нет — показываем товары
+    children_ids = list(category.children.values_list('id', flat=True))
+    category_ids = [category.id] + children_ids
+
+    attribute_values = catalog_attribute_values(category, filter_config)
+    page_obj, products = catalog_page(
+        category_ids, catalog_dimension_slugs(), filters, filter_config,
+        request.GET.get("ordering"), request.GET.get('page', 1),
+    )
+    filter_config = filter_buckets.filter_config(category_slug, filter_buckets.get_stats(category))
+    tag_catalog(request, category, products=products)
+    return render(request, "catalog.html", catalog_context(
+        category, categories, filter_config, filters, products, attribute_values, page_obj))
+
 
 def build_size_string(sizes: dict) -> str:
     parts = []
@@ -283,25 +404,28 @@ def build_size_string(sizes: dict) -> str:
     return ""
 
 
-def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug)
-    # Загружаем все связанные атрибуты одной строкой:
-    attributes = product.attribute_values.select_related('attribute')
-
-    base_group_name = AttributeGroup.objects.filter(
-        template__is_base=True).first().title  # если есть только один базовый
+def category_chain(category):
+    chain = []
+    while category:
+        chain.append(category)
+        category = category.parent
+    return list(reversed(chain))
 
-    # атрибуты группы
-    attribute_groups = product.get_attribute_groups()
 
+def product_detail_context(request, product, attributes, base_group_name, attribute_groups, chain):
+    """Контекст product.html из уже полученных данных — без запросов к БД."""
     # Сортируем их по привычному порядку (чтобы всегда было В, Ш, Д, потом остальные):
-    attrs_map = {a.attribute.name.lower(): a.value for a in attributes}
+    registry = attribute_registry.get_with(a.attribute_id for a in attributes)
+    attributes = [a for a in attributes if a.attribute_id in registry.by_id]   # неизвестные — не показываем
+    names = {a.attribute_id: registry.by_id[a.attribute_id].name for a in attributes}
+    attrs_map = {names[a.attribute_id].lower(): a.value for a in attributes}
+    nums_map = {names[a.attribute_id].lower(): a.number for a in attributes}
 
     # Формируем структуру для шаблона
     sizes = {
-        'height': format_number(attrs_map.get('высота')),
-        'width': format_number(attrs_map.get('ширина')),
-        'length': format_number(attrs_map.get('длина')),
+        'height': format_number(nums_map.get('высота')),
+        'width': format_number(nums_map.get('ширина')),
+        'length': format_number(nums_map.get('длина')),
     }
     size_string = build_size_string(sizes)  # ← вызываем функцию
     vid = attrs_map.get('вид')
@@ -309,31 +433,20 @@ def product_detail(request, slug):
 
     # Выводим остальные (не размеры, не вид, не подсветка) как "прочие характеристики":
     other_attributes = [
-        {'name': a.attribute.name, 'value': a.value}
+        {'name': names[a.attribute_id], 'value': a.value}
         for a in attributes
-        if a.attribute.name.lower() not in ['высота', 'ширина', 'длина', 'вид', 'подсветка']
+        if names[a.attribute_id].lower() not in ['высота', 'ширина', 'длина', 'вид', 'подсветка']
     ]
 
     seo_title = f"{product.title} — купить по лучшей цене"
     seo_description = (product.description or f"Купить {product.title} по доступной цене. Характеристики, фото, доставка.")
 
-    def get_category_chain(category):
-        chain = []
-        while category:
-            chain.append(category)
-            category = category.parent
-        return list(reversed(chain))
-
-    category_chain = get_category_chain(product.category)
-
-    if product.images.exists():
-        main_image = product.images.filter(is_main=True).first() or product.images.first()
-        og_image = request.build_absolute_uri(main_image.thumb("preview"))
+    if product.main_image_url:
+        og_image = request.build_absolute_uri(product.main_image_url)
     else:
         og_image = "/static/static/img/catalog-og.jpg"  # дефолтная картинка если фото нет
 
-
-    context = {
+    return {
         "product": product,
         "seo_title": seo_title,
         "seo_description": seo_description,
@@ -347,9 +460,53 @@ def product_detail(request, slug):
         "vid": vid,
         "podsvetka": podsvetka,
         "other_attributes": other_attributes,
-        "category_chain": category_chain,  # цепочка категорий для хлебных крошек
+        "category_chain": chain,  # цепочка категорий для хлебных крошек
         "attribute_groups": attribute_groups,
         'base_group_name': base_group_name,
 
     }
-    return render(request, "product.html", context)
\ No newline at end of file
+
+
+def base_group_name():
+    # если есть только один базовый
+    return AttributeGroup.objects.filter(template__is_base=True).first().title
+
+
+def tag_product(request, product, chain):
+    # категории цепочки — в хлебных крошках; правка цен категории сбрасывает и карточки
+    edge_cache.add_keys(request, edge_cache.product_key(product.id),
+                        *(edge_cache.category_key(c.id) for c in chain))
+
+
+def product_detail(request, slug):
+    product = get_object_or_404(Product, slug=slug)
+    # Загружаем все связанные атрибуты одной строкой (имена — из attribute_registry):
+    attributes = list(product.attribute_values.all())
+
+    context = product_detail_context(
+        request, product, attributes,
+        base_group_name(),
+        product.get_attribute_groups(),   # атрибуты группы
+        category_chain(product.category),
+    )
+    tag_product(request, product, context["category_chain"])
+    return render(request, "product.html", context)
+
+
+# ---- прайс-лист ---------------------------------------------------------
+def _price_list_etag(request, filename=pricelist.HTML_NAME):
+    entry = pricelist.read_manifest().get(filename)
+    return entry["etag"] if entry else None
+
+
+@condition(etag_func=_price_list_etag)
+def price_list(request, filename=pricelist.HTML_NAME):
+    """Готовые файлы build_price_list; на запросе ничего не собирается."""
+    if filename not in pricelist.CONTENT_TYPES:
+        raise Http404
+    storage = pricelist.get_storage()
+    if not storage.exists(filename):
+        if filename == pricelist.HTML_NAME:
+            return redirect('/static/price/index.html')   # ещё не собран — старый статичный прайс
+        raise Http404
+    return FileResponse(storage.open(filename), content_type=pricelist.CONTENT_TYPES[filename])